@@ -1,19 +1,45 @@
 # main.py
-from fastapi import FastAPI, BackgroundTasks, HTTPException
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Query
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
+from contextlib import asynccontextmanager
 import asyncio
+import json
 import uuid
 import os
-from typing import Dict, Optional
+from typing import Dict, Optional, Literal, AsyncIterator, Tuple
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 
-from report_generator.report_creator import ReportCreator
-from pdf_generator.pdf_maker import PDFMaker
+from config.task_config import TASK_QUEUE_CONFIG, DEDUP_CONFIG, TASK_EVENTS_CONFIG
+from task_manager.report_job import ReportRuntime, request_fingerprint
+from task_manager.task_events import RESYNC
+from task_manager.job_queue import RedisJobQueue
+from task_manager.scheduler import LocalScheduler, QueueScheduler, QueueFullError
 
-app = FastAPI(title="舆情报告生成API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动时创建共享的Redis连接池、任务存储、浏览器池和执行器，关闭时释放资源"""
+    queue_mode = TASK_QUEUE_CONFIG["mode"] == "queue"
+    app.state.runtime = ReportRuntime()
+    # 队列模式下进度由 worker 写入，任务状态必须保存在 Redis 中
+    await app.state.runtime.start(require_redis_store=queue_mode)
+    app.state.task_store = app.state.runtime.task_store
+    app.state.job_queue = RedisJobQueue(app.state.runtime.app_pool) if queue_mode else None
+    # 队列模式下由 worker 执行，内联模式下在当前进程中按优先级排队执行
+    if queue_mode:
+        app.state.scheduler = QueueScheduler(app.state.job_queue)
+    else:
+        app.state.scheduler = LocalScheduler(app.state.runtime.run_report, app.state.runtime.abandon_report)
+    await app.state.scheduler.start()
+    yield
+    await app.state.scheduler.stop()
+    if app.state.job_queue is not None:
+        await app.state.job_queue.close()
+    await app.state.runtime.close()
+
+app = FastAPI(title="舆情报告生成API", lifespan=lifespan)
 
 # 添加CORS中间件
 app.add_middleware(
@@ -24,105 +50,193 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 存储任务进度的字典
-task_progress: Dict[str, Dict] = {}
-
 class ReportRequest(BaseModel):
     topic: str
     start_date: str
     end_date: str
     output_path: Optional[str] = None
+    priority: Literal["high", "normal", "low"] = "normal"
 
-async def generate_report_task(task_id: str, request: ReportRequest):
-    try:
-        # 更新任务状态为进行中
-        task_progress[task_id]["status"] = "processing"
-        
-        # 创建ReportCreator实例
-        creator = ReportCreator()
-        
-        # 更新进度 - 开始生成报告
-        task_progress[task_id].update({
-            "progress": 10,
-            "message": "正在初始化报告生成..."
-        })
-        await asyncio.sleep(1)  # 给前端一些时间更新进度
-        
-        # 生成报告内容
-        task_progress[task_id].update({
-            "progress": 30,
-            "message": "正在生成报告内容..."
-        })
-        report_content = creator.create_report(
-            topic=request.topic,
-            start_date=request.start_date,
-            end_date=request.end_date
-        )
-        
-        # 更新进度 - 开始生成PDF
-        task_progress[task_id].update({
-            "progress": 60,
-            "message": "正在转换为PDF格式..."
-        })
-        
-        # 设置输出路径
-        output_dir = request.output_path or "output"
-        os.makedirs(output_dir, exist_ok=True)
-        pdf_path = os.path.join(output_dir, f"{task_id}.pdf")
-        
-        # 生成PDF
-        pdf_maker = PDFMaker()
-        pdf_maker.markdown_to_pdf(
-            markdown_content=report_content,
-            output_path=pdf_path
+    @field_validator("start_date", "end_date")
+    @classmethod
+    def check_date(cls, value: str) -> str:
+        """日期必须为 YYYY-MM-DD 格式，格式错误时返回 422，而不是按错误的日期读取数据"""
+        value = value.strip()
+        try:
+            datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            raise ValueError("日期格式应为 YYYY-MM-DD")
+        return value
+
+async def _is_reusable(task_id: str, task: Optional[Dict]) -> bool:
+    """相同请求的已有任务是否可以复用：仍在排队或执行中，或已完成且报告文件存在"""
+    if task is None:
+        return False
+    if task["status"] == "pending" and app.state.job_queue is None:
+        # 内联模式下任务只在当前进程中排队，进程重启前遗留的排队任务不会再执行
+        return await app.state.scheduler.queue_info(task_id) is not None
+    if task["status"] in ("pending", "processing"):
+        return True
+    return task["status"] == "completed" and os.path.exists(task.get("pdf_path", ""))
+
+async def _claim_request(fingerprint: str, task_id: str) -> Optional[str]:
+    """
+    把请求指纹登记到新任务；已有可复用的相同任务时返回其任务ID
+
+    已有任务失败、过期、不会再执行或报告文件不存在时，由新任务接替该指纹。
+    """
+    replace = None
+    while True:
+        owner = await app.state.task_store.claim_fingerprint(
+            fingerprint, task_id, DEDUP_CONFIG["inflight_ttl"], replace
         )
-        
-        # 更新任务完成状态
-        task_progress[task_id].update({
-            "status": "completed",
-            "progress": 100,
-            "message": "报告生成完成",
-            "pdf_path": pdf_path
-        })
-        
-    except Exception as e:
-        # 更新任务失败状态
-        task_progress[task_id].update({
-            "status": "failed",
-            "message": f"报告生成失败: {str(e)}"
-        })
-        raise
+        if owner is None:
+            return None
+        task = await app.state.task_store.get(owner)
+        if await _is_reusable(owner, task):
+            return owner
+        replace = owner
+
+async def _duplicate_response(task_id: str) -> JSONResponse:
+    """返回已有的相同任务"""
+    task = await _get_task(task_id)
+    body = {
+        "task_id": task_id,
+        "message": "已有相同的报告，可直接下载" if task["status"] == "completed" else "相同的报告任务正在生成",
+        "status": task["status"],
+        "deduplicated": True
+    }
+    if task["status"] == "pending":
+        body.update(await app.state.scheduler.queue_info(task_id) or {})
+    return JSONResponse(body)
 
 @app.post("/generate-report/")
-async def generate_report(request: ReportRequest, background_tasks: BackgroundTasks):
+async def generate_report(request: ReportRequest):
     task_id = str(uuid.uuid4())
-    task_progress[task_id] = {
+    params = request.model_dump()
+    await app.state.task_store.create(task_id, {
         "status": "pending",
         "progress": 0,
         "message": "任务已创建",
+        "priority": request.priority,
         "created_at": datetime.now().isoformat()
-    }
+    })
     
-    background_tasks.add_task(generate_report_task, task_id, request)
+    # 合并相同的请求：先创建任务记录再登记指纹，其他请求看到指纹时任务记录一定已存在
+    if DEDUP_CONFIG["enabled"]:
+        params["fingerprint"] = request_fingerprint(params)
+        duplicate = await _claim_request(params["fingerprint"], task_id)
+        if duplicate is not None:
+            await app.state.task_store.delete(task_id)
+            return await _duplicate_response(duplicate)
+    
+    try:
+        queue_info = await app.state.scheduler.submit(task_id, params, request.priority)
+    except QueueFullError as e:
+        # 排队已满，拒绝的任务不保留记录
+        if params.get("fingerprint"):
+            await app.state.task_store.release_fingerprint(params["fingerprint"], task_id)
+        await app.state.task_store.delete(task_id)
+        raise HTTPException(
+            status_code=429,
+            detail="当前排队的报告任务过多，请稍后重试",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    await app.state.task_store.update(task_id, queue_info)
     
     return JSONResponse({
         "task_id": task_id,
         "message": "报告生成任务已启动",
-        "status": "pending"
+        "status": "pending",
+        **queue_info
     })
 
+async def _get_task(task_id: str) -> Dict:
+    task = await app.state.task_store.get(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    return task
+
 @app.get("/task-progress/{task_id}")
 async def get_task_progress(task_id: str):
-    if task_id not in task_progress:
-        raise HTTPException(status_code=404, detail="任务不存在")
-    return JSONResponse(task_progress[task_id])
+    task = await _get_task(task_id)
+    if task["status"] == "pending":
+        # 排队中的任务刷新排队位置和预计等待时间
+        queue_info = await app.state.scheduler.queue_info(task_id)
+        if queue_info is not None:
+            await app.state.task_store.update(task_id, queue_info)
+            task.update(queue_info)
+    return JSONResponse(task)
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+async def _task_events(task_id: str) -> AsyncIterator[Tuple[str, Optional[Dict]]]:
+    """
+    任务进度事件流：先推送完整状态（snapshot），之后推送每次更新的字段（update），
+    任务完成或失败后结束；长时间没有更新时推送 keepalive，排队中的任务改为推送最新的排队位置
+    """
+    async with app.state.task_store.subscribe(task_id) as events:
+        # 先订阅再读取完整状态，两者之间的更新不会丢失
+        task = await app.state.task_store.get(task_id)
+        if task is None:
+            return
+        yield "snapshot", task
+        status = task["status"]
+        while status not in TERMINAL_STATUSES:
+            try:
+                event = await asyncio.wait_for(events.get(), timeout=TASK_EVENTS_CONFIG["keepalive_interval"])
+            except asyncio.TimeoutError:
+                queue_info = await app.state.scheduler.queue_info(task_id) if status == "pending" else None
+                if queue_info is not None:
+                    yield "update", queue_info
+                else:
+                    yield "keepalive", None
+                continue
+            if event is RESYNC:
+                task = await app.state.task_store.get(task_id)
+                if task is None:
+                    return
+                yield "snapshot", task
+                status = task["status"]
+            else:
+                yield "update", event
+                status = event.get("status", status)
+
+@app.get("/task-events/{task_id}")
+async def stream_task_events(task_id: str):
+    """以 Server-Sent Events 推送任务进度"""
+    await _get_task(task_id)
+    
+    async def event_stream():
+        async for name, data in _task_events(task_id):
+            if data is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.websocket("/ws/task-progress/{task_id}")
+async def websocket_task_progress(websocket: WebSocket, task_id: str):
+    """以 WebSocket 推送任务进度，消息格式为 {"event": ..., "data": ...}"""
+    await websocket.accept()
+    if await app.state.task_store.get(task_id) is None:
+        await websocket.close(code=4404, reason="任务不存在")
+        return
+    try:
+        async for name, data in _task_events(task_id):
+            await websocket.send_json({"event": name, "data": data})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
 
 @app.get("/download-report/{task_id}")
 async def download_report(task_id: str):
-    if task_id not in task_progress:
-        raise HTTPException(status_code=404, detail="任务不存在")
-    
-    task = task_progress[task_id]
+    task = await _get_task(task_id)
     if task["status"] != "completed":
         raise HTTPException(status_code=400, detail="报告尚未生成完成")
     
@@ -136,17 +250,36 @@ async def download_report(task_id: str):
         filename=f"舆情分析报告_{task_id}.pdf"
     )
 
+TASK_LIST_FIELDS = ["status", "progress", "message", "created_at"]
+TASK_SUMMARY_FIELDS = ["status", "progress"]
+
 @app.get("/task-list")
-async def get_task_list():
-    return JSONResponse({
-        task_id: {
-            "status": task["status"],
-            "progress": task.get("progress", 0),
-            "message": task.get("message", ""),
-            "created_at": task.get("created_at", "")
-        }
-        for task_id, task in task_progress.items()
-    })
+async def get_task_list(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    status: Optional[Literal["pending", "processing", "completed", "failed"]] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    summary: bool = False
+):
+    """按创建时间从新到旧分页列出任务；summary 模式只返回状态和进度，并附带各状态的任务数"""
+    fields = TASK_SUMMARY_FIELDS if summary else TASK_LIST_FIELDS
+    try:
+        tasks, next_cursor = await app.state.task_store.list(
+            limit=limit,
+            cursor=cursor,
+            status=status,
+            created_after=created_after.timestamp() if created_after else None,
+            created_before=created_before.timestamp() if created_before else None,
+            fields=fields
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    body = {"tasks": tasks, "next_cursor": next_cursor}
+    if summary:
+        body["counts"] = await app.state.task_store.count_by_status()
+    return JSONResponse(body)
 
 if __name__ == "__main__":
     uvicorn.run(
@@ -0,0 +1,172 @@
+"""
+比较 playwright 与 weasyprint 两种打印后端生成同一份报告的耗时和内存。
+
+用法:
+    python benchmark_pdf.py                  # 使用内置的示例报告（仅含图表，无Mermaid）
+    python benchmark_pdf.py report.md -n 5   # 使用指定的Markdown报告，每个后端生成5次
+
+每个后端在独立的子进程中运行，第一次生成包含浏览器启动等冷启动开销；
+内存为运行期间定期采样的整个进程树（包括 Chromium 的渲染、GPU 等子进程）RSS 之和的峰值。
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import psutil
+
+BACKENDS = ["playwright", "weasyprint"]
+
+# 进程树内存的采样间隔（秒）
+SAMPLE_INTERVAL = 0.05
+
+SAMPLE_REPORT = """# 校园舆情分析报告
+
+## 一、总体概况
+
+本期共采集评论 12,580 条，较上期增长 8.6%。整体情绪以中性和正面为主，负面评论集中在食堂和宿舍管理。
+
+![Sentiment Distribution](https://via.placeholder.com/800x400?text=sentiment)
+
+## 二、用户活跃度
+
+近一周活跃用户数持续上升，周末出现明显高峰。
+
+![User Activity](https://via.placeholder.com/800x400?text=activity)
+
+## 三、热门话题
+
+| 话题 | 评论数 | 占比 |
+| --- | --- | --- |
+| 校园游戏 | 3154 | 25.07% |
+| 校园体育 | 2173 | 17.27% |
+| 校园经济 | 1428 | 11.35% |
+
+![Topic Analysis](https://via.placeholder.com/800x400?text=topic)
+
+## 四、评论类型
+
+![评论分析](https://via.placeholder.com/800x400?text=comments)
+
+## 五、结论与建议
+
+1. 持续关注食堂价格相关的负面讨论；
+2. 在周末高峰期加强论坛管理；
+3. 对热门话题开展专题回应。
+"""
+
+
+def run_backend(backend: str, markdown_path: str, runs: int) -> None:
+    """子进程入口：用指定后端连续生成 runs 次PDF，把每次耗时以JSON输出到标准输出最后一行"""
+    import asyncio
+    from pdf_generator.pdf_maker import PDFMaker
+    from pdf_generator.browser_pool import BrowserPool
+
+    with open(markdown_path, 'r', encoding='utf-8') as f:
+        markdown_content = f.read()
+
+    async def run() -> list:
+        # 与 api.py 相同：所有任务共享一个浏览器池，浏览器在第一次需要时才启动
+        pool = BrowserPool()
+        maker = PDFMaker(browser_pool=pool)
+        timings = []
+        try:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                for i in range(runs):
+                    start = time.perf_counter()
+                    await maker.amarkdown_to_pdf(
+                        markdown_content, os.path.join(tmp_dir, f"report_{i}.pdf"), backend=backend
+                    )
+                    timings.append(time.perf_counter() - start)
+        finally:
+            await pool.stop()
+        return timings
+
+    print(json.dumps(asyncio.run(run())))
+
+
+def tree_rss(process: psutil.Process) -> int:
+    """进程及其所有子孙进程当前的RSS之和（字节），采样期间退出的进程忽略"""
+    total = 0
+    try:
+        processes = [process] + process.children(recursive=True)
+    except psutil.Error:
+        return 0
+    for p in processes:
+        try:
+            total += p.memory_info().rss
+        except psutil.Error:
+            pass
+    return total
+
+
+def measure(backend: str, markdown_path: str, runs: int) -> dict:
+    """在子进程中运行一个后端，返回耗时和整个进程树的峰值内存"""
+    proc = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), markdown_path, "-n", str(runs), "--backend", backend],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True
+    )
+    # 在后台线程中读取输出，避免管道写满阻塞子进程；主线程定期采样进程树的内存
+    output = []
+    reader = threading.Thread(target=lambda: output.append(proc.stdout.read()))
+    reader.start()
+    process = psutil.Process(proc.pid)
+    peak = 0
+    while proc.poll() is None:
+        peak = max(peak, tree_rss(process))
+        time.sleep(SAMPLE_INTERVAL)
+    reader.join()
+    lines = "".join(output).strip().splitlines()
+    if proc.returncode != 0:
+        raise RuntimeError("\n".join(lines[-3:]))
+
+    timings = json.loads(lines[-1])
+    return {
+        "backend": backend,
+        "cold": timings[0],
+        "warm": statistics.mean(timings[1:]) if len(timings) > 1 else None,
+        "peak_rss_mb": peak / 1024 / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="比较PDF打印后端的耗时和内存")
+    parser.add_argument("markdown", nargs="?", help="Markdown报告路径，默认使用内置示例报告")
+    parser.add_argument("-n", "--runs", type=int, default=3, help="每个后端生成的次数")
+    parser.add_argument("--backend", choices=BACKENDS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        run_backend(args.backend, args.markdown, args.runs)
+        return
+
+    markdown_path = args.markdown
+    if markdown_path is None:
+        fd, markdown_path = tempfile.mkstemp(suffix=".md")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(SAMPLE_REPORT)
+
+    print(f"{'后端':<12}{'首次(s)':>10}{'后续平均(s)':>14}{'峰值RSS(MB)':>14}")
+    try:
+        for backend in BACKENDS:
+            try:
+                result = measure(backend, markdown_path, args.runs)
+            except Exception as e:
+                print(f"{backend:<12}失败: {e}")
+                continue
+            warm = f"{result['warm']:.2f}" if result['warm'] is not None else "-"
+            print(f"{backend:<12}{result['cold']:>10.2f}{warm:>14}{result['peak_rss_mb']:>14.1f}")
+    finally:
+        if args.markdown is None:
+            os.remove(markdown_path)
+
+
+if __name__ == "__main__":
+    main()
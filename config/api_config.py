@@ -53,4 +53,22 @@ API_CONFIGS = {
 }
 
 # 默认使用的 API
-DEFAULT_API = "kimi"
\ No newline at end of file
+DEFAULT_API = "kimi"
+
+# HTTP 传输配置（所有 REST 类 API 共享同一个连接池）
+HTTP_CONFIG = {
+    "connect_timeout": 10,      # 建立连接超时（秒）
+    "read_timeout": 300,        # 读取响应超时（秒），长文本生成需要较长时间
+    "pool_connections": 10,     # 缓存的主机连接池数量
+    "pool_maxsize": 20,         # 每个主机保持的最大连接数
+    "keepalive_timeout": 60     # 空闲连接保活时间（秒，仅异步客户端）
+}
+
+# 模型响应缓存配置
+CACHE_CONFIG = {
+    "enabled": True,
+    "backend": "memory",          # memory（进程内 LRU）或 redis（多进程共享）
+    "max_entries": 1000,          # 最多缓存的响应条数，超出后淘汰最久未使用的
+    "ttl": 7 * 24 * 3600,         # 缓存有效期（秒），0 表示不过期
+    "redis_prefix": "llm_cache:"  # Redis 后端使用的键前缀
+}
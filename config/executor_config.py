@@ -0,0 +1,11 @@
+# 报告任务执行器配置
+EXECUTOR_CONFIG = {
+    # 阻塞操作（同步模型接口、Redis 缓存读写、文件读写等）使用的线程池大小，
+    # 同时作为事件循环的默认执行器，asyncio.to_thread 也受此上限约束
+    "thread_workers": 32,
+    # CPU 密集型步骤（数据摘要、Markdown/HTML 处理、图表渲染）使用的进程池大小；
+    # 为 0 时不启用进程池，改在线程池中执行
+    "process_workers": 2,
+    # 进程池的启动方式；服务进程中已有事件循环和线程，使用 spawn 避免 fork 带来的锁状态问题
+    "process_start_method": "spawn",
+}
@@ -0,0 +1,48 @@
+# PDF 生成配置
+PDF_CONFIG = {
+    # 浏览器池同时打开的页面上限（Mermaid 预渲染和 PDF 打印都会占用页面）
+    "max_pages": 4,
+    # 单个浏览器进程打开多少个页面后重启，避免内存持续增长；
+    # 每份报告最多使用两个页面（Mermaid 预渲染和 PDF 打印），100 约为 50 份报告
+    "max_pages_per_browser": 100,
+    # Chromium 启动参数
+    "launch_args": ["--disable-dev-shm-usage"],
+    # 一份报告中所有 Mermaid 图表批量渲染的总超时（秒）
+    "mermaid_timeout": 30,
+    # 离线模式：渲染时拒绝所有外部请求，固定版本的脚本必须已下载到本地（见 PDF_ASSETS），
+    # 缺少时浏览器池启动失败；关闭时本地缺少的脚本从CDN加载
+    "offline": True,
+    # 等待页面就绪信号（字体加载、图表绘制完成）的超时（秒），超时后仍会打印
+    "ready_timeout": 15,
+    # 图表渲染方式："svg" 在服务端生成静态SVG，打印时无需执行JavaScript；
+    # "plotly" 由页面中的 Plotly.js 绘制
+    "chart_mode": "svg",
+    # 打印后端："playwright" 使用 Chromium 打印；"weasyprint" 直接排版静态HTML/SVG，
+    # 报告中没有Mermaid图表时无需启动浏览器
+    "backend": "playwright",
+}
+
+# 渲染所需的前端脚本（固定版本）。浏览器请求这些URL时由本地副本提供，
+# 本地副本位于 pdf_generator/static 目录，可通过 python -m pdf_generator.assets 下载
+PDF_ASSETS = {
+    "plotly": {
+        "url": "https://cdn.plot.ly/plotly-2.27.0.min.js",
+        "file": "plotly-2.27.0.min.js",
+        "version": "2.27.0"
+    },
+    "mermaid": {
+        "url": "https://cdn.jsdelivr.net/npm/mermaid@10.6.1/dist/mermaid.min.js",
+        "file": "mermaid-10.6.1.min.js",
+        "version": "10.6.1"
+    },
+}
+
+# 图表渲染缓存：相同的图表（data + layout）只渲染一次
+CHART_CACHE_CONFIG = {
+    "enabled": True,
+    # 进程内 LRU 缓存的条目上限
+    "max_entries": 256,
+    # 磁盘缓存目录，设置后同一台机器上的多个 worker 共享渲染结果；为 None 时只使用内存缓存
+    "disk_dir": None,
+    "disk_max_entries": 5000,
+}
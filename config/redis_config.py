@@ -1,4 +1,24 @@
 REDIS_HOST = '192.168.10.136'
 REDIS_PORT = 6379
 REDIS_DB = 0
+# 任务存储、任务队列和模型响应缓存（Redis 后端）使用的数据库，与舆情数据分开，
+# 避免读取数据时把这些键当作数据写进报告；只能使用一个数据库时设为与 REDIS_DB 相同，读取数据时会按键前缀跳过它们
+REDIS_APP_DB = 1
 REDIS_PASSWORD = None  # 如果没有密码就写None
+
+# 批量读取配置：每次 SCAN 的建议数量，以及每个管道批次处理的键数
+REDIS_SCAN_BATCH_SIZE = 500
+
+# 按话题加载时的键前缀模板，{topic} 会被替换为请求中的话题，例如 "舆情问题:sentiment_percentages"
+REDIS_TOPIC_KEY_PREFIX = "{topic}:"
+# 话题下没有任何键时，是否回退为读取未按话题划分的数据（键名不含话题分隔符，兼容单话题部署）
+REDIS_TOPIC_FALLBACK = True
+# 按日期组织的序列键（支持通配符）：哈希的字段为日期/时间，有序集合的分数为Unix时间戳
+REDIS_DATE_SERIES_KEYS = ["comment_counts_by_day", "*_comments_by_day", "hourly_online_users"]
+
+# 异步连接池配置（API服务在应用生命周期内共享一个连接池）
+REDIS_MAX_CONNECTIONS = 20
+REDIS_HEALTH_CHECK_INTERVAL = 30   # 空闲连接超过该秒数后使用前先做健康检查
+REDIS_RETRY_ATTEMPTS = 3           # 连接错误或超时时的重试次数
+REDIS_RETRY_BACKOFF_BASE = 0.1     # 指数退避的初始等待（秒）
+REDIS_RETRY_BACKOFF_CAP = 2.0      # 指数退避的最大等待（秒）
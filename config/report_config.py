@@ -0,0 +1,46 @@
+# 报告生成配置
+REPORT_CONFIG = {
+    # 是否并发生成各部分内容
+    "concurrent_sections": True,
+    # 同时发出的分段请求上限
+    "max_concurrency": 3,
+    # 流式生成时向进度回调推送部分内容的最小间隔（秒）
+    "progress_interval": 0.5,
+}
+
+# 数据摘要配置：将 Redis 原始数据压缩为适合放入提示词的紧凑摘要
+DIGEST_CONFIG = {
+    # 排行类数据（IP 分布、热门帖子、关键词等）保留的条目数
+    "top_k": 10,
+    # 时间序列超过该点数时按更粗的粒度分箱
+    "max_series_points": 15,
+    # 帖子标题等长文本的最大保留长度
+    "max_text_length": 40,
+}
+
+# 各部分所需的数据键：生成分段提示词时只携带这些键，未列出的部分使用全部数据
+SECTION_DATA_KEYS = {
+    "整体情况概览": [
+        "total_posts", "total_participants", "total_stats", "comment_counts_by_day",
+        "source_percentage", "sentiment_percentages", "category_percentages", "top_10_ips"
+    ],
+    "情感倾向分析": [
+        "sentiment_percentages", "positive_comments_by_day", "negative_comments_by_day",
+        "neutral_comments_by_day", "top_5_negative_posts", "keyword_counts"
+    ],
+    "活跃用户情况": [
+        "total_participants", "hourly_online_users", "documentCountsByIP",
+        "top_10_ips", "comment_counts_by_day"
+    ],
+    "主要话题分析": [
+        "category_percentages", "keyword_counts", "top20Posts", "source_percentage"
+    ],
+    "潜在风险点": [
+        "sentiment_percentages", "negative_comments_by_day", "top_5_negative_posts",
+        "keyword_counts", "top20Posts"
+    ],
+    "未来趋势预测": [
+        "comment_counts_by_day", "positive_comments_by_day", "negative_comments_by_day",
+        "neutral_comments_by_day", "hourly_online_users", "sentiment_percentages"
+    ],
+}
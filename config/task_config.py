@@ -0,0 +1,67 @@
+# 任务状态存储配置
+TASK_STORE_CONFIG = {
+    # "redis"：任务状态保存在 Redis 中，多个 worker 进程共享，重启后不丢失；
+    # "memory"：保存在当前进程内存中，仅适用于单进程部署
+    "backend": "redis",
+    # 启动时 Redis 不可用是否退回内存存储（退回后多个 worker 之间的任务状态互不可见）
+    "fallback_to_memory": True,
+    # 任务状态的保留时间（秒），每次更新后重新计时
+    "ttl": 7 * 24 * 3600,
+    # 任务哈希的键前缀，完整键为 "{key_prefix}{task_id}"；
+    # 按创建时间排序的任务索引（有序集合）为 "{key_prefix}index"
+    "key_prefix": "report_task:",
+}
+
+# 报告任务执行方式与队列配置
+TASK_QUEUE_CONFIG = {
+    # "inline"：在接收请求的 API 进程中生成报告；
+    # "queue"：API 只把任务写入 Redis 队列，由独立的 worker 进程（python worker.py）领取执行
+    "mode": "inline",
+    # 队列相关键的前缀
+    "key_prefix": "report_queue:",
+    # 可见性超时（秒）：worker 领取任务后在此时间内没有续约，任务会重新回到队列
+    "visibility_timeout": 300,
+    # worker 续约间隔（秒），应明显小于可见性超时
+    "heartbeat_interval": 60,
+    # 队列为空时 worker 的轮询间隔（秒）
+    "poll_interval": 1.0,
+    # 同一任务最多被领取的次数（worker 崩溃或超时导致的重新领取也计入），超过后标记为失败
+    "max_attempts": 3,
+    # 每个 worker 进程同时执行的任务数
+    "worker_concurrency": 2,
+}
+
+# 任务调度配置
+SCHEDULER_CONFIG = {
+    # 同时执行的报告任务总数（队列模式下为所有 worker 合计）
+    "max_running_jobs": 4,
+    # 排队任务上限，队列已满时新请求返回 429
+    "max_queued_jobs": 100,
+    # 还没有历史数据时估算排队时间使用的单个任务耗时（秒）
+    "default_job_duration": 180,
+    # 各类资源的并发上限（每个进程内）；llm 按模型提供方分别限制，未单独配置的使用 default
+    "resource_limits": {
+        "llm": {"default": 4},
+        "pdf": 2,
+    },
+}
+
+# 任务优先级，数值越小越先执行
+TASK_PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+# 相同报告请求的合并配置
+DEDUP_CONFIG = {
+    "enabled": True,
+    # 已完成的报告在该时间（秒）内被相同请求直接复用
+    "freshness_window": 600,
+    # 执行中任务的指纹保留时间（秒），超过后视为任务已失联，相同请求重新生成
+    "inflight_ttl": 3600,
+}
+
+# 任务进度推送配置（SSE / WebSocket）
+TASK_EVENTS_CONFIG = {
+    # 没有事件时发送保活消息的间隔（秒），排队中的任务同时刷新排队位置
+    "keepalive_interval": 15,
+    # 每个订阅者最多积压的事件数，超过后改为推送完整状态
+    "subscriber_queue_size": 100,
+}
@@ -2,13 +2,18 @@ from .model_apis import (
     GLMAPI, QwenAPI, DeepseekAPI, KimiAPI,
     OpenAIAPI, ClaudeAPI, OllamaAPI
 )
+from .response_cache import BaseCache, make_cache_key, get_default_cache
+from .resource_limits import limited, limited_sync
 from config.api_config import API_CONFIGS, DEFAULT_API
-from typing import List, Optional
+from typing import List, Optional, Iterator, AsyncIterator
+import asyncio
 
 class APIManager:
-    def __init__(self, api_name=None):
+    def __init__(self, api_name=None, cache: Optional[BaseCache] = None, use_cache: bool = True):
         self.api_name = api_name or DEFAULT_API
         self.config = API_CONFIGS[self.api_name]
+        # 未指定缓存时使用进程内共享的默认缓存（由 CACHE_CONFIG 决定）
+        self.cache = (cache or get_default_cache()) if use_cache else None
         self._init_api()
         
     def _init_api(self):
@@ -42,9 +47,108 @@ class APIManager:
         self.config = API_CONFIGS[api_name]
         self._init_api()
     
+    @property
+    def _resource(self) -> str:
+        """并发上限按模型提供方分别计算"""
+        return f"llm:{self.api_name}"
+    
+    def _cache_key(self, prompt: str) -> str:
+        """生成当前模型配置下的缓存键"""
+        return make_cache_key(
+            self.api_name,
+            self.api.model,
+            self.api.temperature,
+            self.api.max_tokens,
+            prompt
+        )
+    
     def get_response(self, prompt: str) -> Optional[str]:
-        """获取模型响应"""
-        return self.api.get_response(prompt)
+        """获取模型响应，命中缓存时直接返回；调用模型时受该提供方的并发上限约束"""
+        if self.cache is None:
+            with limited_sync(self._resource):
+                return self.api.get_response(prompt)
+        
+        key = self._cache_key(prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        with limited_sync(self._resource):
+            response = self.api.get_response(prompt)
+        # 失败的空响应不写入缓存
+        if response:
+            self.cache.set(key, response)
+        return response
+        
+    async def aget_response(self, prompt: str) -> Optional[str]:
+        """异步获取模型响应，不阻塞事件循环"""
+        if self.cache is None:
+            async with limited(self._resource):
+                return await self.api.aget_response(prompt)
+        
+        key = self._cache_key(prompt)
+        if self.cache.blocking:
+            cached = await asyncio.to_thread(self.cache.get, key)
+        else:
+            cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        async with limited(self._resource):
+            response = await self.api.aget_response(prompt)
+        if response:
+            if self.cache.blocking:
+                await asyncio.to_thread(self.cache.set, key, response)
+            else:
+                self.cache.set(key, response)
+        return response
+    
+    def stream_response(self, prompt: str) -> Iterator[str]:
+        """流式获取模型响应，命中缓存时一次性返回完整内容"""
+        key = self._cache_key(prompt) if self.cache is not None else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+        
+        # 提供方在流中断或没有收到结束信号时抛出异常，只有完整结束的回复才会执行到写入缓存
+        parts = []
+        with limited_sync(self._resource):
+            for delta in self.api.stream_response(prompt):
+                parts.append(delta)
+                yield delta
+        
+        if key is not None and parts:
+            self.cache.set(key, ''.join(parts))
+    
+    async def astream_response(self, prompt: str) -> AsyncIterator[str]:
+        """异步流式获取模型响应，命中缓存时一次性返回完整内容"""
+        key = self._cache_key(prompt) if self.cache is not None else None
+        if key is not None:
+            if self.cache.blocking:
+                cached = await asyncio.to_thread(self.cache.get, key)
+            else:
+                cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+        
+        parts = []
+        async with limited(self._resource):
+            async for delta in self.api.astream_response(prompt):
+                parts.append(delta)
+                yield delta
+        
+        if key is not None and parts:
+            if self.cache.blocking:
+                await asyncio.to_thread(self.cache.set, key, ''.join(parts))
+            else:
+                self.cache.set(key, ''.join(parts))
+    
+    def get_cache_stats(self) -> Optional[dict]:
+        """获取响应缓存的命中统计"""
+        return self.cache.stats() if self.cache else None
         
     def list_local_models(self) -> List[str]:
         """获取本地可用的模型列表（仅支持 Ollama）"""
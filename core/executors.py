@@ -0,0 +1,90 @@
+import asyncio
+import functools
+import multiprocessing
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Callable, Any
+
+from config.executor_config import EXECUTOR_CONFIG
+
+# 进程内共享的执行器：阻塞操作使用有上限的线程池，CPU 密集型步骤使用进程池
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    """获取共享的有界线程池"""
+    global _thread_pool
+    if _thread_pool is None:
+        with _lock:
+            if _thread_pool is None:
+                _thread_pool = ThreadPoolExecutor(
+                    max_workers=EXECUTOR_CONFIG["thread_workers"],
+                    thread_name_prefix="report-worker"
+                )
+    return _thread_pool
+
+
+def get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """获取共享的进程池，未启用时返回 None"""
+    global _process_pool
+    if EXECUTOR_CONFIG["process_workers"] <= 0:
+        return None
+    if _process_pool is None:
+        with _lock:
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=EXECUTOR_CONFIG["process_workers"],
+                    mp_context=multiprocessing.get_context(EXECUTOR_CONFIG["process_start_method"])
+                )
+    return _process_pool
+
+
+def install_default_executor(loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+    """把共享线程池设为事件循环的默认执行器，使 asyncio.to_thread 等调用也受线程数上限约束"""
+    loop = loop or asyncio.get_running_loop()
+    loop.set_default_executor(get_thread_pool())
+
+
+async def run_in_thread(func: Callable, *args, **kwargs) -> Any:
+    """在共享线程池中执行阻塞函数"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_thread_pool(), functools.partial(func, *args, **kwargs))
+
+
+async def run_in_process(func: Callable, *args) -> Any:
+    """
+    在共享进程池中执行 CPU 密集型函数，不占用事件循环
+
+    func 必须是模块级函数，参数和返回值需要可以被 pickle。
+    未启用进程池时退回到线程池执行；进程池中的工作进程意外退出时重建进程池并在线程池中完成本次调用。
+    """
+    global _process_pool
+    pool = get_process_pool()
+    if pool is None:
+        return await run_in_thread(func, *args)
+    
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(pool, func, *args)
+    except BrokenProcessPool as e:
+        print(f"进程池异常退出，重建进程池: {e}")
+        with _lock:
+            if _process_pool is pool:
+                _process_pool = None
+        pool.shutdown(wait=False)
+        return await run_in_thread(func, *args)
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    """关闭共享的线程池和进程池"""
+    global _thread_pool, _process_pool
+    with _lock:
+        thread_pool, process_pool = _thread_pool, _process_pool
+        _thread_pool = _process_pool = None
+    if process_pool is not None:
+        process_pool.shutdown(wait=wait, cancel_futures=True)
+    if thread_pool is not None:
+        thread_pool.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import weakref
+from typing import Optional, Tuple
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.api_config import HTTP_CONFIG
+
+# 进程内共享的同步会话，所有 APIManager 实例复用同一个连接池
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+# aiohttp 会话绑定事件循环，因此按循环分别维护
+_async_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = weakref.WeakKeyDictionary()
+
+
+def get_timeout() -> Tuple[float, float]:
+    """获取 requests 使用的 (连接超时, 读取超时)"""
+    return HTTP_CONFIG["connect_timeout"], HTTP_CONFIG["read_timeout"]
+
+
+def get_session() -> requests.Session:
+    """获取共享的同步 HTTP 会话（按主机维护保活连接池）"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=HTTP_CONFIG["pool_connections"],
+                    pool_maxsize=HTTP_CONFIG["pool_maxsize"]
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+async def get_async_session() -> aiohttp.ClientSession:
+    """获取当前事件循环共享的异步 HTTP 会话"""
+    loop = asyncio.get_running_loop()
+    session = _async_sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_CONFIG["pool_connections"] * HTTP_CONFIG["pool_maxsize"],
+            limit_per_host=HTTP_CONFIG["pool_maxsize"],
+            keepalive_timeout=HTTP_CONFIG["keepalive_timeout"]
+        )
+        timeout = aiohttp.ClientTimeout(
+            sock_connect=HTTP_CONFIG["connect_timeout"],
+            sock_read=HTTP_CONFIG["read_timeout"]
+        )
+        session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        _async_sessions[loop] = session
+    return session
+
+
+def close_session() -> None:
+    """关闭共享的同步会话"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+async def close_async_session() -> None:
+    """关闭当前事件循环上的异步会话"""
+    session = _async_sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator, AsyncIterator
+import asyncio
 
 class BaseAPI(ABC):
     """基础 API 接口类，定义所有 LLM API 必须实现的方法"""
@@ -35,4 +36,49 @@ class BaseAPI(ABC):
         Returns:
             模型生成的回复文本
         """
-        pass
\ No newline at end of file
+        pass
+
+    async def aget_response(self, prompt: str) -> str:
+        """
+        异步获取模型响应
+        
+        各子类应提供基于异步客户端的原生实现；默认实现在线程中调用
+        get_response，避免阻塞事件循环。
+        
+        Args:
+            prompt: 用户输入的提示
+            
+        Returns:
+            模型生成的回复文本
+        """
+        return await asyncio.to_thread(self.get_response, prompt)
+
+    def stream_response(self, prompt: str) -> Iterator[str]:
+        """
+        以流式方式获取模型响应
+        
+        默认实现一次性返回完整回复，支持流式接口的子类应逐段产出增量文本。
+        
+        Args:
+            prompt: 用户输入的提示
+            
+        Yields:
+            模型生成的增量文本
+        """
+        response = self.get_response(prompt)
+        if response:
+            yield response
+
+    async def astream_response(self, prompt: str) -> AsyncIterator[str]:
+        """
+        异步流式获取模型响应
+        
+        Args:
+            prompt: 用户输入的提示
+            
+        Yields:
+            模型生成的增量文本
+        """
+        response = await self.aget_response(prompt)
+        if response:
+            yield response
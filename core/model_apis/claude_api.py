@@ -1,5 +1,5 @@
-from typing import Optional, Dict, Any
-from anthropic import Anthropic
+from typing import Optional, Dict, Any, Iterator, AsyncIterator
+from anthropic import Anthropic, AsyncAnthropic
 from .base_api import BaseAPI
 import json
 
@@ -16,6 +16,7 @@ class ClaudeAPI(BaseAPI):
         """
         super().__init__(api_key, **kwargs)
         self.client = Anthropic(api_key=api_key)
+        self.async_client = AsyncAnthropic(api_key=api_key)
         self.model = kwargs.get('model', 'claude-3-opus-20240229')
         self.max_tokens = kwargs.get('max_tokens', 4000)
         self.temperature = kwargs.get('temperature', 0.7)
@@ -44,6 +45,86 @@ class ClaudeAPI(BaseAPI):
         except Exception as e:
             raise ConnectionError(f"Claude API 调用失败: {str(e)}")
     
+    async def aget_response(self, prompt: str) -> str:
+        """
+        异步调用 Claude 的 API
+        
+        Args:
+            prompt: 用户输入的提示
+        
+        Returns:
+            生成的回复文本
+        """
+        try:
+            response = await self.async_client.messages.create(
+                model=self.model,
+                messages=[{
+                    "role": "user",
+                    "content": prompt
+                }],
+                temperature=self.temperature,
+                max_tokens=self.max_tokens
+            )
+            return response.content[0].text
+        except Exception as e:
+            raise ConnectionError(f"Claude API 调用失败: {str(e)}")
+    
+    def stream_response(self, prompt: str) -> Iterator[str]:
+        """
+        以流式方式调用 Claude 的 API
+        
+        Args:
+            prompt: 用户输入的提示
+        
+        Yields:
+            增量生成的文本
+        """
+        try:
+            stream = self.client.messages.create(
+                model=self.model,
+                messages=[{
+                    "role": "user",
+                    "content": prompt
+                }],
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                stream=True
+            )
+            for event in stream:
+                delta = event.delta.text if event.type == "content_block_delta" else None
+                if delta:
+                    yield delta
+        except Exception as e:
+            raise ConnectionError(f"Claude API 调用失败: {str(e)}")
+    
+    async def astream_response(self, prompt: str) -> AsyncIterator[str]:
+        """
+        异步流式调用 Claude 的 API
+        
+        Args:
+            prompt: 用户输入的提示
+        
+        Yields:
+            增量生成的文本
+        """
+        try:
+            stream = await self.async_client.messages.create(
+                model=self.model,
+                messages=[{
+                    "role": "user",
+                    "content": prompt
+                }],
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                stream=True
+            )
+            async for event in stream:
+                delta = event.delta.text if event.type == "content_block_delta" else None
+                if delta:
+                    yield delta
+        except Exception as e:
+            raise ConnectionError(f"Claude API 调用失败: {str(e)}")
+    
     def get_model_info(self) -> Dict[str, Any]:
         """
         获取模型信息
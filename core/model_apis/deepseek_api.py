@@ -1,5 +1,8 @@
 from .base_api import BaseAPI
 import requests
+import aiohttp
+from .streaming import parse_sse_line, openai_delta, openai_finished, is_sse_done, StreamIncompleteError
+from core.http_client import get_session, get_async_session, get_timeout
 import re
 import json
 
@@ -14,8 +17,8 @@ class DeepseekAPI(BaseAPI):
         self.max_tokens = kwargs.get('max_tokens', 2000)
         self.messages = []  # 存储对话历史
         
-    def get_response(self, prompt):
-        """调用 Deepseek 的 API"""
+    def _build_request(self, prompt, stream=False):
+        """构造请求头、请求体以及本轮的用户消息"""
         headers = {
             'Authorization': f'Bearer {self.api_key}',
             'Content-Type': 'application/json'
@@ -45,6 +48,40 @@ class DeepseekAPI(BaseAPI):
             "max_tokens": self.max_tokens,
             "response_format": {"type": "json_object"}  # 使用正确的格式
         }
+        if stream:
+            data["stream"] = True
+        return headers, data, user_message
+        
+    def _handle_result(self, result, user_message):
+        """从响应中提取文本内容并更新对话历史"""
+        assistant_message = result['choices'][0]['message']
+        content = assistant_message.get('content', '')
+        
+        # 清理响应内容中的Markdown格式
+        if content:
+            # 移除可能的Markdown代码块标记
+            content = re.sub(r'^```json\s*', '', content)
+            content = re.sub(r'\s*```$', '', content)
+            # 尝试解析JSON字符串
+            try:
+                content = json.loads(content)
+                content = json.dumps(content)  # 重新序列化为标准JSON字符串
+            except json.JSONDecodeError:
+                pass  # 如果不是JSON格式，保持原样
+        
+        # 将助手的回复添加到对话历史
+        if content:
+            self.messages.append(user_message)  # 保存用户消息
+            self.messages.append({              # 保存助手回复
+                "role": "assistant",
+                "content": content
+            })
+        
+        return content
+        
+    def get_response(self, prompt):
+        """调用 Deepseek 的 API"""
+        headers, data, user_message = self._build_request(prompt)
         
         try:
             print(f"\n调试信息 - 发送到Deepseek API的请求:")
@@ -52,7 +89,7 @@ class DeepseekAPI(BaseAPI):
             print(f"Headers: {headers}")
             print(f"Data: {data}\n")
             
-            response = requests.post(self.api_url, headers=headers, json=data)
+            response = get_session().post(self.api_url, headers=headers, json=data, timeout=get_timeout())
             
             print(f"调试信息 - Deepseek API响应:")
             print(f"Status Code: {response.status_code}")
@@ -60,33 +97,7 @@ class DeepseekAPI(BaseAPI):
             print(f"Response Body: {response.text}\n")
             
             response.raise_for_status()
-            result = response.json()
-            
-            # 从响应中提取文本内容
-            assistant_message = result['choices'][0]['message']
-            content = assistant_message.get('content', '')
-            
-            # 清理响应内容中的Markdown格式
-            if content:
-                # 移除可能的Markdown代码块标记
-                content = re.sub(r'^```json\s*', '', content)
-                content = re.sub(r'\s*```$', '', content)
-                # 尝试解析JSON字符串
-                try:
-                    content = json.loads(content)
-                    content = json.dumps(content)  # 重新序列化为标准JSON字符串
-                except json.JSONDecodeError:
-                    pass  # 如果不是JSON格式，保持原样
-            
-            # 将助手的回复添加到对话历史
-            if content:
-                self.messages.append(user_message)  # 保存用户消息
-                self.messages.append({              # 保存助手回复
-                    "role": "assistant",
-                    "content": content
-                })
-            
-            return content
+            return self._handle_result(response.json(), user_message)
             
         except requests.exceptions.RequestException as e:
             print(f"Deepseek API 请求错误: {str(e)}")
@@ -97,6 +108,89 @@ class DeepseekAPI(BaseAPI):
             print(f"Deepseek API 错误: {str(e)}")
             return None
             
+    async def aget_response(self, prompt):
+        """异步调用 Deepseek 的 API"""
+        headers, data, user_message = self._build_request(prompt)
+        
+        try:
+            session = await get_async_session()
+            async with session.post(self.api_url, headers=headers, json=data) as response:
+                if response.status >= 400:
+                    print(f"错误响应: {await response.text()}")
+                response.raise_for_status()
+                result = await response.json(content_type=None)
+            return self._handle_result(result, user_message)
+            
+        except aiohttp.ClientError as e:
+            print(f"Deepseek API 请求错误: {str(e)}")
+            return None
+        except Exception as e:
+            print(f"Deepseek API 错误: {str(e)}")
+            return None
+            
+    def _remember_stream(self, user_message, parts):
+        """流式输出结束后，将完整回复写入对话历史"""
+        content = ''.join(parts)
+        if content:
+            self.messages.append(user_message)
+            self.messages.append({
+                "role": "assistant",
+                "content": content
+            })
+            
+    def stream_response(self, prompt):
+        """以流式方式调用 Deepseek 的 API（SSE）"""
+        headers, data, user_message = self._build_request(prompt, stream=True)
+        parts = []
+        
+        try:
+            with get_session().post(self.api_url, headers=headers, json=data, stream=True, timeout=get_timeout()) as response:
+                response.raise_for_status()
+                finished = False
+                for line in response.iter_lines():
+                    finished = finished or is_sse_done(line)
+                    chunk = parse_sse_line(line)
+                    finished = finished or bool(chunk and openai_finished(chunk))
+                    delta = openai_delta(chunk) if chunk else ''
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+                if not finished:
+                    raise StreamIncompleteError("Deepseek")
+        except StreamIncompleteError:
+            raise
+        except Exception as e:
+            raise ConnectionError(f"Deepseek API 流式调用错误: {str(e)}") from e
+        finally:
+            self._remember_stream(user_message, parts)
+            
+    async def astream_response(self, prompt):
+        """异步流式调用 Deepseek 的 API（SSE）"""
+        headers, data, user_message = self._build_request(prompt, stream=True)
+        parts = []
+        
+        try:
+            session = await get_async_session()
+            async with session.post(self.api_url, headers=headers, json=data) as response:
+                response.raise_for_status()
+                finished = False
+                async for line in response.content:
+                    finished = finished or is_sse_done(line)
+                    chunk = parse_sse_line(line)
+                    finished = finished or bool(chunk and openai_finished(chunk))
+                    delta = openai_delta(chunk) if chunk else ''
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+                if not finished:
+                    raise StreamIncompleteError("Deepseek")
+        except StreamIncompleteError:
+            raise
+        except Exception as e:
+            raise ConnectionError(f"Deepseek API 流式调用错误: {str(e)}") from e
+        finally:
+            self._remember_stream(user_message, parts)
+            
     def reset_conversation(self):
         """重置对话历史"""
         self.messages = [] 
\ No newline at end of file
@@ -1,5 +1,6 @@
 from .base_api import BaseAPI
-import requests
+from .streaming import parse_sse_line, openai_delta, openai_finished, is_sse_done, StreamIncompleteError
+from core.http_client import get_session, get_async_session, get_timeout
 
 class KimiAPI(BaseAPI):
     """Kimi API 实现"""
@@ -9,8 +10,8 @@ class KimiAPI(BaseAPI):
         self.api_url = kwargs.get('api_url', 'https://api.moonshot.cn/v1/chat/completions')
         self.model = kwargs.get('model', 'moonshot-v1-32k')
         
-    def get_response(self, prompt):
-        """调用 Kimi 的 API"""
+    def _build_request(self, prompt, stream=False):
+        """构造请求头和请求体"""
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
@@ -25,11 +26,77 @@ class KimiAPI(BaseAPI):
                 }
             ]
         }
+        if stream:
+            data["stream"] = True
+        return headers, data
+        
+    def get_response(self, prompt):
+        """调用 Kimi 的 API"""
+        headers, data = self._build_request(prompt)
         
         try:
-            response = requests.post(self.api_url, headers=headers, json=data)
+            response = get_session().post(self.api_url, headers=headers, json=data, timeout=get_timeout())
             response.raise_for_status()
             return response.json()["choices"][0]["message"]["content"]
         except Exception as e:
             print(f"Kimi API调用错误: {str(e)}")
-            return None 
\ No newline at end of file
+            return None
+            
+    async def aget_response(self, prompt):
+        """异步调用 Kimi 的 API"""
+        headers, data = self._build_request(prompt)
+        
+        try:
+            session = await get_async_session()
+            async with session.post(self.api_url, headers=headers, json=data) as response:
+                response.raise_for_status()
+                result = await response.json(content_type=None)
+            return result["choices"][0]["message"]["content"]
+        except Exception as e:
+            print(f"Kimi API调用错误: {str(e)}")
+            return None
+            
+    def stream_response(self, prompt):
+        """以流式方式调用 Kimi 的 API（SSE）"""
+        headers, data = self._build_request(prompt, stream=True)
+        
+        try:
+            with get_session().post(self.api_url, headers=headers, json=data, stream=True, timeout=get_timeout()) as response:
+                response.raise_for_status()
+                finished = False
+                for line in response.iter_lines():
+                    finished = finished or is_sse_done(line)
+                    chunk = parse_sse_line(line)
+                    finished = finished or bool(chunk and openai_finished(chunk))
+                    delta = openai_delta(chunk) if chunk else ''
+                    if delta:
+                        yield delta
+                if not finished:
+                    raise StreamIncompleteError("Kimi")
+        except StreamIncompleteError:
+            raise
+        except Exception as e:
+            raise ConnectionError(f"Kimi API流式调用错误: {str(e)}") from e
+            
+    async def astream_response(self, prompt):
+        """异步流式调用 Kimi 的 API（SSE）"""
+        headers, data = self._build_request(prompt, stream=True)
+        
+        try:
+            session = await get_async_session()
+            async with session.post(self.api_url, headers=headers, json=data) as response:
+                response.raise_for_status()
+                finished = False
+                async for line in response.content:
+                    finished = finished or is_sse_done(line)
+                    chunk = parse_sse_line(line)
+                    finished = finished or bool(chunk and openai_finished(chunk))
+                    delta = openai_delta(chunk) if chunk else ''
+                    if delta:
+                        yield delta
+                if not finished:
+                    raise StreamIncompleteError("Kimi")
+        except StreamIncompleteError:
+            raise
+        except Exception as e:
+            raise ConnectionError(f"Kimi API流式调用错误: {str(e)}") from e
@@ -1,7 +1,8 @@
 from .base_api import BaseAPI
-import requests
+from .streaming import parse_ndjson_line, StreamIncompleteError
+from core.http_client import get_session, get_async_session, get_timeout
 import json
-from typing import List, Optional
+from typing import List, Optional, Iterator, AsyncIterator
 
 class OllamaAPI(BaseAPI):
     """Ollama API 实现"""
@@ -22,33 +23,100 @@ class OllamaAPI(BaseAPI):
         self.api_url = kwargs.get('api_url', 'http://localhost:11434')
         self.model = kwargs.get('model', 'llama2')
         
-    def get_response(self, prompt: str) -> str:
-        """调用 Ollama 的 API"""
-        url = f"{self.api_url}/api/generate"
-        
-        payload = {
+    def _build_payload(self, prompt: str, stream: bool = False) -> dict:
+        """构造生成请求的请求体"""
+        return {
             "model": self.model,
             "prompt": prompt,
-            "stream": False,
+            "stream": stream,
             "options": {
                 "temperature": self.temperature,
                 "num_predict": self.max_tokens
             }
         }
         
+    def get_response(self, prompt: str) -> str:
+        """调用 Ollama 的 API"""
+        url = f"{self.api_url}/api/generate"
+        payload = self._build_payload(prompt)
+        
         try:
-            response = requests.post(url, json=payload)
+            response = get_session().post(url, json=payload, timeout=get_timeout())
             response.raise_for_status()
             return response.json()["response"]
         except Exception as e:
             print(f"Ollama API 调用错误: {str(e)}")
             return None
             
+    async def aget_response(self, prompt: str) -> str:
+        """异步调用 Ollama 的 API"""
+        url = f"{self.api_url}/api/generate"
+        payload = self._build_payload(prompt)
+        
+        try:
+            session = await get_async_session()
+            async with session.post(url, json=payload) as response:
+                response.raise_for_status()
+                result = await response.json(content_type=None)
+            return result["response"]
+        except Exception as e:
+            print(f"Ollama API 调用错误: {str(e)}")
+            return None
+            
+    def stream_response(self, prompt: str) -> Iterator[str]:
+        """以流式方式调用 Ollama 的 API（NDJSON，每行一个数据块）"""
+        url = f"{self.api_url}/api/generate"
+        payload = self._build_payload(prompt, stream=True)
+        
+        try:
+            with get_session().post(url, json=payload, stream=True, timeout=get_timeout()) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    chunk = parse_ndjson_line(line)
+                    if not chunk:
+                        continue
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        break
+                else:
+                    # 没有收到 done 标记就结束，回复不完整
+                    raise StreamIncompleteError("Ollama")
+        except StreamIncompleteError:
+            raise
+        except Exception as e:
+            raise ConnectionError(f"Ollama API 流式调用错误: {str(e)}") from e
+            
+    async def astream_response(self, prompt: str) -> AsyncIterator[str]:
+        """异步流式调用 Ollama 的 API（NDJSON）"""
+        url = f"{self.api_url}/api/generate"
+        payload = self._build_payload(prompt, stream=True)
+        
+        try:
+            session = await get_async_session()
+            async with session.post(url, json=payload) as response:
+                response.raise_for_status()
+                async for line in response.content:
+                    chunk = parse_ndjson_line(line)
+                    if not chunk:
+                        continue
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        break
+                else:
+                    # 没有收到 done 标记就结束，回复不完整
+                    raise StreamIncompleteError("Ollama")
+        except StreamIncompleteError:
+            raise
+        except Exception as e:
+            raise ConnectionError(f"Ollama API 流式调用错误: {str(e)}") from e
+            
     def list_models(self) -> List[str]:
         """获取本地可用的模型列表"""
         url = f"{self.api_url}/api/tags"
         try:
-            response = requests.get(url)
+            response = get_session().get(url, timeout=get_timeout())
             response.raise_for_status()
             return [model['name'] for model in response.json()['models']]
         except Exception as e:
@@ -83,7 +151,7 @@ class OllamaAPI(BaseAPI):
         """
         url = f"{self.api_url}/api/pull"
         try:
-            response = requests.post(url, json={"name": model_name}, stream=True)
+            response = get_session().post(url, json={"name": model_name}, stream=True, timeout=(get_timeout()[0], None))
             response.raise_for_status()
             
             # 打印下载进度
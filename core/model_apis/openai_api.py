@@ -1,5 +1,5 @@
-from typing import Optional, Dict, Any
-from openai import OpenAI
+from typing import Optional, Dict, Any, Iterator, AsyncIterator
+from openai import OpenAI, AsyncOpenAI
 from .base_api import BaseAPI
 import json
 
@@ -16,6 +16,7 @@ class OpenAIAPI(BaseAPI):
         """
         super().__init__(api_key, **kwargs)
         self.client = OpenAI(api_key=api_key)
+        self.async_client = AsyncOpenAI(api_key=api_key)
         self.model = kwargs.get('model', 'gpt-4-turbo-preview')
         self.max_tokens = kwargs.get('max_tokens', 4000)
         self.temperature = kwargs.get('temperature', 0.7)
@@ -44,6 +45,86 @@ class OpenAIAPI(BaseAPI):
         except Exception as e:
             raise ConnectionError(f"OpenAI API 调用失败: {str(e)}")
     
+    async def aget_response(self, prompt: str) -> str:
+        """
+        异步调用 OpenAI 的 API
+        
+        Args:
+            prompt: 用户输入的提示
+        
+        Returns:
+            生成的回复文本
+        """
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=[{
+                    "role": "user",
+                    "content": prompt
+                }],
+                temperature=self.temperature,
+                max_tokens=self.max_tokens
+            )
+            return response.choices[0].message.content
+        except Exception as e:
+            raise ConnectionError(f"OpenAI API 调用失败: {str(e)}")
+    
+    def stream_response(self, prompt: str) -> Iterator[str]:
+        """
+        以流式方式调用 OpenAI 的 API
+        
+        Args:
+            prompt: 用户输入的提示
+        
+        Yields:
+            增量生成的文本
+        """
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=[{
+                    "role": "user",
+                    "content": prompt
+                }],
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                stream=True
+            )
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+        except Exception as e:
+            raise ConnectionError(f"OpenAI API 调用失败: {str(e)}")
+    
+    async def astream_response(self, prompt: str) -> AsyncIterator[str]:
+        """
+        异步流式调用 OpenAI 的 API
+        
+        Args:
+            prompt: 用户输入的提示
+        
+        Yields:
+            增量生成的文本
+        """
+        try:
+            stream = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=[{
+                    "role": "user",
+                    "content": prompt
+                }],
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                stream=True
+            )
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+        except Exception as e:
+            raise ConnectionError(f"OpenAI API 调用失败: {str(e)}")
+    
     def get_model_info(self) -> Dict[str, Any]:
         """
         获取模型信息
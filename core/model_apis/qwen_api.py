@@ -2,6 +2,13 @@ from .base_api import BaseAPI
 import dashscope
 from dashscope import Generation
 from http import HTTPStatus
+from .streaming import parse_sse_line, StreamIncompleteError
+from core.http_client import get_async_session
+
+def _is_finished(finish_reason) -> bool:
+    """DashScope 增量输出在生成结束前的 finish_reason 为字符串 null，结束时为 stop 等"""
+    return bool(finish_reason) and finish_reason != "null"
+
 
 class QwenAPI(BaseAPI):
     """Qwen API 实现"""
@@ -9,17 +16,22 @@ class QwenAPI(BaseAPI):
     def __init__(self, api_key, **kwargs):
         super().__init__(api_key, **kwargs)
         dashscope.api_key = self.api_key
+        self.api_url = kwargs.get('api_url', 'https://dashscope.aliyuncs.com/api/v1/services/aigc/text-generation/generation')
         self.model = kwargs.get('model', 'qwen-72b-chat')
         
+    def _build_messages(self, prompt):
+        """构造对话消息"""
+        return [
+            {'role': 'system', 'content': 'You are a helpful assistant.'},
+            {'role': 'user', 'content': prompt}
+        ]
+        
     def get_response(self, prompt):
         """调用 Qwen 的 API"""
         try:
             response = Generation.call(
                 model=self.model,
-                messages=[
-                    {'role': 'system', 'content': 'You are a helpful assistant.'},
-                    {'role': 'user', 'content': prompt}
-                ],
+                messages=self._build_messages(prompt),
                 result_format='message'
             )
             
@@ -31,4 +43,96 @@ class QwenAPI(BaseAPI):
                 
         except Exception as e:
             print(f"Qwen API 调用错误: {str(e)}")
-            return None 
\ No newline at end of file
+            return None
+                
+    async def aget_response(self, prompt):
+        """异步调用 Qwen 的 API（直接请求 DashScope HTTP 接口）"""
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+        
+        data = {
+            "model": self.model,
+            "input": {"messages": self._build_messages(prompt)},
+            "parameters": {"result_format": "message"}
+        }
+        
+        try:
+            session = await get_async_session()
+            async with session.post(self.api_url, headers=headers, json=data) as response:
+                result = await response.json(content_type=None)
+                status = response.status
+            
+            if status == HTTPStatus.OK:
+                return result['output']['choices'][0]['message']['content']
+            else:
+                print(f'请求失败: {result.get("code")}, {result.get("message")}')
+                return None
+                
+        except Exception as e:
+            print(f"Qwen API 调用错误: {str(e)}")
+            return None
+            
+    def stream_response(self, prompt):
+        """以流式方式调用 Qwen 的 API（增量输出）"""
+        try:
+            responses = Generation.call(
+                model=self.model,
+                messages=self._build_messages(prompt),
+                result_format='message',
+                stream=True,
+                incremental_output=True
+            )
+            finished = False
+            for response in responses:
+                if response.status_code != HTTPStatus.OK:
+                    raise ConnectionError(f'请求失败: {response.code}, {response.message}')
+                choice = response.output.choices[0]
+                finished = finished or _is_finished(choice.get('finish_reason'))
+                delta = choice['message']['content']
+                if delta:
+                    yield delta
+            if not finished:
+                raise StreamIncompleteError("Qwen")
+                    
+        except StreamIncompleteError:
+            raise
+        except Exception as e:
+            raise ConnectionError(f"Qwen API 流式调用错误: {str(e)}") from e
+            
+    async def astream_response(self, prompt):
+        """异步流式调用 Qwen 的 API（DashScope SSE 接口）"""
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json',
+            'X-DashScope-SSE': 'enable'
+        }
+        
+        data = {
+            "model": self.model,
+            "input": {"messages": self._build_messages(prompt)},
+            "parameters": {"result_format": "message", "incremental_output": True}
+        }
+        
+        try:
+            session = await get_async_session()
+            async with session.post(self.api_url, headers=headers, json=data) as response:
+                response.raise_for_status()
+                finished = False
+                async for line in response.content:
+                    chunk = parse_sse_line(line)
+                    if not chunk or 'output' not in chunk:
+                        continue
+                    choice = chunk['output']['choices'][0]
+                    finished = finished or _is_finished(choice.get('finish_reason'))
+                    delta = choice['message']['content']
+                    if delta:
+                        yield delta
+                if not finished:
+                    raise StreamIncompleteError("Qwen")
+                        
+        except StreamIncompleteError:
+            raise
+        except Exception as e:
+            raise ConnectionError(f"Qwen API 流式调用错误: {str(e)}") from e
@@ -0,0 +1,69 @@
+import json
+from typing import Optional, Dict, Any
+
+
+def parse_sse_line(line) -> Optional[Dict[str, Any]]:
+    """
+    解析一行 SSE 数据
+    
+    Args:
+        line: 原始行（bytes 或 str）
+        
+    Returns:
+        data 字段解析出的 JSON 对象；非数据行或结束标记返回 None
+    """
+    if isinstance(line, bytes):
+        line = line.decode('utf-8')
+    line = line.strip()
+    if not line.startswith('data:'):
+        return None
+    payload = line[len('data:'):].strip()
+    if not payload or payload == '[DONE]':
+        return None
+    try:
+        return json.loads(payload)
+    except json.JSONDecodeError:
+        return None
+
+
+def parse_ndjson_line(line) -> Optional[Dict[str, Any]]:
+    """解析一行 NDJSON 数据，空行或无法解析时返回 None"""
+    if isinstance(line, bytes):
+        line = line.decode('utf-8')
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError:
+        return None
+
+
+def openai_delta(chunk: Dict[str, Any]) -> str:
+    """从 OpenAI 兼容格式的流式数据块中取出增量文本"""
+    choices = chunk.get('choices') or []
+    if not choices:
+        return ''
+    delta = choices[0].get('delta') or {}
+    return delta.get('content') or ''
+
+
+def openai_finished(chunk: Dict[str, Any]) -> bool:
+    """OpenAI 兼容格式的数据块是否带有 finish_reason（生成已正常结束）"""
+    choices = chunk.get('choices') or []
+    return bool(choices and choices[0].get('finish_reason'))
+
+
+def is_sse_done(line) -> bool:
+    """是否为 SSE 的结束标记 data: [DONE]"""
+    if isinstance(line, bytes):
+        line = line.decode('utf-8')
+    line = line.strip()
+    return line.startswith('data:') and line[len('data:'):].strip() == '[DONE]'
+
+
+class StreamIncompleteError(ConnectionError):
+    """流式响应在提供方发出结束信号之前中断"""
+
+    def __init__(self, provider: str):
+        super().__init__(f"{provider} API 流式响应在完成前中断")
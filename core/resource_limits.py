@@ -0,0 +1,147 @@
+import asyncio
+import threading
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional, Dict
+
+from config.task_config import SCHEDULER_CONFIG
+
+
+class _Waiter:
+    """等待名额的线程或协程；释放名额时直接转交给最早的等待者"""
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.granted = False
+        if loop is None:
+            self.event = threading.Event()
+        else:
+            self.future = loop.create_future()
+
+    def wake(self) -> bool:
+        """通知等待者已获得名额，事件循环已关闭时返回 False"""
+        if self.loop is None:
+            self.event.set()
+            return True
+        try:
+            self.loop.call_soon_threadsafe(self._set_result)
+        except RuntimeError:
+            return False
+        return True
+
+    def _set_result(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class ResourceLimiter:
+    """
+    一种资源在进程内的并发计数
+
+    线程（同步调用）和各个事件循环中的协程（异步调用）共用同一个计数，
+    等待者按先后顺序获得名额。
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._active = 0
+        self._waiters: "deque[_Waiter]" = deque()
+        self._lock = threading.Lock()
+
+    def _try_acquire(self) -> bool:
+        """调用方需持有锁"""
+        if self._active < self.limit and not self._waiters:
+            self._active += 1
+            return True
+        return False
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._try_acquire():
+                return
+            waiter = _Waiter()
+            self._waiters.append(waiter)
+        waiter.event.wait()
+
+    async def acquire_async(self) -> None:
+        with self._lock:
+            if self._try_acquire():
+                return
+            waiter = _Waiter(asyncio.get_running_loop())
+            self._waiters.append(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if not waiter.granted:
+                    self._waiters.remove(waiter)
+                    raise
+            # 取消时名额已经转交过来，归还给下一个等待者
+            self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if waiter.wake():
+                    waiter.granted = True
+                    return
+            self._active -= 1
+
+
+_limiters: Dict[str, ResourceLimiter] = {}
+_lock = threading.Lock()
+
+
+def resource_limit(name: str) -> Optional[int]:
+    """
+    获取资源的并发上限，未配置时返回 None（不限制）
+
+    Args:
+        name: 资源名，如 "pdf"，或带子类的 "llm:kimi"
+    """
+    kind, _, sub = name.partition(":")
+    limit = SCHEDULER_CONFIG["resource_limits"].get(kind)
+    if isinstance(limit, dict):
+        limit = limit.get(sub, limit.get("default"))
+    return limit or None
+
+
+def _get_limiter(name: str) -> Optional[ResourceLimiter]:
+    limit = resource_limit(name)
+    if limit is None:
+        return None
+    with _lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = _limiters[name] = ResourceLimiter(limit)
+    return limiter
+
+
+@asynccontextmanager
+async def limited(name: str):
+    """在资源的并发上限内执行（异步）；与 limited_sync 共用同一个计数"""
+    limiter = _get_limiter(name)
+    if limiter is None:
+        yield
+        return
+    await limiter.acquire_async()
+    try:
+        yield
+    finally:
+        limiter.release()
+
+
+@contextmanager
+def limited_sync(name: str):
+    """在资源的并发上限内执行（线程）；与 limited 共用同一个计数"""
+    limiter = _get_limiter(name)
+    if limiter is None:
+        yield
+        return
+    limiter.acquire()
+    try:
+        yield
+    finally:
+        limiter.release()
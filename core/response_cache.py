@@ -0,0 +1,308 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+import redis
+
+from config.api_config import CACHE_CONFIG
+from config.redis_config import REDIS_HOST, REDIS_PORT, REDIS_APP_DB, REDIS_PASSWORD
+
+
+def make_cache_key(provider: str, model: str, temperature: float, max_tokens: int, prompt: str) -> str:
+    """根据模型参数和提示词内容生成缓存键"""
+    prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+    raw_key = f"{provider}|{model}|{temperature}|{max_tokens}|{prompt_hash}"
+    return hashlib.sha256(raw_key.encode('utf-8')).hexdigest()
+
+
+class BaseCache(ABC):
+    """响应缓存基类，统计命中与未命中次数"""
+    
+    # 读写是否会阻塞（需要网络往返），异步调用方据此决定是否放到线程中执行
+    blocking = False
+    
+    def __init__(self, max_entries: int, ttl: int = 0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[str]:
+        """读取缓存，并更新命中统计"""
+        value = self._get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+    
+    def set(self, key: str, value: str) -> None:
+        """写入缓存"""
+        self._set(key, value)
+    
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        total = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "size": self.size(),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+    
+    @abstractmethod
+    def _get(self, key: str) -> Optional[str]:
+        pass
+    
+    @abstractmethod
+    def _set(self, key: str, value: str) -> None:
+        pass
+    
+    @abstractmethod
+    def size(self) -> int:
+        pass
+    
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+
+class MemoryCache(BaseCache):
+    """进程内 LRU 缓存"""
+    
+    def __init__(self, max_entries: int = 1000, ttl: int = 0):
+        super().__init__(max_entries, ttl)
+        # key -> (过期时间戳, 值)，过期时间为 0 表示不过期
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at and expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+    
+    def _set(self, key: str, value: str) -> None:
+        expires_at = time.time() + self.ttl if self.ttl else 0
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+    
+    def size(self) -> int:
+        return len(self._data)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCache(BaseCache):
+    """Redis 缓存，多进程共享，按 TTL 过期并按最近访问时间淘汰"""
+    
+    blocking = True
+    
+    def __init__(self, max_entries: int = 1000, ttl: int = 0, prefix: str = "llm_cache:",
+                 client: Optional[redis.Redis] = None):
+        super().__init__(max_entries, ttl)
+        self.prefix = prefix
+        # 有序集合记录每个键最近一次访问的时间，用于超出容量时淘汰
+        self.index_key = f"{prefix}index"
+        self.client = client or redis.Redis(
+            host=REDIS_HOST,
+            port=REDIS_PORT,
+            db=REDIS_APP_DB,
+            password=REDIS_PASSWORD,
+            decode_responses=True,
+            socket_timeout=5,
+            socket_connect_timeout=5
+        )
+    
+    def _get(self, key: str) -> Optional[str]:
+        try:
+            value = self.client.get(self.prefix + key)
+            if value is None:
+                # 条目已过期，同步清理索引
+                self.client.zrem(self.index_key, key)
+            else:
+                self.client.zadd(self.index_key, {key: time.time()})
+            return value
+        except redis.RedisError as e:
+            print(f"读取响应缓存失败: {e}")
+            return None
+    
+    def _set(self, key: str, value: str) -> None:
+        try:
+            pipe = self.client.pipeline()
+            pipe.set(self.prefix + key, value, ex=self.ttl or None)
+            pipe.zadd(self.index_key, {key: time.time()})
+            pipe.zcard(self.index_key)
+            size = pipe.execute()[-1]
+            
+            overflow = size - self.max_entries
+            if overflow > 0:
+                evicted = [member for member, _ in self.client.zpopmin(self.index_key, overflow)]
+                if evicted:
+                    self.client.delete(*[self.prefix + k for k in evicted])
+        except redis.RedisError as e:
+            print(f"写入响应缓存失败: {e}")
+    
+    def size(self) -> int:
+        try:
+            return self.client.zcard(self.index_key)
+        except redis.RedisError:
+            return 0
+    
+    def clear(self) -> None:
+        keys = [self.prefix + k for k in self.client.zrange(self.index_key, 0, -1)]
+        self.client.delete(self.index_key, *keys)
+
+
+class DiskCache(BaseCache):
+    """本地磁盘缓存，同一台机器上的多个进程共享，按最近访问时间（文件修改时间）淘汰"""
+    
+    # 每写入多少次检查一次容量，避免每次写入都遍历目录
+    prune_interval = 50
+    
+    def __init__(self, directory: str, max_entries: int = 1000, ttl: int = 0):
+        super().__init__(max_entries, ttl)
+        self.directory = directory
+        self._writes = 0
+        os.makedirs(directory, exist_ok=True)
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+    
+    def _get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            if self.ttl and time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                value = f.read()
+            # 更新修改时间作为最近访问时间
+            os.utime(path)
+            return value
+        except OSError:
+            return None
+    
+    def _set(self, key: str, value: str) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 先写临时文件再原子替换，其他进程不会读到写了一半的内容
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(value)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"写入磁盘缓存失败: {e}")
+            return
+        self._writes += 1
+        if self._writes % self.prune_interval == 0:
+            self._prune()
+    
+    def _entries(self):
+        for sub in os.scandir(self.directory):
+            if sub.is_dir():
+                for entry in os.scandir(sub.path):
+                    if not entry.name.endswith(".tmp"):
+                        yield entry
+    
+    def _prune(self) -> None:
+        """超出容量时删除最久未访问的条目"""
+        try:
+            entries = sorted(self._entries(), key=lambda e: e.stat().st_mtime)
+            for entry in entries[:max(0, len(entries) - self.max_entries)]:
+                os.remove(entry.path)
+        except OSError as e:
+            print(f"清理磁盘缓存失败: {e}")
+    
+    def size(self) -> int:
+        try:
+            return sum(1 for _ in self._entries())
+        except OSError:
+            return 0
+    
+    def clear(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory, exist_ok=True)
+
+
+class TieredCache(BaseCache):
+    """两级缓存：先查内存，未命中再查共享的下一级缓存，命中后回填内存"""
+    
+    def __init__(self, memory: MemoryCache, shared: BaseCache):
+        super().__init__(memory.max_entries, memory.ttl)
+        self.memory = memory
+        self.shared = shared
+        self.blocking = shared.blocking
+    
+    def _get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+    
+    def _set(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        self.shared.set(key, value)
+    
+    def size(self) -> int:
+        return self.memory.size()
+    
+    def clear(self) -> None:
+        self.memory.clear()
+        self.shared.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["memory"] = self.memory.stats()
+        stats["shared"] = self.shared.stats()
+        return stats
+
+
+def create_cache(config: Dict[str, Any] = CACHE_CONFIG) -> Optional[BaseCache]:
+    """根据配置创建缓存实例，未启用时返回 None"""
+    if not config.get("enabled"):
+        return None
+    backend = config.get("backend", "memory")
+    if backend == "memory":
+        return MemoryCache(config["max_entries"], config.get("ttl", 0))
+    elif backend == "redis":
+        return RedisCache(config["max_entries"], config.get("ttl", 0), config.get("redis_prefix", "llm_cache:"))
+    raise ValueError(f"不支持的缓存后端: {backend}")
+
+
+_default_cache: Optional[BaseCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> Optional[BaseCache]:
+    """获取进程内共享的默认缓存实例"""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = create_cache()
+    return _default_cache
@@ -0,0 +1,27 @@
+from typing import Optional
+
+# tiktoken 首次使用时需要加载编码表，离线环境下可能失败，此时按字符数估算
+_encoding = None
+_encoding_failed = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            print(f"tiktoken 编码表加载失败，改为按字符数估算token: {e}")
+            _encoding_failed = True
+    return _encoding
+
+
+def count_tokens(text: Optional[str]) -> int:
+    """统计文本的 token 数量"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text)
+    return len(encoding.encode(text))
@@ -0,0 +1,129 @@
+import asyncio
+from typing import Optional, Dict, Any, List, AsyncIterator, Callable
+
+import redis
+import redis.asyncio as aioredis
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
+
+from config.redis_config import (
+    REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_PASSWORD, REDIS_SCAN_BATCH_SIZE,
+    REDIS_MAX_CONNECTIONS, REDIS_HEALTH_CHECK_INTERVAL, REDIS_RETRY_ATTEMPTS,
+    REDIS_RETRY_BACKOFF_BASE, REDIS_RETRY_BACKOFF_CAP, REDIS_TOPIC_FALLBACK
+)
+from .redis_loader import (
+    topic_prefix, escape_glob, is_unscoped_key, is_app_key, group_keys_by_type, queue_value_fetches, collect_values
+)
+
+
+def create_async_pool(db: int = REDIS_DB) -> aioredis.ConnectionPool:
+    """创建异步连接池：空闲连接健康检查，连接错误和超时按指数退避重试"""
+    return aioredis.ConnectionPool(
+        host=REDIS_HOST,
+        port=REDIS_PORT,
+        db=db,
+        password=REDIS_PASSWORD,
+        decode_responses=True,
+        socket_timeout=5,
+        socket_connect_timeout=5,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+        retry=Retry(
+            ExponentialBackoff(cap=REDIS_RETRY_BACKOFF_CAP, base=REDIS_RETRY_BACKOFF_BASE),
+            REDIS_RETRY_ATTEMPTS
+        ),
+        retry_on_error=[redis.ConnectionError, redis.TimeoutError]
+    )
+
+
+class AsyncRedisLoader:
+    """基于 redis.asyncio 的数据读取器，供API服务在事件循环中并发读取数据"""
+    
+    def __init__(self, pool: Optional[aioredis.ConnectionPool] = None, batch_size: Optional[int] = None):
+        self.pool = pool or create_async_pool()
+        self.client = aioredis.Redis(connection_pool=self.pool)
+        self.batch_size = batch_size or REDIS_SCAN_BATCH_SIZE
+
+    async def connect(self, attempts: int = REDIS_RETRY_ATTEMPTS) -> bool:
+        """检查连接是否可用，失败时按指数退避重试；最终失败不抛出异常，后续请求时会自动重连"""
+        delay = REDIS_RETRY_BACKOFF_BASE
+        for attempt in range(1, attempts + 1):
+            if await self.ping():
+                return True
+            print(f"Redis连接失败（第 {attempt}/{attempts} 次），{delay:.1f} 秒后重试...")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, REDIS_RETRY_BACKOFF_CAP)
+        print(f"无法连接Redis {REDIS_HOST}:{REDIS_PORT}，将在读取数据时重试")
+        return False
+
+    async def ping(self) -> bool:
+        """健康检查"""
+        try:
+            return await self.client.ping()
+        except redis.RedisError as e:
+            print(f"Redis健康检查失败: {e}")
+            return False
+
+    async def close(self) -> None:
+        """关闭客户端并断开连接池中的所有连接"""
+        await self.client.aclose()
+        await self.pool.disconnect()
+
+    async def _iter_key_batches(self, match: Optional[str] = None,
+                                key_filter: Optional[Callable[[str], bool]] = None) -> AsyncIterator[List[str]]:
+        """使用SCAN增量遍历键空间，按 batch_size 分批返回，可按 key_filter 过滤；应用自身写入的键始终跳过"""
+        seen = set()
+        batch = []
+        cursor = 0
+        while True:
+            cursor, keys = await self.client.scan(cursor=cursor, match=match, count=self.batch_size)
+            for key in keys:
+                if key in seen or is_app_key(key) or (key_filter is not None and not key_filter(key)):
+                    continue
+                seen.add(key)
+                batch.append(key)
+                if len(batch) >= self.batch_size:
+                    yield batch
+                    batch = []
+            if cursor == 0:
+                break
+        if batch:
+            yield batch
+
+    async def _load_batch(self, keys: List[str], data: Dict[str, Any], prefix: str = "",
+                          start_date: Optional[str] = None, end_date: Optional[str] = None) -> None:
+        """读取一批键：一个管道查询类型，另一个管道按类型分组读取值"""
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.type(key)
+            grouped = group_keys_by_type(keys, await pipe.execute(raise_on_error=False))
+        
+        async with self.client.pipeline(transaction=False) as pipe:
+            fetched = queue_value_fetches(pipe, grouped, prefix, start_date, end_date)
+            if len(pipe) == 0:
+                return
+            results = await pipe.execute(raise_on_error=False)
+        collect_values(results, grouped, fetched, data, prefix, start_date, end_date)
+
+    async def get_all_data(self, topic: Optional[str] = None, start_date: Optional[str] = None,
+                           end_date: Optional[str] = None) -> Dict[str, Any]:
+        """
+        异步读取数据，参数含义与 RedisLoader.get_all_data 相同
+        
+        Args:
+            topic: 话题，指定时只读取该话题前缀下的键（返回的键名不含前缀）
+            start_date: 开始日期（YYYY-MM-DD）
+            end_date: 结束日期（YYYY-MM-DD），包含当天
+        """
+        prefix = topic_prefix(topic)
+        data = {}
+        match = escape_glob(prefix) + "*" if prefix else None
+        async for keys in self._iter_key_batches(match):
+            await self._load_batch(keys, data, prefix, start_date, end_date)
+        
+        if prefix and not data and REDIS_TOPIC_FALLBACK:
+            # 只读取不属于任何话题的键，避免把其他话题的数据混入报告
+            print(f"话题 {topic} 下没有数据，改为读取未按话题划分的数据")
+            async for keys in self._iter_key_batches(key_filter=is_unscoped_key):
+                await self._load_batch(keys, data, "", start_date, end_date)
+        return data
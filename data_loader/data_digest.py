@@ -0,0 +1,256 @@
+import json
+import re
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, List, Tuple, Optional
+
+from config.report_config import DIGEST_CONFIG
+from core.token_counter import count_tokens
+
+_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+_DATETIME_RE = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}')
+_PCT_COUNT_RE = re.compile(r'^\s*(-?\d+(?:\.\d+)?)\s*\|\s*(\d+)\s*$')
+
+
+def _to_number(value) -> Optional[float]:
+    """将 Redis 中的字符串数值转换为数字，无法转换时返回 None"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            number = float(value)
+        except ValueError:
+            return None
+        return int(number) if number.is_integer() else number
+    return None
+
+
+def _round(value: float, digits: int = 1):
+    rounded = round(value, digits)
+    return int(rounded) if float(rounded).is_integer() else rounded
+
+
+def format_data(data) -> str:
+    """将数据格式化为提示词中使用的紧凑文本（JSON，不转义中文）"""
+    if isinstance(data, str):
+        return data
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+class DataDigest:
+    """数据摘要：将 Redis 原始数据转换为紧凑的统计摘要，减少提示词 token 数"""
+    
+    def __init__(self, top_k: Optional[int] = None, max_series_points: Optional[int] = None,
+                 max_text_length: Optional[int] = None):
+        self.top_k = top_k or DIGEST_CONFIG["top_k"]
+        self.max_series_points = max_series_points or DIGEST_CONFIG["max_series_points"]
+        self.max_text_length = max_text_length or DIGEST_CONFIG["max_text_length"]
+
+    def digest(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        生成数据摘要
+        
+        Args:
+            data: RedisLoader 读取的原始数据
+            
+        Returns:
+            与原始数据键名相同、值为紧凑摘要的字典
+        """
+        result = OrderedDict()
+        for key, value in data.items():
+            try:
+                result[key] = self._digest_value(key, value)
+            except Exception as e:
+                print(f"生成 {key} 的摘要失败，保留原始数据: {e}")
+                result[key] = value
+        return dict(result)
+
+    def token_report(self, raw_data: Dict[str, Any], digest: Dict[str, Any], prompt_count: int = 7) -> Dict[str, Any]:
+        """
+        统计摘要节省的 token 数
+        
+        Args:
+            raw_data: 原始数据
+            digest: 摘要数据
+            prompt_count: 每份报告中嵌入数据的提示词数量（大纲 + 6 个部分）
+        """
+        raw_tokens = count_tokens(str(raw_data))
+        digest_tokens = count_tokens(format_data(digest))
+        saved = raw_tokens - digest_tokens
+        return {
+            "raw_tokens": raw_tokens,
+            "digest_tokens": digest_tokens,
+            "saved_tokens_per_prompt": saved,
+            "saved_tokens_per_report": saved * prompt_count,
+            "saved_ratio": round(saved / raw_tokens, 3) if raw_tokens else 0.0
+        }
+
+    def _digest_value(self, key: str, value):
+        """按值的结构选择摘要方式"""
+        if isinstance(value, str):
+            number = _to_number(value)
+            if number is not None:
+                return number
+            return self._truncate(value) if len(value) > self.max_text_length * 3 else value
+        if isinstance(value, dict):
+            return self._digest_dict(key, value)
+        if isinstance(value, (list, tuple)):
+            return self._digest_list(value)
+        return value
+
+    def _digest_dict(self, key: str, value: Dict[str, Any]):
+        if not value:
+            return {}
+        keys = list(value.keys())
+        if all(_DATE_RE.match(k) for k in keys):
+            return self._digest_daily_series(value)
+        if all(_DATETIME_RE.match(k) for k in keys):
+            return self._digest_hourly_series(value)
+        
+        values = list(value.values())
+        if all(isinstance(v, str) and _PCT_COUNT_RE.match(v) for v in values):
+            return self._digest_pct_count(value)
+        
+        numbers = [_to_number(v) for v in values]
+        if all(n is not None for n in numbers):
+            labels = [self._clean_label(k) for k in keys]
+            if 'percent' in key.lower():
+                return self._digest_percentages(labels, numbers)
+            return self._digest_counts(labels, numbers)
+        
+        # 结构未知的哈希，只做截断
+        return {k: self._digest_value(k, v) for k, v in list(value.items())[:self.top_k]}
+
+    def _digest_list(self, value):
+        items = list(value)
+        # 有序集合: [[成员, 分数], ...]
+        if items and all(isinstance(i, (list, tuple)) and len(i) == 2 and _to_number(i[1]) is not None for i in items):
+            ranked = sorted(((str(m), _to_number(s)) for m, s in items), key=lambda x: x[1], reverse=True)
+            return {
+                "count": len(ranked),
+                "top": [[self._truncate(m), _round(s)] for m, s in ranked[:self.top_k]]
+            }
+        # 字符串列表: 去重后截断
+        seen = OrderedDict()
+        for item in items:
+            text = self._truncate(str(item).strip())
+            if text and text not in seen:
+                seen[text] = None
+        return list(seen.keys())[:self.top_k]
+
+    def _digest_daily_series(self, value: Dict[str, Any]) -> Dict[str, Any]:
+        """按日期的序列：总量、日均、峰值以及（必要时按周分箱的）序列"""
+        series = sorted((k, _to_number(v) or 0) for k, v in value.items())
+        total = sum(v for _, v in series)
+        peak_day, peak_value = max(series, key=lambda x: x[1])
+        summary = {
+            "range": f"{series[0][0]}~{series[-1][0]}",
+            "total": total,
+            "daily_avg": _round(total / len(series)),
+            "peak": [peak_day, peak_value],
+        }
+        if len(series) <= self.max_series_points:
+            summary["daily"] = {k[5:]: v for k, v in series}
+        else:
+            summary["weekly"] = self._bin_series(series, lambda d: d.isocalendar()[:2], "%Y-%m-%d")
+        return summary
+
+    def _digest_hourly_series(self, value: Dict[str, Any]) -> Dict[str, Any]:
+        """按小时的序列：总量、峰值时段、按天汇总和按时段的平均值"""
+        series = sorted((k, _to_number(v) or 0) for k, v in value.items())
+        total = sum(v for _, v in series)
+        peaks = sorted(series, key=lambda x: x[1], reverse=True)[:3]
+        
+        daily = OrderedDict()
+        by_hour = [[0, 0] for _ in range(24)]
+        for k, v in series:
+            daily[k[:10]] = daily.get(k[:10], 0) + v
+            hour = int(k[11:13])
+            by_hour[hour][0] += v
+            by_hour[hour][1] += 1
+        
+        # 24 小时合并为 6 个 4 小时时段，记录平均值
+        periods = {}
+        for start in range(0, 24, 4):
+            bucket = by_hour[start:start + 4]
+            count = sum(c for _, c in bucket)
+            if count:
+                periods[f"{start:02d}-{start + 4:02d}时"] = _round(sum(s for s, _ in bucket) / count)
+        
+        return {
+            "range": f"{series[0][0][:13]}~{series[-1][0][:13]}",
+            "points": len(series),
+            "total": total,
+            "avg": _round(total / len(series)),
+            "peaks": [[k[5:13].replace('T', ' ') + "时", v] for k, v in peaks],
+            "daily": {k[5:]: v for k, v in daily.items()},
+            "avg_by_period": periods
+        }
+
+    def _bin_series(self, series: List[Tuple[str, float]], bucket_of, date_format: str) -> Dict[str, float]:
+        """将日期序列按 bucket_of 分箱求和，键为每个箱的起始日期"""
+        bins = OrderedDict()
+        for day, v in series:
+            bucket = bucket_of(datetime.strptime(day, date_format))
+            if bucket not in bins:
+                bins[bucket] = [day, 0]
+            bins[bucket][1] += v
+        return {start[5:]: total for start, total in bins.values()}
+
+    def _digest_pct_count(self, value: Dict[str, str]) -> Dict[str, Any]:
+        """形如 "占比|数量" 的分类数据"""
+        rows = []
+        for k, v in value.items():
+            pct, count = _PCT_COUNT_RE.match(v).groups()
+            rows.append((self._clean_label(k) or "未分类", _round(float(pct)), int(count)))
+        rows.sort(key=lambda r: r[2], reverse=True)
+        return {
+            "total": sum(r[2] for r in rows),
+            "items": [[name, f"{pct}%", count] for name, pct, count in rows[:self.top_k]],
+            "others_count": len(rows) - min(len(rows), self.top_k)
+        }
+
+    def _digest_percentages(self, labels: List[str], numbers: List[float]) -> Dict[str, str]:
+        """百分比数据：保留一位小数并按占比降序"""
+        rows = sorted(zip(labels, numbers), key=lambda r: r[1], reverse=True)
+        return {label: f"{_round(n)}%" for label, n in rows}
+
+    def _digest_counts(self, labels: List[str], numbers: List[float]) -> Dict[str, Any]:
+        """计数数据：总量 + 前 top_k 项（含占比）+ 其余项合计"""
+        rows = sorted(zip(labels, numbers), key=lambda r: r[1], reverse=True)
+        total = sum(numbers)
+        top = rows[:self.top_k]
+        summary = {
+            "total": total,
+            "top": [[label, n, f"{_round(n * 100 / total)}%" if total else "0%"] for label, n in top]
+        }
+        rest = rows[self.top_k:]
+        if rest:
+            summary["others_count"] = len(rest)
+            summary["others_total"] = sum(n for _, n in rest)
+        return summary
+
+    def _clean_label(self, label: str) -> str:
+        """清理标签：形如 {"key_words":"xx"} 的 JSON 键只保留取值"""
+        if label.startswith('{') and label.endswith('}'):
+            try:
+                parsed = json.loads(label)
+                if isinstance(parsed, dict) and len(parsed) == 1:
+                    return str(next(iter(parsed.values())))
+            except json.JSONDecodeError:
+                pass
+        return label
+
+    def _truncate(self, text: str) -> str:
+        if len(text) <= self.max_text_length:
+            return text
+        return text[:self.max_text_length] + "…"
+
+
+def digest_with_stats(data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """生成数据摘要及token统计；模块级函数，可直接提交到进程池执行"""
+    digester = DataDigest()
+    digest = digester.digest(data)
+    return digest, digester.token_report(data, digest)
@@ -1,10 +1,162 @@
 import redis
 import json
-from typing import Optional, Dict, Any
-from config.redis_config import REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_PASSWORD
+import re
+from datetime import datetime, timedelta
+from fnmatch import fnmatchcase
+from typing import Optional, Dict, Any, List, Iterator, Tuple, Callable
+from config.redis_config import (
+    REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_PASSWORD, REDIS_SCAN_BATCH_SIZE,
+    REDIS_TOPIC_KEY_PREFIX, REDIS_TOPIC_FALLBACK, REDIS_DATE_SERIES_KEYS
+)
+from config.task_config import TASK_STORE_CONFIG, TASK_QUEUE_CONFIG
+from config.api_config import CACHE_CONFIG
+
+# 支持读取的数据类型，按类型分组批量读取
+SUPPORTED_TYPES = ('string', 'hash', 'list', 'zset')
+
+# 任务存储、任务队列和模型响应缓存写入的键前缀，读取数据时始终跳过
+APP_KEY_PREFIXES = (
+    TASK_STORE_CONFIG["key_prefix"],
+    TASK_QUEUE_CONFIG["key_prefix"],
+    CACHE_CONFIG["redis_prefix"],
+)
+
+
+def parse_value(key_type: str, value):
+    """将从Redis读取的原始值转换为报告使用的数据结构"""
+    if key_type == 'string':
+        try:
+            return json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return value
+    return value
+
+
+def is_date_series(key: str) -> bool:
+    """判断键是否为按日期组织的序列"""
+    return any(fnmatchcase(key, pattern) for pattern in REDIS_DATE_SERIES_KEYS)
+
+
+def topic_prefix(topic: Optional[str]) -> str:
+    """获取话题对应的键前缀，未指定话题时为空"""
+    return REDIS_TOPIC_KEY_PREFIX.format(topic=topic) if topic else ""
+
+
+def is_unscoped_key(key: str) -> bool:
+    """是否为未按话题划分的键（不含话题分隔符），话题下没有数据时只回退读取这类键"""
+    separator = REDIS_TOPIC_KEY_PREFIX.replace("{topic}", "")
+    return not separator or separator not in key
+
+
+def is_app_key(key: str) -> bool:
+    """是否为应用自身（任务存储、任务队列、响应缓存）写入的键，这类键不属于报告数据"""
+    return key.startswith(APP_KEY_PREFIXES)
+
+
+def escape_glob(text: str) -> str:
+    """转义SCAN MATCH中的通配符"""
+    return re.sub(r'([*?\[\]\\])', r'\\\1', text)
+
+
+def date_score_range(start_date: Optional[str], end_date: Optional[str]) -> Tuple[str, str]:
+    """将日期范围转换为有序集合的分数范围（Unix时间戳，结束日期包含当天）"""
+    min_score = str(datetime.strptime(start_date, "%Y-%m-%d").timestamp()) if start_date else "-inf"
+    if end_date:
+        end = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)
+        max_score = f"({end.timestamp()}"
+    else:
+        max_score = "+inf"
+    return min_score, max_score
+
+
+def filter_series_by_date(value, start_date: Optional[str], end_date: Optional[str]):
+    """按日期范围过滤序列：哈希按字段的日期前缀过滤，其余类型原样返回"""
+    if not isinstance(value, dict) or not (start_date or end_date):
+        return value
+    return {
+        field: v for field, v in value.items()
+        if (not start_date or field[:10] >= start_date) and (not end_date or field[:10] <= end_date)
+    }
+
+
+def filter_data_by_date(data: Dict[str, Any], start_date: Optional[str], end_date: Optional[str]) -> Dict[str, Any]:
+    """过滤数据中所有按日期组织的序列"""
+    return {
+        key: filter_series_by_date(value, start_date, end_date) if is_date_series(key) else value
+        for key, value in data.items()
+    }
+
+
+def group_keys_by_type(keys: List[str], key_types: List[Any]) -> Dict[str, List[str]]:
+    """按TYPE管道的结果将键分组，跳过出错和不支持的类型"""
+    grouped: Dict[str, List[str]] = {t: [] for t in SUPPORTED_TYPES}
+    for key, key_type in zip(keys, key_types):
+        if isinstance(key_type, Exception):
+            print(f"处理键 {key} 时出错: {key_type}")
+        elif key_type in grouped:
+            grouped[key_type].append(key)
+        elif key_type != 'none':
+            print(f"暂不支持的类型: {key}，类型是：{key_type}")
+    return grouped
+
+
+def queue_value_fetches(pipe, grouped: Dict[str, List[str]], prefix: str = "",
+                        start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[Tuple[str, str]]:
+    """
+    向管道（同步或异步均可）中加入按类型分组的读取命令
+    
+    Returns:
+        除字符串外每条命令对应的 (键, 类型)，顺序与管道结果一致
+    """
+    fetched = []
+    if grouped['string']:
+        # 所有字符串键用一次MGET读取
+        pipe.mget(grouped['string'])
+    for key in grouped['hash']:
+        pipe.hgetall(key)
+        fetched.append((key, 'hash'))
+    for key in grouped['list']:
+        pipe.lrange(key, 0, -1)
+        fetched.append((key, 'list'))
+    for key in grouped['zset']:
+        if (start_date or end_date) and is_date_series(key[len(prefix):]):
+            # 分数为时间戳的序列直接在服务端按范围查询
+            pipe.zrangebyscore(key, *date_score_range(start_date, end_date), withscores=True)
+        else:
+            pipe.zrange(key, 0, -1, withscores=True)
+        fetched.append((key, 'zset'))
+    return fetched
+
+
+def collect_values(results: List[Any], grouped: Dict[str, List[str]], fetched: List[Tuple[str, str]],
+                   data: Dict[str, Any], prefix: str = "",
+                   start_date: Optional[str] = None, end_date: Optional[str] = None) -> None:
+    """将管道结果解析后写入 data，键名去掉话题前缀"""
+    results = list(results)
+    if grouped['string']:
+        values = results.pop(0)
+        if isinstance(values, Exception):
+            print(f"批量读取字符串键时出错: {values}")
+        else:
+            for key, value in zip(grouped['string'], values):
+                # 键可能在两次管道之间被删除
+                if value is not None:
+                    data[key[len(prefix):]] = parse_value('string', value)
+    
+    for (key, key_type), value in zip(fetched, results):
+        if isinstance(value, Exception):
+            print(f"处理键 {key} 时出错: {value}")
+            continue
+        name = key[len(prefix):]
+        value = parse_value(key_type, value)
+        if key_type == 'hash' and is_date_series(name):
+            value = filter_series_by_date(value, start_date, end_date)
+        data[name] = value
+
 
 class RedisLoader:
-    def __init__(self):
+    def __init__(self, batch_size: Optional[int] = None):
+        self.batch_size = batch_size or REDIS_SCAN_BATCH_SIZE
         try:
             self.client = redis.Redis(
                 host=REDIS_HOST,
@@ -34,36 +186,78 @@ class RedisLoader:
             print(f"Redis初始化错误: {e}")
             raise
 
-    def get_all_data(self) -> Dict[str, Any]:
-        """从Redis读取所有类型的数据"""
-        try:
-            keys = self.client.keys()
-            data = {}
+    def _iter_key_batches(self, match: Optional[str] = None,
+                          key_filter: Optional[Callable[[str], bool]] = None) -> Iterator[List[str]]:
+        """
+        使用SCAN增量遍历键空间，按 batch_size 分批返回（不会像KEYS那样阻塞服务器），可按 key_filter 过滤
+
+        应用自身写入的键（见 is_app_key）始终跳过。
+        """
+        seen = set()
+        batch = []
+        cursor = 0
+        while True:
+            cursor, keys = self.client.scan(cursor=cursor, match=match, count=self.batch_size)
             for key in keys:
-                try:
-                    key_type = self.client.type(key)
-                    if key_type == 'string':
-                        value = self.client.get(key)
-                        try:
-                            data[key] = json.loads(value)
-                        except json.JSONDecodeError:
-                            data[key] = value
-                    elif key_type == 'hash':
-                        value = self.client.hgetall(key)
-                        data[key] = value
-                    elif key_type == 'list':
-                        value = self.client.lrange(key, 0, -1)
-                        data[key] = value
-                    elif key_type == 'zset':
-                        value = self.client.zrange(key, 0, -1, withscores=True)
-                        data[key] = value
-                    else:
-                        print(f"暂不支持的类型: {key}，类型是：{key_type}")
-                except redis.RedisError as e:
-                    print(f"处理键 {key} 时出错: {e}")
+                # SCAN 可能重复返回同一个键
+                if key in seen or is_app_key(key) or (key_filter is not None and not key_filter(key)):
                     continue
+                seen.add(key)
+                batch.append(key)
+                if len(batch) >= self.batch_size:
+                    yield batch
+                    batch = []
+            if cursor == 0:
+                break
+        if batch:
+            yield batch
+
+    def _load_batch(self, keys: List[str], data: Dict[str, Any], prefix: str = "",
+                    start_date: Optional[str] = None, end_date: Optional[str] = None) -> None:
+        """
+        读取一批键：一个管道查询类型，另一个管道按类型分组读取值
+        
+        Args:
+            keys: 待读取的键
+            data: 结果字典，键名去掉话题前缀后写入
+            prefix: 话题前缀
+            start_date: 开始日期（YYYY-MM-DD），用于过滤按日期组织的序列
+            end_date: 结束日期（YYYY-MM-DD），包含当天
+        """
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.type(key)
+        grouped = group_keys_by_type(keys, pipe.execute(raise_on_error=False))
+        
+        pipe = self.client.pipeline(transaction=False)
+        fetched = queue_value_fetches(pipe, grouped, prefix, start_date, end_date)
+        if len(pipe) == 0:
+            return
+        collect_values(pipe.execute(raise_on_error=False), grouped, fetched, data, prefix, start_date, end_date)
+
+    def get_all_data(self, topic: Optional[str] = None, start_date: Optional[str] = None,
+                     end_date: Optional[str] = None) -> Dict[str, Any]:
+        """
+        从Redis读取数据（SCAN + 管道批量读取）
+        
+        Args:
+            topic: 话题，指定时只读取该话题前缀下的键（返回的键名不含前缀）
+            start_date: 开始日期（YYYY-MM-DD），按日期组织的序列只保留范围内的数据
+            end_date: 结束日期（YYYY-MM-DD），包含当天
+        """
+        try:
+            prefix = topic_prefix(topic)
+            data = {}
+            match = escape_glob(prefix) + "*" if prefix else None
+            for keys in self._iter_key_batches(match):
+                self._load_batch(keys, data, prefix, start_date, end_date)
+            
+            if prefix and not data and REDIS_TOPIC_FALLBACK:
+                # 只读取不属于任何话题的键，避免把其他话题的数据混入报告
+                print(f"话题 {topic} 下没有数据，改为读取未按话题划分的数据")
+                for keys in self._iter_key_batches(key_filter=is_unscoped_key):
+                    self._load_batch(keys, data, "", start_date, end_date)
             return data
         except redis.RedisError as e:
             print(f"获取数据时出错: {e}")
             raise
-
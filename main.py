@@ -1,4 +1,5 @@
 from data_loader.redis_loader import RedisLoader
+from data_loader.data_digest import DataDigest
 from report_generator.report_creator import ReportCreator
 from pdf_generator.pdf_maker import PDFMaker
 import json
@@ -26,6 +27,14 @@ def main():
             print(f"从备份文件读取数据也失败: {backup_e}")
             return
     
+    # 生成数据摘要，避免在每个提示词中嵌入完整的原始数据
+    digester = DataDigest()
+    digest = digester.digest(data)
+    stats = digester.token_report(data, digest)
+    print(f"数据摘要完成：{stats['raw_tokens']} → {stats['digest_tokens']} tokens，"
+          f"每份报告约节省 {stats['saved_tokens_per_report']} tokens")
+    data = digest
+    
     # 2. 调用大模型分段生成舆情报告
     print("\n2. 正在生成舆情报告...")
     report_creator = ReportCreator(api_name='kimi')  # 可以改成别的API
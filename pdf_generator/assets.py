@@ -0,0 +1,112 @@
+import os
+import sys
+import urllib.request
+from typing import Dict, Optional, List
+
+from config.pdf_config import PDF_CONFIG, PDF_ASSETS
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+# 已读入内存的脚本内容，按URL索引
+_asset_cache: Dict[str, bytes] = {}
+_missing_warned = set()
+
+
+def asset_url(name: str) -> str:
+    """获取脚本的固定版本URL（HTML中引用该URL，实际内容由请求拦截提供）"""
+    return PDF_ASSETS[name]["url"]
+
+
+def _read_asset(name: str) -> Optional[bytes]:
+    """读取本地脚本副本；plotly 缺少副本时，若 plotly Python 包内置的 plotly.js 版本相同则使用内置版本"""
+    path = os.path.join(ASSET_DIR, PDF_ASSETS[name]["file"])
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return f.read()
+    if name == "plotly":
+        try:
+            from plotly.offline import get_plotlyjs, get_plotlyjs_version
+            if get_plotlyjs_version() == PDF_ASSETS[name]["version"]:
+                return get_plotlyjs().encode('utf-8')
+        except Exception as e:
+            print(f"读取plotly内置脚本失败: {e}")
+    return None
+
+
+def load_asset_by_url(url: str) -> Optional[bytes]:
+    """按URL获取脚本内容，首次读取后缓存在内存中"""
+    if url in _asset_cache:
+        return _asset_cache[url]
+    for name, asset in PDF_ASSETS.items():
+        if asset["url"] == url:
+            content = _read_asset(name)
+            if content is not None:
+                _asset_cache[url] = content
+            elif name not in _missing_warned:
+                _missing_warned.add(name)
+                source = "离线模式下无法渲染" if PDF_CONFIG["offline"] else "将从CDN加载"
+                print(f"缺少本地脚本 {asset['file']}，{source}；请运行 python -m pdf_generator.assets 下载")
+            return content
+    return None
+
+
+def missing_assets() -> List[str]:
+    """本地没有可用副本的脚本名称"""
+    return [name for name, asset in PDF_ASSETS.items() if load_asset_by_url(asset["url"]) is None]
+
+
+def check_assets() -> None:
+    """
+    检查渲染所需的脚本是否都有本地副本
+
+    Raises:
+        RuntimeError: 离线模式下缺少脚本
+    """
+    missing = missing_assets()
+    if not missing:
+        return
+    files = "、".join(PDF_ASSETS[name]["file"] for name in missing)
+    if PDF_CONFIG["offline"]:
+        raise RuntimeError(
+            f"离线模式下缺少本地脚本 {files}，请运行 python -m pdf_generator.assets 下载到 {ASSET_DIR}，"
+            f"或把 PDF_CONFIG[\"offline\"] 设为 False 改为从CDN加载"
+        )
+    print(f"警告：缺少本地脚本 {files}，渲染时将从CDN加载")
+
+
+async def install_asset_routes(page) -> None:
+    """
+    为页面安装请求拦截：有本地副本的固定版本脚本从内存返回；
+    离线模式下拒绝其余外部请求，否则（包括缺少本地副本的脚本）正常访问网络
+    """
+    async def handle(route):
+        url = route.request.url
+        content = load_asset_by_url(url)
+        if content is not None:
+            await route.fulfill(status=200, content_type="application/javascript", body=content)
+        elif PDF_CONFIG["offline"] and url.startswith(("http://", "https://")):
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    await page.route("**/*", handle)
+
+
+def download_assets(force: bool = False) -> None:
+    """下载所有固定版本的脚本到 static 目录"""
+    os.makedirs(ASSET_DIR, exist_ok=True)
+    for name, asset in PDF_ASSETS.items():
+        path = os.path.join(ASSET_DIR, asset["file"])
+        if os.path.exists(path) and not force:
+            print(f"{asset['file']} 已存在，跳过")
+            continue
+        print(f"正在下载 {asset['url']} ...")
+        with urllib.request.urlopen(asset["url"], timeout=60) as response:
+            content = response.read()
+        with open(path, 'wb') as f:
+            f.write(content)
+        print(f"已保存 {path} ({len(content)} 字节)")
+
+
+if __name__ == "__main__":
+    download_assets(force="--force" in sys.argv)
@@ -0,0 +1,133 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, List, AsyncIterator
+
+from playwright.async_api import async_playwright, Browser, Page, Playwright
+
+from config.pdf_config import PDF_CONFIG
+from .assets import check_assets
+
+
+class BrowserPool:
+    """
+    长期运行的 Chromium 浏览器池
+    
+    每个页面在独立的浏览器上下文中打开（互不共享 Cookie、缓存等），同时打开的页面数受
+    max_pages 限制；浏览器打开 max_pages_per_browser 个页面后或崩溃断开后会重新启动，
+    旧浏览器在其上的页面全部关闭后关闭。
+    """
+    
+    def __init__(self, max_pages: Optional[int] = None, max_pages_per_browser: Optional[int] = None,
+                 launch_args: Optional[List[str]] = None):
+        self.max_pages = max_pages or PDF_CONFIG["max_pages"]
+        self.max_pages_per_browser = max_pages_per_browser or PDF_CONFIG["max_pages_per_browser"]
+        self.launch_args = launch_args if launch_args is not None else PDF_CONFIG["launch_args"]
+        
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._browser_pages = 0
+        # 每个浏览器上正在使用的页面数，以及等待页面全部关闭后再关闭的旧浏览器
+        self._active: Dict[Browser, int] = {}
+        self._retired: List[Browser] = []
+        self._lock = asyncio.Lock()
+        self._start_lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(self.max_pages)
+
+    @property
+    def started(self) -> bool:
+        return self._playwright is not None
+
+    async def start(self) -> None:
+        """
+        启动 Playwright 和第一个浏览器（首次获取页面时会自动调用）
+
+        Raises:
+            RuntimeError: 离线模式下缺少渲染所需的本地脚本
+        """
+        async with self._start_lock:
+            if self.started:
+                return
+            check_assets()
+            self._playwright = await async_playwright().start()
+            async with self._lock:
+                await self._launch()
+
+    async def stop(self) -> None:
+        """关闭所有浏览器并停止 Playwright"""
+        async with self._start_lock:
+            if not self.started:
+                return
+            async with self._lock:
+                for browser in list(self._active.keys()):
+                    await self._close_browser(browser)
+                self._browser = None
+                self._retired.clear()
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def _launch(self) -> None:
+        """启动新的浏览器，调用方需持有锁"""
+        old = self._browser
+        self._browser = await self._playwright.chromium.launch(args=self.launch_args)
+        self._browser_pages = 0
+        self._active[self._browser] = 0
+        print("浏览器池：已启动新的 Chromium 实例")
+        
+        if old is not None:
+            if self._active.get(old, 0) == 0:
+                await self._close_browser(old)
+            else:
+                self._retired.append(old)
+
+    async def _close_browser(self, browser: Browser) -> None:
+        self._active.pop(browser, None)
+        try:
+            if browser.is_connected():
+                await browser.close()
+        except Exception as e:
+            print(f"浏览器池：关闭浏览器时出错: {e}")
+
+    async def _acquire_browser(self) -> Browser:
+        async with self._lock:
+            if (self._browser is None
+                    or not self._browser.is_connected()
+                    or self._browser_pages >= self.max_pages_per_browser):
+                if self._browser is not None and not self._browser.is_connected():
+                    print("浏览器池：浏览器已断开，重新启动")
+                await self._launch()
+            self._browser_pages += 1
+            self._active[self._browser] += 1
+            return self._browser
+
+    async def _release_browser(self, browser: Browser) -> None:
+        async with self._lock:
+            if browser not in self._active:
+                return
+            self._active[browser] -= 1
+            if browser in self._retired and self._active[browser] == 0:
+                self._retired.remove(browser)
+                await self._close_browser(browser)
+
+    @asynccontextmanager
+    async def page(self, **context_options) -> AsyncIterator[Page]:
+        """
+        获取一个独立上下文中的页面，退出时关闭上下文
+        
+        Args:
+            **context_options: 传给 browser.new_context 的参数，如 viewport
+        """
+        if not self.started:
+            await self.start()
+        async with self._semaphore:
+            browser = await self._acquire_browser()
+            context = None
+            try:
+                context = await browser.new_context(**context_options)
+                yield await context.new_page()
+            finally:
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        print(f"浏览器池：关闭上下文时出错: {e}")
+                await self._release_browser(browser)
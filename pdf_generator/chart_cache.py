@@ -0,0 +1,43 @@
+import hashlib
+import json
+import threading
+from typing import Optional, Dict, Any
+
+from core.response_cache import BaseCache, MemoryCache, DiskCache, TieredCache
+from config.pdf_config import CHART_CACHE_CONFIG
+
+
+def make_chart_key(data, layout, chart_mode: str) -> str:
+    """根据规范化后的图表定义（键排序的紧凑JSON）和渲染方式生成缓存键"""
+    normalized = json.dumps(
+        {"data": data, "layout": layout},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(',', ':')
+    )
+    return hashlib.sha256(f"{chart_mode}|{normalized}".encode('utf-8')).hexdigest()
+
+
+def create_chart_cache(config: Dict[str, Any] = CHART_CACHE_CONFIG) -> Optional[BaseCache]:
+    """根据配置创建图表缓存，未启用时返回 None"""
+    if not config.get("enabled"):
+        return None
+    memory = MemoryCache(config["max_entries"])
+    if config.get("disk_dir"):
+        disk = DiskCache(config["disk_dir"], config.get("disk_max_entries", 5000))
+        return TieredCache(memory, disk)
+    return memory
+
+
+_chart_cache: Optional[BaseCache] = None
+_chart_cache_lock = threading.Lock()
+
+
+def get_chart_cache() -> Optional[BaseCache]:
+    """获取进程内共享的图表缓存实例"""
+    global _chart_cache
+    if _chart_cache is None:
+        with _chart_cache_lock:
+            if _chart_cache is None:
+                _chart_cache = create_chart_cache()
+    return _chart_cache
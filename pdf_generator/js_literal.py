@@ -0,0 +1,352 @@
+"""
+解析大模型在图表 <script> 中写出的 JavaScript 对象字面量。
+
+支持 JSON 之外 LLM 常见的写法：不带引号的键、单引号/反引号字符串、尾随逗号、
+// 和 /* */ 注释、undefined/NaN/Infinity、new Date('...')，以及引用前面已赋值的变量
+（如 var data = [trace1, trace2]）。
+解析器对源码做线性扫描（符合标准 JSON 的字面量直接交给 json 模块解析），
+出错时抛出带行列位置的 JSLiteralError。
+"""
+import json
+import re
+from typing import Any, Dict, Optional, Tuple
+
+_WHITESPACE = re.compile(r'\s+')
+_IDENTIFIER = re.compile(r'[A-Za-z_$][\w$]*(?:\.[A-Za-z_$][\w$]*)*')
+_NUMBER = re.compile(r'[+-]?(?:0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)')
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v', '0': '\0'}
+_CONSTANTS = {'true': True, 'false': False, 'null': None, 'undefined': None, 'NaN': None, 'Infinity': None}
+_JSON_DECODER = json.JSONDecoder()
+_PLOT_CALLS = ('Plotly.newPlot', 'Plotly.react', 'Plotly.plot')
+# 字符串内不含引号和反斜杠的连续片段
+_STRING_CHUNK = {quote: re.compile(f'[^{quote}\\\\]*') for quote in ('"', "'", '`')}
+
+
+class JSLiteralError(ValueError):
+    """字面量语法错误，position 为出错处的字符偏移"""
+
+    def __init__(self, message: str, text: str, position: int):
+        self.position = position
+        self.line = text.count('\n', 0, position) + 1
+        self.column = position - (text.rfind('\n', 0, position) + 1) + 1
+        super().__init__(f"{message}（第 {self.line} 行，第 {self.column} 列）")
+
+
+class _Parser:
+    def __init__(self, text: str, variables: Optional[Dict[str, Any]] = None):
+        self.text = text
+        self.pos = 0
+        # 已解析的变量，字面量中出现的同名标识符按其值解析
+        self.variables = variables if variables is not None else {}
+
+    def error(self, message: str, position: Optional[int] = None) -> JSLiteralError:
+        return JSLiteralError(message, self.text, self.pos if position is None else position)
+
+    def peek(self) -> str:
+        return self.text[self.pos] if self.pos < len(self.text) else ''
+
+    def skip_space(self) -> None:
+        """跳过空白和注释"""
+        text = self.text
+        while self.pos < len(text):
+            match = _WHITESPACE.match(text, self.pos)
+            if match:
+                self.pos = match.end()
+            elif text.startswith('//', self.pos):
+                end = text.find('\n', self.pos)
+                self.pos = len(text) if end == -1 else end + 1
+            elif text.startswith('/*', self.pos):
+                end = text.find('*/', self.pos + 2)
+                if end == -1:
+                    raise self.error("注释没有结束")
+                self.pos = end + 2
+            else:
+                break
+
+    def expect(self, char: str) -> None:
+        self.skip_space()
+        if self.peek() != char:
+            raise self.error(f"应为 '{char}'，实际为 {self.peek()!r}" if self.peek() else f"应为 '{char}'，文本已结束")
+        self.pos += 1
+
+    def parse_literal(self) -> Any:
+        """解析一个顶层字面量：先尝试标准JSON的快速路径，失败时再逐字符解析"""
+        self.skip_space()
+        if self.peek() in ('[', '{'):
+            try:
+                value, self.pos = _JSON_DECODER.raw_decode(self.text, self.pos)
+                return value
+            except ValueError:
+                pass
+        return self.parse_value()
+
+    def parse_value(self) -> Any:
+        self.skip_space()
+        char = self.peek()
+        if char == '{':
+            return self.parse_object()
+        if char == '[':
+            return self.parse_array()
+        if char in ('"', "'", '`'):
+            return self.parse_string()
+        match = _NUMBER.match(self.text, self.pos)
+        if match:
+            self.pos = match.end()
+            literal = match.group(0)
+            if 'x' in literal or 'X' in literal:
+                return int(literal, 16)
+            if re.fullmatch(r'[+-]?\d+', literal):
+                return int(literal)
+            return float(literal)
+        match = _IDENTIFIER.match(self.text, self.pos)
+        if match:
+            name = match.group(0)
+            if name in _CONSTANTS:
+                self.pos = match.end()
+                return _CONSTANTS[name]
+            if name == 'new':
+                return self.parse_date()
+            if name in self.variables:
+                self.pos = match.end()
+                return self.variables[name]
+            raise self.error(f"不支持的表达式 '{name}'")
+        if not char:
+            raise self.error("文本意外结束")
+        raise self.error(f"无法识别的字符 {char!r}")
+
+    def parse_object(self) -> Dict[str, Any]:
+        start = self.pos
+        self.pos += 1
+        result = {}
+        while True:
+            self.skip_space()
+            char = self.peek()
+            if char == '}':
+                self.pos += 1
+                return result
+            if not char:
+                raise self.error("对象没有闭合", start)
+            if char in ('"', "'", '`'):
+                key = self.parse_string()
+            else:
+                match = _IDENTIFIER.match(self.text, self.pos) or _NUMBER.match(self.text, self.pos)
+                if not match:
+                    raise self.error(f"无法识别的键 {char!r}")
+                key = match.group(0)
+                self.pos = match.end()
+            self.expect(':')
+            result[key] = self.parse_value()
+            self.skip_space()
+            if self.peek() == ',':
+                self.pos += 1
+            elif self.peek() != '}':
+                raise self.error("对象成员之间缺少逗号")
+
+    def parse_array(self) -> list:
+        start = self.pos
+        self.pos += 1
+        result = []
+        while True:
+            self.skip_space()
+            char = self.peek()
+            if char == ']':
+                self.pos += 1
+                return result
+            if not char:
+                raise self.error("数组没有闭合", start)
+            result.append(self.parse_value())
+            self.skip_space()
+            if self.peek() == ',':
+                self.pos += 1
+            elif self.peek() != ']':
+                raise self.error("数组元素之间缺少逗号")
+
+    def parse_string(self) -> str:
+        text = self.text
+        quote = text[self.pos]
+        start = self.pos
+        self.pos += 1
+        chunks = []
+        while True:
+            # 批量读取不含引号和反斜杠的片段
+            end = _STRING_CHUNK[quote].match(text, self.pos).end()
+            chunks.append(text[self.pos:end])
+            if end >= len(text):
+                raise self.error("字符串没有结束", start)
+            if text[end] == quote:
+                self.pos = end + 1
+                break
+            # 处理转义字符
+            escape = text[end + 1:end + 2]
+            if escape == 'u':
+                code = text[end + 2:end + 6]
+                if not re.fullmatch(r'[0-9a-fA-F]{4}', code):
+                    raise self.error("无效的 \\u 转义", end)
+                chunks.append(chr(int(code, 16)))
+                self.pos = end + 6
+            elif escape == 'x':
+                code = text[end + 2:end + 4]
+                if not re.fullmatch(r'[0-9a-fA-F]{2}', code):
+                    raise self.error("无效的 \\x 转义", end)
+                chunks.append(chr(int(code, 16)))
+                self.pos = end + 4
+            elif escape == '\n':
+                # 行尾反斜杠表示续行
+                self.pos = end + 2
+            else:
+                chunks.append(_ESCAPES.get(escape, escape))
+                self.pos = end + 2
+        value = ''.join(chunks)
+        if quote == '`' and '${' in value:
+            raise self.error("不支持带插值的模板字符串", start)
+        return value
+
+    def parse_date(self) -> Any:
+        """new Date('...') 取其中的字符串参数，其他构造调用不受支持"""
+        start = self.pos
+        self.pos += len('new')
+        self.skip_space()
+        match = _IDENTIFIER.match(self.text, self.pos)
+        if not match or match.group(0) != 'Date':
+            raise self.error("只支持 new Date(...)", start)
+        self.pos = match.end()
+        self.expect('(')
+        self.skip_space()
+        value = None if self.peek() == ')' else self.parse_value()
+        self.expect(')')
+        return value
+
+    def skip_expression(self) -> None:
+        """跳过一个任意表达式，停在同一层级的 ',' 或 ')' 处"""
+        depth = 0
+        while True:
+            self.skip_space()
+            char = self.peek()
+            if not char:
+                raise self.error("调用参数没有结束")
+            if char in ('"', "'", '`'):
+                self.parse_string()
+                continue
+            if char in '([{':
+                depth += 1
+            elif char in ')]}':
+                if depth == 0:
+                    return
+                depth -= 1
+            elif char == ',' and depth == 0:
+                return
+            self.pos += 1
+
+    def parse_argument(self) -> Tuple[str, Any]:
+        """解析绘图调用的参数：字面量返回 ("value", 值)，变量引用返回 ("name", 变量名)"""
+        self.skip_space()
+        if self.peek() in ('[', '{'):
+            return "value", self.parse_literal()
+        match = _IDENTIFIER.match(self.text, self.pos)
+        if match:
+            self.pos = match.end()
+            self.skip_space()
+            if self.peek() in (',', ')'):
+                return "name", match.group(0)
+        self.skip_expression()
+        return "unknown", None
+
+    def parse_plot_call(self) -> list:
+        """解析 Plotly.newPlot(目标, data, layout, ...) 的参数（第一个参数跳过）"""
+        self.expect('(')
+        self.skip_expression()
+        args = []
+        while self.peek() == ',':
+            self.pos += 1
+            self.skip_space()
+            if self.peek() == ')':
+                break
+            args.append(self.parse_argument())
+            self.skip_space()
+        self.expect(')')
+        return args
+
+
+def parse_js_literal(text: str, variables: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    解析一个完整的 JavaScript 字面量
+
+    Args:
+        text: 字面量源码
+        variables: 字面量中可引用的变量
+
+    Raises:
+        JSLiteralError: 语法错误或字面量后有多余内容
+    """
+    parser = _Parser(text, variables)
+    value = parser.parse_literal()
+    parser.skip_space()
+    if parser.peek() == ';':
+        parser.pos += 1
+        parser.skip_space()
+    if parser.pos != len(text):
+        raise parser.error("字面量之后存在多余内容")
+    return value
+
+
+def extract_chart_spec(js_code: str) -> Tuple[Any, Any]:
+    """
+    从图表脚本中提取 data 和 layout
+
+    依次识别 `const data = [...]` / `layout = {...}` 形式的赋值，以及
+    Plotly.newPlot(目标, data, layout) 调用中的字面量或变量引用；
+    调用参数是 {data: ..., layout: ...} 对象时也能识别。
+
+    Returns:
+        Tuple: (data, layout)，未找到的部分为 None
+
+    Raises:
+        JSLiteralError: 字面量存在语法错误
+    """
+    variables: Dict[str, Any] = {}
+    parser = _Parser(js_code, variables)
+    text = js_code
+    plot_args = None
+
+    while parser.pos < len(text):
+        parser.skip_space()
+        char = parser.peek()
+        if not char:
+            break
+        if char in ('"', "'", '`'):
+            parser.parse_string()
+            continue
+        match = _IDENTIFIER.match(text, parser.pos)
+        if not match or (parser.pos > 0 and (text[parser.pos - 1].isalnum() or text[parser.pos - 1] in '_$')):
+            parser.pos += 1
+            continue
+        name = match.group(0)
+        parser.pos = match.end()
+        parser.skip_space()
+        if name in _PLOT_CALLS and parser.peek() == '(':
+            if plot_args is None:
+                plot_args = parser.parse_plot_call()
+        elif parser.peek() == '=' and not text.startswith('==', parser.pos) and '.' not in name:
+            parser.pos += 1
+            parser.skip_space()
+            if parser.peek() in ('[', '{'):
+                variables[name] = parser.parse_literal()
+
+    data = variables.get("data")
+    layout = variables.get("layout")
+    if plot_args:
+        resolved = [
+            variables.get(value) if kind == "name" else value
+            for kind, value in plot_args
+        ]
+        first = resolved[0] if resolved else None
+        # Plotly.newPlot(目标, {data: [...], layout: {...}})
+        if isinstance(first, dict) and "data" in first:
+            data = first.get("data")
+            layout = first.get("layout", layout)
+        else:
+            if first is not None:
+                data = first
+            if len(resolved) > 1 and resolved[1] is not None:
+                layout = resolved[1]
+    return data, layout
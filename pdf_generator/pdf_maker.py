@@ -1,18 +1,55 @@
 import os
-from typing import Tuple, List
+from typing import Tuple, List, Optional
 import markdown
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString
 import asyncio
-from playwright.async_api import async_playwright
-import json
 import plotly.io as pio
 import plotly.graph_objects as go
 import re
 import base64
 import uuid
+from .browser_pool import BrowserPool
+from .assets import asset_url, install_asset_routes
+from .svg_charts import render_chart_svg, UnsupportedChartError
+from .chart_cache import make_chart_key, get_chart_cache
+from .js_literal import extract_chart_spec, JSLiteralError
+from core.executors import run_in_process
+from config.pdf_config import PDF_CONFIG
+
+# 优先使用 lxml 解析HTML，未安装时回退到内置解析器
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# 后处理时替换节点使用的标记，序列化后再换成对应的SVG/HTML片段
+FRAGMENT_MARKER = "@@REPORT_FRAGMENT@@"
+
+# 缓存的 Plotly 片段中使用的占位 div id，取出时替换为新的 id，避免同一页面内 id 重复
+CHART_ID_PLACEHOLDER = "__chart_id__"
+
+# 在进程池中生成HTML时，待渲染图表的位置标记，回到主进程查缓存/渲染后再替换
+CHART_MARKER = "@@REPORT_CHART@@"
+
 
 class PDFMaker:
-    def __init__(self):
+    def __init__(self, browser_pool: Optional[BrowserPool] = None, chart_mode: Optional[str] = None,
+                 chart_cache=None):
+        """
+        Args:
+            browser_pool: 共享的浏览器池；未提供时每次转换临时启动一个浏览器，
+                          供 Mermaid 预渲染和 PDF 打印共用
+            chart_mode: 图表渲染方式，"svg" 在Python中直接生成静态SVG，
+                        "plotly" 由页面中的 Plotly.js 绘制；默认读取 PDF_CONFIG
+            chart_cache: 图表渲染缓存；默认使用进程内共享的缓存（见 CHART_CACHE_CONFIG）。
+                         转换时缓存的读写都在当前进程完成，进程池只负责渲染未命中的图表
+        """
+        self.browser_pool = browser_pool
+        self.chart_cache = chart_cache if chart_cache is not None else get_chart_cache()
+        self.chart_mode = chart_mode or PDF_CONFIG["chart_mode"]
+        if self.chart_mode not in ("svg", "plotly"):
+            raise ValueError(f"不支持的图表渲染方式: {self.chart_mode}")
         # 配置plotly生成静态HTML
         pio.templates.default = "plotly_white"
         
@@ -104,200 +141,104 @@ class PDFMaker:
         
         return processed_content, diagrams
 
-    async def _pre_render_mermaid_to_svg(self, diagrams: List[str]) -> List[str]:
-        """预渲染Mermaid图表为SVG字符串"""
+    async def _pre_render_mermaid_to_svg(self, diagrams: List[str], pool: BrowserPool,
+                                         html_labels: bool = True) -> List[str]:
+        """
+        预渲染Mermaid图表为SVG字符串
+        
+        所有图表放在同一个页面中：只加载一次页面和mermaid.js，逐个做语法检查后
+        用一次 mermaid.run() 渲染，再通过一次 page.evaluate 取回全部SVG。
+        渲染失败的图表返回空字符串，并输出对应的错误。
+        html_labels 为 False 时节点文字使用纯SVG文本（不含 foreignObject），供 WeasyPrint 使用。
+        """
         if not diagrams:
             return []
-            
-        svg_outputs = []
-        async with async_playwright() as p:
-            browser = await p.chromium.launch()
-            page = await browser.new_page()
-            
-            for i, diagram in enumerate(diagrams):
-                try:
-                    # 预处理图表代码，确保语法正确
-                    diagram = diagram.strip()
-                    if not diagram.startswith('graph') and not diagram.startswith('flowchart'):
-                        # 使用字符串拼接而不是f-string包含\n
-                        diagram = "graph TD" + "\n" + diagram
-                    
-                    # 创建唯一ID，避免渲染冲突
-                    diagram_id = f"mermaid-{uuid.uuid4()}"
-                    
-                    # 创建一个临时HTML页面，使用Mermaid.js渲染图表
-                    html_content = f"""
-                    <!DOCTYPE html>
-                    <html>
-                    <head>
-                        <meta charset="UTF-8">
-                        <script src="https://cdn.jsdelivr.net/npm/mermaid@10/dist/mermaid.min.js"></script>
-                        <style>
-                            body {{ margin: 0; padding: 20px; }}
-                            #container {{ width: 800px; }}
-                        </style>
-                    </head>
-                    <body>
-                        <div id="container">
-                            <pre class="mermaid" id="{diagram_id}">
-                                {diagram}
-                            </pre>
-                        </div>
-                        <script>
-                            mermaid.initialize({{
-                                startOnLoad: true,
-                                theme: 'default',
-                                flowchart: {{
-                                    useMaxWidth: true,
-                                    htmlLabels: true
-                                }}
-                            }});
-                            
-                            // 等待页面加载完成
-                            window.addEventListener('load', async () => {{
-                                try {{
-                                    // 直接获取渲染后的SVG
-                                    await mermaid.run();
-                                    const svgElement = document.querySelector('#{diagram_id} svg');
-                                    window.renderedSVG = svgElement ? svgElement.outerHTML : '';
-                                    
-                                    // 设置标志通知完成
-                                    window.renderingDone = true;
-                                }} catch (error) {{
-                                    console.error('Mermaid渲染错误:', error);
-                                    window.renderingDone = true;
-                                    window.renderingError = error.toString();
-                                }}
-                            }});
-                        </script>
-                    </body>
-                    </html>
-                    """
-                    
-                    await page.set_content(html_content)
-                    
-                    # 等待渲染完成
-                    try:
-                        await page.wait_for_function('window.renderingDone === true', timeout=10000)
-                        svg_content = await page.evaluate('window.renderedSVG || ""')
-                        
-                        if svg_content:
-                            svg_outputs.append(svg_content)
-                            print(f"成功渲染图表 #{i+1}")
-                        else:
-                            error = await page.evaluate('window.renderingError || "未知错误"')
-                            print(f"图表 #{i+1} 渲染失败: {error}")
-                            svg_outputs.append("")
-                    except Exception as e:
-                        print(f"等待图表 #{i+1} 渲染时出错: {e}")
-                        svg_outputs.append("")
-                        
-                except Exception as e:
-                    print(f"处理图表 #{i+1} 时出错: {e}")
-                    svg_outputs.append("")
-                    
-            await browser.close()
-            
-        return svg_outputs
-
-    def _js_to_json(self, js_code: str) -> str:
-        """将JavaScript对象转换为JSON格式"""
-        if not js_code or not isinstance(js_code, str):
-            print(f"无效的JavaScript代码: {type(js_code)}")
-            return "{}"  # 返回空对象
         
-        # 检测空数组
-        if js_code.strip() == "[]":
-            print("检测到空数组")
-            return "[]"
-            
-        # 移除JavaScript注释
-        js_code = re.sub(r'//.*?\n|/\*.*?\*/', '', js_code, flags=re.DOTALL)
-        
-        # 替换JavaScript中的单引号为双引号
-        js_code = js_code.replace("'", '"')
+        prepared = []
+        for diagram in diagrams:
+            # 预处理图表代码，确保语法正确
+            diagram = diagram.strip()
+            if not diagram.startswith('graph') and not diagram.startswith('flowchart'):
+                diagram = "graph TD" + "\n" + diagram
+            prepared.append(diagram)
         
-        # 给没有引号的属性名添加双引号 (针对常见的JavaScript对象格式)
-        js_code = re.sub(r'(\s*)(\w+)(\s*:)', r'\1"\2"\3', js_code)
-        
-        # 处理最后一个属性后的逗号
-        js_code = re.sub(r',(\s*})', r'\1', js_code)
+        # mermaid.js 由请求拦截从本地副本提供
+        html_content = """
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <script src="MERMAID_URL"></script>
+            <style>
+                body { margin: 0; padding: 20px; }
+                #container { width: 800px; }
+            </style>
+        </head>
+        <body>
+            <div id="container"></div>
+        </body>
+        </html>
+        """.replace("MERMAID_URL", asset_url("mermaid"))
+        
+        # 图表代码通过参数传入并以 textContent 写入，避免HTML转义问题
+        render_script = """
+        async ({ diagrams, htmlLabels }) => {
+            mermaid.initialize({
+                startOnLoad: false,
+                theme: 'default',
+                htmlLabels: htmlLabels,
+                flowchart: { useMaxWidth: true, htmlLabels: htmlLabels }
+            });
+            const container = document.getElementById('container');
+            const errors = {};
+            for (let i = 0; i < diagrams.length; i++) {
+                const pre = document.createElement('pre');
+                pre.id = 'mermaid-' + i;
+                pre.textContent = diagrams[i];
+                container.appendChild(pre);
+                try {
+                    await mermaid.parse(diagrams[i]);
+                    pre.className = 'mermaid';
+                } catch (error) {
+                    // 语法错误的图表不参与渲染
+                    errors[i] = error.toString();
+                }
+            }
+            try {
+                await mermaid.run({ querySelector: 'pre.mermaid', suppressErrors: true });
+            } catch (error) {
+                console.error('Mermaid渲染错误:', error);
+            }
+            return diagrams.map((_, i) => {
+                const svg = document.querySelector('#mermaid-' + i + ' svg');
+                return {
+                    svg: svg ? svg.outerHTML : '',
+                    error: errors[i] || (svg ? '' : '未生成SVG')
+                };
+            });
+        }
+        """
         
-        # 处理函数调用和其他不兼容JSON的语法
-        js_code = re.sub(r'new Date\([^)]*\)', r'"2023-01-01"', js_code)  # 替换Date对象
-        js_code = re.sub(r'\w+\s*\([^)]*\)', r'"function_call"', js_code)  # 替换其他函数调用
+        try:
+            async with pool.page() as page:
+                await install_asset_routes(page)
+                await page.set_content(html_content, wait_until='load')
+                results = await asyncio.wait_for(
+                    page.evaluate(render_script, {"diagrams": prepared, "htmlLabels": html_labels}),
+                    timeout=PDF_CONFIG["mermaid_timeout"]
+                )
+        except Exception as e:
+            print(f"批量渲染Mermaid图表时出错: {e}")
+            return [""] * len(diagrams)
         
-        return js_code
-
-    def _extract_variable(self, js_code: str, var_name: str) -> Tuple[str, int]:
-        """从JavaScript代码中提取变量值"""
-        # 尝试匹配const/let/var声明
-        pattern1 = r'(?:const|let|var)?\s*' + re.escape(var_name) + r'\s*=\s*(.*?)(?:;|$)'
-        match = re.search(pattern1, js_code, re.DOTALL)
-        if match:
-            start_idx = match.start(1)
-            value = match.group(1).strip()
-            
-            if value.startswith('['):
-                return self._extract_balanced_brackets(js_code, start_idx, '[', ']')
-            elif value.startswith('{'):
-                return self._extract_balanced_brackets(js_code, start_idx, '{', '}')
-        
-        # 尝试匹配对象属性
-        pattern2 = r'[\'"]?' + re.escape(var_name) + r'[\'"]?\s*:\s*(.*?)(?:,|\}|$)'
-        match = re.search(pattern2, js_code, re.DOTALL)
-        if match:
-            start_idx = match.start(1)
-            value = match.group(1).strip()
-            
-            if value.startswith('['):
-                return self._extract_balanced_brackets(js_code, start_idx, '[', ']')
-            elif value.startswith('{'):
-                return self._extract_balanced_brackets(js_code, start_idx, '{', '}')
-        
-        # 尝试从Plotly.newPlot中提取
-        if var_name == "data":
-            pattern3 = r'Plotly\.newPlot\s*\([^,]*,\s*(\[.*)'
-            match = re.search(pattern3, js_code, re.DOTALL)
-            if match:
-                start_idx = match.start(1)
-                return self._extract_balanced_brackets(js_code, start_idx, '[', ']')
-        elif var_name == "layout":
-            pattern4 = r'Plotly\.newPlot\s*\([^,]*,\s*\[.*?\],\s*(\{.*)'
-            match = re.search(pattern4, js_code, re.DOTALL)
-            if match:
-                start_idx = match.start(1)
-                return self._extract_balanced_brackets(js_code, start_idx, '{', '}')
-        
-        return "", -1
-
-    def _extract_balanced_brackets(self, text: str, start_idx: int, open_bracket: str, close_bracket: str) -> Tuple[str, int]:
-        """从指定位置开始提取包含平衡括号的文本段"""
-        # 确保起始位置有效
-        if start_idx < 0 or start_idx >= len(text):
-            return "", -1
-            
-        # 找到开始括号的位置
-        open_pos = text.find(open_bracket, start_idx)
-        if open_pos == -1:
-            return "", -1
-            
-        # 计算嵌套的括号
-        balance = 1
-        pos = open_pos + 1
-        
-        while pos < len(text) and balance > 0:
-            if text[pos] == open_bracket:
-                balance += 1
-            elif text[pos] == close_bracket:
-                balance -= 1
-            pos += 1
-            
-        if balance != 0:
-            # 括号不平衡
-            return "", -1
-            
-        return text[open_pos:pos], open_pos
+        svg_outputs = []
+        for i, result in enumerate(results):
+            if result["svg"]:
+                print(f"成功渲染图表 #{i+1}")
+            else:
+                print(f"图表 #{i+1} 渲染失败: {result['error'] or '未知错误'}")
+            svg_outputs.append(result["svg"])
+        return svg_outputs
 
     def _create_fallback_chart(self, title: str = "数据图表") -> str:
         """创建备用图表"""
@@ -375,153 +316,207 @@ class PDFMaker:
                 
         return data, layout
 
-    def _extract_and_convert_charts(self, html_content: str) -> str:
-        """提取并转换图表为静态HTML"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        chart_divs = soup.find_all('div', class_='chart')
-        
-        for i, div in enumerate(chart_divs):
+    def _render_chart(self, data, layout) -> str:
+        """按 chart_mode 渲染单个图表，相同的图表定义直接使用缓存的渲染结果"""
+        key = make_chart_key(data, layout, self.chart_mode)
+        fragment = self.chart_cache.get(key) if self.chart_cache else None
+        if fragment is None:
+            fragment = self._render_chart_uncached(data, layout)
+            if self.chart_cache:
+                self.chart_cache.set(key, fragment)
+        return fragment.replace(CHART_ID_PLACEHOLDER, f"chart-{uuid.uuid4().hex}")
+
+    def _render_chart_uncached(self, data, layout) -> str:
+        """渲染单个图表；SVG 不支持的图表回退到 Plotly"""
+        if self.chart_mode == "svg":
             try:
-                script = div.find('script')
-                if script:
-                    # 提取JavaScript代码
-                    js_code = script.string
-                    if not js_code:
-                        print(f"图表 #{i} 没有找到脚本内容")
-                        continue
-                        
-                    print("\n======= 处理图表 #" + str(i) + " =======")
-                    
-                    # 尝试提取变量
-                    print("尝试提取data变量...")
-                    data_js, data_pos = self._extract_variable(js_code, "data")
-                    print("尝试提取layout变量...")
-                    layout_js, layout_pos = self._extract_variable(js_code, "layout")
-                    
-                    if data_js and layout_js:
-                        print(f"找到data和layout，长度: {len(data_js)}, {len(layout_js)}")
-                        # 转换为JSON
-                        try:
-                            data_json = self._js_to_json(data_js)
-                            layout_json = self._js_to_json(layout_js)
-                            
-                            # 打印处理后的JSON（前50个字符）
-                            print(f"处理后的data JSON: {data_json[:50]}...")
-                            print(f"处理后的layout JSON: {layout_json[:50]}...")
-                            
-                            # 解析JSON
-                            try:
-                                data = json.loads(data_json)
-                                layout = json.loads(layout_json)
-                                
-                                # 特殊情况：空数据数组但保留原始图表
-                                if isinstance(data, list) and len(data) == 0:
-                                    print(f"图表 #{i} 数据为空数组，保留原始HTML")
-                                    # 保留原始图表的HTML，不进行转换
-                                    continue
-                                
-                                # 生成静态HTML
-                                fig_dict = {"data": data, "layout": layout}
-                                static_html = pio.to_html(
-                                    fig_dict,
-                                    full_html=False,
-                                    include_plotlyjs=False,
-                                    config={'staticPlot': True}
-                                )
-                                
-                                # 替换原始div
-                                new_div = soup.new_tag('div')
-                                new_div['class'] = 'plot-container'
-                                new_div.append(BeautifulSoup(static_html, 'html.parser'))
-                                div.replace_with(new_div)
-                                print("成功转换图表")
-                            except json.JSONDecodeError as e:
-                                print(f"JSON解析错误: {e}")
-                                print(f"保留原始图表...")
-                                continue
-                        except Exception as e:
-                            print(f"处理图表 #{i} JSON时出错: {e}")
-                            print(f"保留原始图表...")
-                            continue
-                    else:
-                        print(f"未找到data或layout变量，保留原始图表...")
-                        continue
-            except Exception as e:
-                print(f"转换图表 #{i} 时出错: {e}")
-                print(f"保留原始图表...")
+                return render_chart_svg(data, layout)
+            except UnsupportedChartError as e:
+                print(f"无法渲染为SVG（{e}），回退到Plotly")
+        return pio.to_html(
+            {"data": data, "layout": layout},
+            full_html=False,
+            include_plotlyjs=False,
+            div_id=CHART_ID_PLACEHOLDER,
+            config={'staticPlot': True}
+        )
+
+    async def _render_charts(self, charts: List[tuple]) -> List[str]:
+        """
+        渲染进程池中提取出的图表 [(data, layout, 原始图表HTML), ...]，返回替换各图表的HTML片段
+
+        先查当前进程的图表缓存，未命中的图表（相同定义只渲染一次）再交给进程池渲染并写回缓存；
+        渲染失败的图表保留原始图表，不写入缓存。
+        """
+        keys = [make_chart_key(data, layout, self.chart_mode) for data, layout, _ in charts]
+        cached = {}
+        if self.chart_cache:
+            for key in set(keys):
+                fragment = self.chart_cache.get(key)
+                if fragment is not None:
+                    cached[key] = fragment
+        
+        missing = {}
+        for key, (data, layout, _) in zip(keys, charts):
+            if key not in cached:
+                missing.setdefault(key, (data, layout))
+        if missing:
+            print(f"渲染 {len(missing)} 个图表（{len(cached)} 个命中缓存）...")
+            rendered = await run_in_process(_render_charts_job, list(missing.values()), self.chart_mode)
+            for key, fragment in zip(missing, rendered):
+                if fragment is None:
+                    continue
+                cached[key] = fragment
+                if self.chart_cache:
+                    self.chart_cache.set(key, fragment)
+        
+        fragments = []
+        for i, (key, (_, _, original)) in enumerate(zip(keys, charts)):
+            if key not in cached:
+                print(f"保留原始图表 #{i}")
+                fragments.append(original)
                 continue
+            static_html = cached[key].replace(CHART_ID_PLACEHOLDER, f"chart-{uuid.uuid4().hex}")
+            fragments.append(f'<div class="plot-container">{static_html}</div>')
+        return fragments
+
+    def _convert_chart(self, div, chart_index: int, charts: Optional[List[tuple]] = None) -> Optional[str]:
+        """
+        把一个图表div转换为静态SVG或HTML片段；无法转换时返回 None，保留原始图表
+
+        提供 charts 列表时不渲染，只把规范化后的 (data, layout, 原始图表HTML) 追加进去，返回位置标记。
+        """
+        script = div.find('script')
+        js_code = script.string if script else None
+        if not js_code:
+            return None
         
-        return str(soup)
+        try:
+            data, layout = extract_chart_spec(js_code)
+        except JSLiteralError as e:
+            print(f"图表 #{chart_index} 脚本解析失败，保留原始图表: {e}")
+            return None
+        
+        if data is None or layout is None:
+            print(f"图表 #{chart_index} 未找到data或layout，保留原始图表")
+            return None
+        # 特殊情况：空数据数组但保留原始图表
+        if isinstance(data, list) and len(data) == 0:
+            return None
+        
+        # 规范化后生成静态SVG或HTML（命中缓存时跳过渲染）
+        data, layout = self._sanitize_chart_data(data, layout, chart_index)
+        if charts is not None:
+            charts.append((data, layout, str(div)))
+            return f"{CHART_MARKER}{len(charts) - 1}{CHART_MARKER}"
+        static_html = self._render_chart(data, layout)
+        return f'<div class="plot-container">{static_html}</div>'
 
-    def _replace_mermaid_with_svg(self, html_content: str, svg_outputs: List[str]) -> str:
-        """替换HTML中的Mermaid图表占位符为预渲染的SVG内容"""
-        if not svg_outputs:
-            return html_content
-            
-        soup = BeautifulSoup(html_content, 'html.parser')
+    def _postprocess_html(self, html_content: str, svg_outputs: List[str],
+                          charts: Optional[List[tuple]] = None) -> str:
+        """
+        对Markdown生成的HTML做一次性后处理：Mermaid占位符替换为预渲染的SVG，图表div转换为静态图表。
+        
+        整个文档只解析和序列化一次。需要替换的节点先换成标记文本，序列化后再把标记替换为
+        SVG/HTML片段，片段本身不再经过HTML解析。提供 charts 列表时图表只提取不渲染（见 _convert_chart）。
+        """
+        soup = BeautifulSoup(html_content, HTML_PARSER)
+        fragments: List[str] = []
         
-        # 查找所有占位符文本节点
-        text_nodes = soup.find_all(string=lambda text: text and "___MERMAID_DIAGRAM_" in text)
+        def mark(node, fragment: str) -> None:
+            node.replace_with(NavigableString(f"{FRAGMENT_MARKER}{len(fragments)}{FRAGMENT_MARKER}"))
+            fragments.append(fragment)
         
-        for text_node in text_nodes:
-            # 提取占位符索引
-            placeholder = text_node.strip()
-            match = re.search(r'___MERMAID_DIAGRAM_(\d+)___', placeholder)
-            
-            if match:
+        # 替换Mermaid图表占位符为SVG内容
+        if svg_outputs:
+            print("替换Mermaid图表占位符为SVG内容...")
+            text_nodes = soup.find_all(string=lambda text: text and "___MERMAID_DIAGRAM_" in text)
+            for text_node in text_nodes:
+                # 提取占位符索引
+                match = re.search(r'___MERMAID_DIAGRAM_(\d+)___', text_node)
+                if not match:
+                    continue
                 idx = int(match.group(1))
                 if idx < len(svg_outputs) and svg_outputs[idx]:
-                    # 创建包含SVG的div
-                    container_div = soup.new_tag('div')
-                    container_div['class'] = 'mermaid-container'
-                    
-                    # 解析SVG并添加到容器中
-                    svg_content = BeautifulSoup(svg_outputs[idx], 'html.parser')
-                    container_div.append(svg_content)
-                    
-                    # 替换占位符
-                    text_node.replace_with(container_div)
+                    mark(text_node, f'<div class="mermaid-container">{svg_outputs[idx]}</div>')
                 else:
-                    # 创建一个文本占位符
-                    fallback_div = soup.new_tag('div')
-                    fallback_div['class'] = 'mermaid-container'
-                    fallback_div.string = "[图表渲染失败]"
-                    text_node.replace_with(fallback_div)
+                    mark(text_node, '<div class="mermaid-container">[图表渲染失败]</div>')
         
-        return str(soup)
+        # 提取并转换其他图表为静态图表
+        print("处理其他图表...")
+        for i, div in enumerate(soup.find_all('div', class_='chart')):
+            try:
+                fragment = self._convert_chart(div, i, charts)
+            except Exception as e:
+                print(f"转换图表 #{i} 时出错: {e}")
+                print(f"保留原始图表...")
+                continue
+            if fragment is not None:
+                mark(div, fragment)
+        
+        # lxml 会补全 html/head/body 外层结构，并把正文之前的 <script>、<style>、<meta> 等放进 head；
+        # 这些节点原本就位于最前面，按 head、body 的顺序输出两者的内容即可保持原有顺序
+        parts = [part for part in (soup.head, soup.body) if part is not None]
+        html_content = "".join(part.decode_contents() for part in parts) if parts else soup.decode_contents()
+        if not fragments:
+            return html_content
+        return re.sub(
+            f"{FRAGMENT_MARKER}(\\d+){FRAGMENT_MARKER}",
+            lambda m: fragments[int(m.group(1))],
+            html_content
+        )
 
     def _create_html_template(self) -> str:
-        """创建基础HTML模板"""
+        """创建基础HTML模板（需要时引入的 plotly.js 由请求拦截从本地副本提供）"""
         return """
         <!DOCTYPE html>
         <html>
         <head>
             <meta charset="UTF-8">
-            <script src="https://cdn.plot.ly/plotly-2.27.0.min.js"></script>
+            {plotly_script}
             <style>
                 {css}
             </style>
         </head>
         <body>
             {content}
+            <script>
+                // 就绪信号：字体加载完成且所有图表绘制完成后置为 true，打印PDF前等待该信号
+                window.addEventListener('load', function () {{
+                    document.fonts.ready.then(function check() {{
+                        var charts = document.querySelectorAll('.plotly-graph-div, div.chart');
+                        var pending = Array.prototype.some.call(charts, function (el) {{
+                            return !el.classList.contains('js-plotly-plot');
+                        }});
+                        if (pending && typeof Plotly !== 'undefined') {{
+                            requestAnimationFrame(check);
+                        }} else {{
+                            window.__reportReady = true;
+                        }}
+                    }});
+                }});
+            </script>
         </body>
         </html>
         """
 
-    async def _generate_pdf(self, html_content: str, output_path: str) -> None:
+    async def _generate_pdf(self, html_content: str, output_path: str, pool: BrowserPool) -> None:
         """使用Playwright生成PDF"""
-        async with async_playwright() as p:
-            browser = await p.chromium.launch()
-            page = await browser.new_page()
+        # 设置视口大小
+        async with pool.page(viewport={"width": 1200, "height": 800}) as page:
+            await install_asset_routes(page)
             
-            # 设置视口大小
-            await page.set_viewport_size({"width": 1200, "height": 800})
+            # 设置页面内容，脚本由本地提供，不再依赖网络空闲
+            await page.set_content(html_content, wait_until='load')
             
-            # 设置页面内容
-            await page.set_content(html_content, wait_until='networkidle')
-            
-            # 等待所有图像加载完成
-            await page.wait_for_load_state('load')
+            # 等待字体和图表就绪
+            try:
+                await page.wait_for_function(
+                    'window.__reportReady === true',
+                    timeout=PDF_CONFIG["ready_timeout"] * 1000
+                )
+            except Exception as e:
+                print(f"等待页面就绪超时，继续生成PDF: {e}")
             
             # 直接生成PDF
             await page.pdf(
@@ -535,11 +530,44 @@ class PDFMaker:
                     'left': '40px'
                 }
             )
-            
-            await browser.close()
 
-    async def _process_markdown_async(self, markdown_content: str) -> str:
-        """异步处理Markdown内容，包括预渲染Mermaid图表"""
+    def _generate_pdf_weasyprint(self, html_content: str, output_path: str) -> None:
+        """使用WeasyPrint直接排版静态HTML/SVG生成PDF，不需要浏览器"""
+        try:
+            from weasyprint import HTML, CSS
+        except (ImportError, OSError) as e:
+            raise RuntimeError(f"未安装weasyprint或缺少其系统依赖: {e}")
+        
+        # 与 playwright 打印使用相同的纸张和页边距
+        page_css = CSS(string="@page { size: A4; margin: 40px; }")
+        HTML(string=html_content, base_url=os.getcwd()).write_pdf(output_path, stylesheets=[page_css])
+
+    async def _process_markdown_async(self, markdown_content: str, pool: BrowserPool,
+                                      html_labels: bool = True) -> str:
+        """
+        异步处理Markdown内容，包括预渲染Mermaid图表
+
+        Markdown预处理、HTML生成和图表渲染是CPU密集型步骤，在进程池中执行；Mermaid预渲染在当前事件循环中等待浏览器。
+        图表缓存在当前进程中查询和写入，工作进程只渲染未命中的图表。
+        """
+        processed_content, mermaid_diagrams = await run_in_process(_prepare_markdown_job, markdown_content)
+        
+        # 预渲染Mermaid图表为SVG
+        print(f"预渲染 {len(mermaid_diagrams)} 个Mermaid图表为SVG...")
+        svg_outputs = await self._pre_render_mermaid_to_svg(mermaid_diagrams, pool, html_labels)
+        
+        html_content, charts = await run_in_process(_render_html_job, processed_content, svg_outputs)
+        if not charts:
+            return html_content
+        fragments = await self._render_charts(charts)
+        return re.sub(
+            f"{CHART_MARKER}(\\d+){CHART_MARKER}",
+            lambda m: fragments[int(m.group(1))],
+            html_content
+        )
+
+    def _prepare_markdown(self, markdown_content: str) -> Tuple[str, List[str]]:
+        """修复Markdown格式、替换占位符图片并提取Mermaid图表，返回处理后的内容和图表代码列表"""
         # 预处理Markdown内容
         print("预处理Markdown内容，修复格式问题...")
         preprocessed_content = self._preprocess_markdown(markdown_content)
@@ -550,12 +578,11 @@ class PDFMaker:
         
         # 提取Mermaid图表并替换为占位符
         print("提取Mermaid图表...")
-        processed_content, mermaid_diagrams = self._extract_mermaid_diagrams(preprocessed_content)
-        
-        # 预渲染Mermaid图表为SVG
-        print(f"预渲染 {len(mermaid_diagrams)} 个Mermaid图表为SVG...")
-        svg_outputs = await self._pre_render_mermaid_to_svg(mermaid_diagrams)
-        
+        return self._extract_mermaid_diagrams(preprocessed_content)
+
+    def _markdown_to_html(self, processed_content: str, svg_outputs: List[str],
+                          charts: Optional[List[tuple]] = None) -> str:
+        """把处理后的Markdown转换为HTML，并替换Mermaid图表和其他图表"""
         # 转换Markdown为HTML
         print("将Markdown转换为HTML...")
         try:
@@ -588,16 +615,8 @@ class PDFMaker:
                         html_parts.append(f"<div>{part_with_br}</div>")
             html_content = '\n'.join(html_parts)
         
-        # 替换Mermaid图表占位符为SVG内容
-        if mermaid_diagrams:
-            print("替换Mermaid图表占位符为SVG内容...")
-            html_content = self._replace_mermaid_with_svg(html_content, svg_outputs)
-        
-        # 提取并转换其他图表为静态HTML
-        print("处理其他图表...")
-        html_content = self._extract_and_convert_charts(html_content)
-        
-        return html_content
+        # 一次遍历完成Mermaid图表和其他图表的替换
+        return self._postprocess_html(html_content, svg_outputs, charts)
 
     def _replace_placeholder_images(self, markdown_content: str) -> str:
         """替换Markdown中的占位符图片为图表"""
@@ -791,14 +810,52 @@ class PDFMaker:
     </script>
 """
 
-    async def _markdown_to_pdf_async(self, markdown_content: str, output_path: str, save_html: bool = False) -> None:
-        """异步版本的markdown_to_pdf方法"""
-        # 处理Markdown内容（包括Mermaid图表渲染）
-        html_content = await self._process_markdown_async(markdown_content)
+    async def amarkdown_to_pdf(self, markdown_content: str, output_path: str, save_html: bool = False,
+                               backend: Optional[str] = None) -> None:
+        """
+        异步版本的markdown_to_pdf方法，可在已运行的事件循环中直接等待
+
+        Args:
+            backend: 打印后端，"playwright" 或 "weasyprint"；默认读取 PDF_CONFIG["backend"]
+        """
+        backend = backend or PDF_CONFIG["backend"]
+        if backend not in ("playwright", "weasyprint"):
+            raise ValueError(f"不支持的PDF后端: {backend}")
+        
+        if self.browser_pool is not None:
+            await self._markdown_to_pdf_async(markdown_content, output_path, self.browser_pool, save_html, backend)
+            return
+        
+        # 没有共享浏览器池时，本次转换临时创建一个；浏览器在第一次需要页面时才启动，
+        # 使用 weasyprint 且报告中没有Mermaid图表时不会启动浏览器
+        pool = BrowserPool()
+        try:
+            await self._markdown_to_pdf_async(markdown_content, output_path, pool, save_html, backend)
+        finally:
+            await pool.stop()
+
+    async def _markdown_to_pdf_async(self, markdown_content: str, output_path: str, pool: BrowserPool,
+                                     save_html: bool = False, backend: str = "playwright") -> None:
+        """使用指定浏览器池和打印后端完成Markdown到PDF的转换"""
+        # 处理Markdown内容（包括Mermaid图表渲染）；WeasyPrint 不支持 foreignObject，Mermaid 使用纯SVG文本
+        html_content = await self._process_markdown_async(
+            markdown_content, pool, html_labels=(backend == "playwright")
+        )
+        
+        # WeasyPrint 不执行JavaScript，仍有需要 Plotly.js 绘制的图表时改用浏览器打印
+        if backend == "weasyprint" and "Plotly" in html_content:
+            print("报告中仍有需要Plotly.js绘制的图表，改用playwright打印")
+            backend = "playwright"
+        
+        # 页面中仍有需要 Plotly.js 绘制的图表时才加载脚本
+        plotly_script = ""
+        if "Plotly" in html_content:
+            plotly_script = f'<script src="{asset_url("plotly")}"></script>'
         
         # 创建完整的HTML
         template = self._create_html_template()
         final_html = template.format(
+            plotly_script=plotly_script,
             css=self.css_content,
             content=html_content
         )
@@ -811,10 +868,40 @@ class PDFMaker:
             print(f"调试用HTML文件已保存: {html_debug_path}")
         
         # 生成PDF
-        print("生成PDF文件...")
-        await self._generate_pdf(final_html, output_path)
+        print(f"生成PDF文件（{backend}）...")
+        if backend == "weasyprint":
+            # WeasyPrint 排版是纯CPU计算，放到线程中执行，不阻塞事件循环
+            await asyncio.to_thread(self._generate_pdf_weasyprint, final_html, output_path)
+        else:
+            await self._generate_pdf(final_html, output_path, pool)
 
-    def markdown_to_pdf(self, markdown_content: str, output_path: str, save_html: bool = False) -> None:
+    def markdown_to_pdf(self, markdown_content: str, output_path: str, save_html: bool = False,
+                        backend: Optional[str] = None) -> None:
         """将Markdown内容（包含HTML图表和Mermaid图表）转换为PDF"""
         # 使用异步方式处理
-        asyncio.run(self._markdown_to_pdf_async(markdown_content, output_path, save_html))
+        asyncio.run(self.amarkdown_to_pdf(markdown_content, output_path, save_html, backend))
+
+
+def _prepare_markdown_job(markdown_content: str) -> Tuple[str, List[str]]:
+    """进程池入口：Markdown预处理"""
+    return PDFMaker()._prepare_markdown(markdown_content)
+
+
+def _render_html_job(processed_content: str, svg_outputs: List[str]) -> Tuple[str, List[tuple]]:
+    """进程池入口：Markdown转HTML，返回带图表位置标记的HTML和提取出的图表列表"""
+    charts: List[tuple] = []
+    html_content = PDFMaker()._markdown_to_html(processed_content, svg_outputs, charts)
+    return html_content, charts
+
+
+def _render_charts_job(charts: List[tuple], chart_mode: str) -> List[Optional[str]]:
+    """进程池入口：渲染图表（不经过缓存，缓存由调用方进程维护），渲染失败的图表返回 None"""
+    maker = PDFMaker(chart_mode=chart_mode)
+    fragments = []
+    for i, (data, layout) in enumerate(charts):
+        try:
+            fragments.append(maker._render_chart_uncached(data, layout))
+        except Exception as e:
+            print(f"渲染图表 #{i} 时出错: {e}")
+            fragments.append(None)
+    return fragments
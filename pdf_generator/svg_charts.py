@@ -0,0 +1,370 @@
+"""
+把 Plotly 风格的图表定义（data + layout）直接渲染为静态 SVG。
+
+只覆盖报告中实际会出现的图表类型：饼图、折线/散点图、面积图、柱状图和热力图。
+渲染在 Python 中完成，打印PDF时页面里不再需要运行任何 JavaScript。
+遇到不支持的类型或属性（如横向柱状图、堆叠模式、对数坐标）时抛出 UnsupportedChartError，
+由调用方回退到 Plotly 渲染，而不是画出错误的图。
+"""
+import math
+from html import escape
+from numbers import Number
+from typing import Dict, List, Tuple
+
+# 与 plotly_white 模板一致的默认配色
+COLORWAY = [
+    "#636efa", "#EF553B", "#00cc96", "#ab63fa", "#FFA15A",
+    "#19d3f3", "#FF6692", "#B6E880", "#FF97FF", "#FECB52"
+]
+
+# Viridis 色阶的关键点
+VIRIDIS = [
+    (0.0, (68, 1, 84)), (0.25, (59, 82, 139)), (0.5, (33, 145, 140)),
+    (0.75, (94, 201, 98)), (1.0, (253, 231, 37))
+]
+
+FONT_FAMILY = "Arial, sans-serif"
+GRID_COLOR = "#ebf0f8"
+AXIS_COLOR = "#444"
+MARGIN = {"left": 70, "right": 30, "top": 60, "bottom": 60}
+
+
+class UnsupportedChartError(ValueError):
+    """图表类型或数据形态不受支持"""
+
+
+# 渲染器实现了的属性取值，None 表示未设置（使用 Plotly 默认值）
+SUPPORTED_LAYOUT = {
+    "barmode": (None, "group"),
+}
+SUPPORTED_AXIS_TYPES = {
+    "xaxis": (None, "-", "linear", "category", "date"),
+    "yaxis": (None, "-", "linear"),
+}
+SUPPORTED_TRACE = {
+    "orientation": (None, "v"),
+    "xaxis": (None, "x"),
+    "yaxis": (None, "y"),
+    "fill": (None, "none", "tozeroy"),
+    "stackgroup": (None,),
+    "hole": (None, 0),
+}
+
+
+def _text(x: float, y: float, content, size: int = 12, anchor: str = "middle",
+          color: str = AXIS_COLOR, extra: str = "") -> str:
+    return (f'<text x="{x:.1f}" y="{y:.1f}" font-size="{size}" text-anchor="{anchor}" '
+            f'fill="{color}"{extra}>{escape(str(content))}</text>')
+
+
+def _title_text(value) -> str:
+    """兼容 "title": "xx" 和 "title": {"text": "xx"} 两种写法"""
+    if isinstance(value, dict):
+        return str(value.get("text", ""))
+    return str(value) if value else ""
+
+
+def _format_number(value: float) -> str:
+    if abs(value - round(value)) < 1e-9:
+        return str(int(round(value)))
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+def _nice_ticks(lo: float, hi: float, count: int = 5) -> List[float]:
+    """为数值轴生成整齐的刻度"""
+    if hi == lo:
+        hi = lo + 1
+    raw_step = (hi - lo) / count
+    magnitude = 10 ** math.floor(math.log10(raw_step))
+    step = magnitude
+    for multiple in (1, 2, 2.5, 5, 10):
+        step = multiple * magnitude
+        if step >= raw_step:
+            break
+    start = math.floor(lo / step) * step
+    ticks = []
+    value = start
+    while value < hi + step * 0.5:
+        ticks.append(round(value, 10))
+        value += step
+    return ticks
+
+
+def _trace_color(trace: Dict, index: int, key: str = "marker"):
+    """取 trace 的颜色：可能是单个颜色，也可能是逐点颜色列表"""
+    color = (trace.get(key) or {}).get("color")
+    return color if color else COLORWAY[index % len(COLORWAY)]
+
+
+def _colorscale(value: float) -> str:
+    """把 [0, 1] 区间的值映射为 Viridis 颜色"""
+    value = min(max(value, 0.0), 1.0)
+    for (p0, c0), (p1, c1) in zip(VIRIDIS, VIRIDIS[1:]):
+        if value <= p1:
+            t = (value - p0) / (p1 - p0)
+            r, g, b = (round(a + (b_ - a) * t) for a, b_ in zip(c0, c1))
+            return f"rgb({r},{g},{b})"
+    return "rgb(253,231,37)"
+
+
+def _svg_document(width: int, height: int, title: str, body: List[str]) -> str:
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family="{FONT_FAMILY}">',
+        f'<rect width="{width}" height="{height}" fill="#fff"/>'
+    ]
+    if title:
+        parts.append(_text(width / 2, 32, title, size=17, color="#2a3f5f"))
+    parts.extend(body)
+    parts.append('</svg>')
+    return "\n".join(parts)
+
+
+def _legend(entries: List[Tuple[str, str]], x: float, y: float) -> List[str]:
+    parts = []
+    for i, (name, color) in enumerate(entries):
+        row_y = y + i * 20
+        parts.append(f'<rect x="{x:.1f}" y="{row_y - 9:.1f}" width="12" height="12" fill="{escape(color)}"/>')
+        parts.append(_text(x + 18, row_y + 2, name, anchor="start"))
+    return parts
+
+
+def _render_pie(trace: Dict, width: int, height: int) -> List[str]:
+    values = [float(v) for v in trace.get("values", [])]
+    labels = trace.get("labels") or [str(i) for i in range(len(values))]
+    total = sum(values)
+    if not values or total <= 0:
+        raise UnsupportedChartError("饼图没有有效数据")
+
+    colors = (trace.get("marker") or {}).get("colors") or COLORWAY
+    cx = MARGIN["left"] + (width - MARGIN["left"] - MARGIN["right"] - 160) / 2
+    cy = MARGIN["top"] + (height - MARGIN["top"] - MARGIN["bottom"]) / 2
+    radius = min(width - 160, height - MARGIN["top"] - MARGIN["bottom"]) / 2 - 10
+
+    parts = []
+    entries = []
+    angle = -math.pi / 2  # 与 Plotly 一致，从12点方向顺时针
+    for i, (label, value) in enumerate(zip(labels, values)):
+        color = colors[i % len(colors)]
+        entries.append((str(label), color))
+        sweep = 2 * math.pi * value / total
+        if sweep >= 2 * math.pi - 1e-9:
+            parts.append(f'<circle cx="{cx:.1f}" cy="{cy:.1f}" r="{radius:.1f}" fill="{escape(color)}"/>')
+        elif sweep > 0:
+            x0, y0 = cx + radius * math.cos(angle), cy + radius * math.sin(angle)
+            x1, y1 = cx + radius * math.cos(angle + sweep), cy + radius * math.sin(angle + sweep)
+            large_arc = 1 if sweep > math.pi else 0
+            parts.append(
+                f'<path d="M{cx:.1f},{cy:.1f} L{x0:.1f},{y0:.1f} '
+                f'A{radius:.1f},{radius:.1f} 0 {large_arc} 1 {x1:.1f},{y1:.1f} Z" '
+                f'fill="{escape(color)}" stroke="#fff" stroke-width="1"/>'
+            )
+        # 扇区中点标注百分比
+        middle = angle + sweep / 2
+        if sweep > 0.2:
+            parts.append(_text(cx + radius * 0.65 * math.cos(middle),
+                               cy + radius * 0.65 * math.sin(middle) + 4,
+                               f"{value / total * 100:.1f}%", color="#fff"))
+        angle += sweep
+
+    parts.extend(_legend(entries, width - MARGIN["right"] - 140, MARGIN["top"] + 10))
+    return parts
+
+
+def _render_heatmap(trace: Dict, layout: Dict, width: int, height: int) -> List[str]:
+    z = trace.get("z") or []
+    if not z or not all(isinstance(row, list) and row for row in z):
+        raise UnsupportedChartError("热力图没有有效数据")
+    rows, cols = len(z), max(len(row) for row in z)
+    xs = trace.get("x") or list(range(cols))
+    ys = trace.get("y") or list(range(rows))
+    flat = [float(v) for row in z for v in row if isinstance(v, Number)]
+    lo, hi = min(flat), max(flat)
+    span = (hi - lo) or 1
+
+    left, top = MARGIN["left"], MARGIN["top"]
+    plot_w = width - left - MARGIN["right"]
+    plot_h = height - top - MARGIN["bottom"]
+    cell_w, cell_h = plot_w / cols, plot_h / rows
+
+    parts = []
+    for r, row in enumerate(z):
+        # Plotly 热力图第一行在最下方
+        y = top + plot_h - (r + 1) * cell_h
+        for c, value in enumerate(row):
+            if not isinstance(value, Number):
+                continue
+            parts.append(
+                f'<rect x="{left + c * cell_w:.1f}" y="{y:.1f}" width="{cell_w:.1f}" '
+                f'height="{cell_h:.1f}" fill="{_colorscale((value - lo) / span)}"/>'
+            )
+    for c, label in enumerate(xs[:cols]):
+        parts.append(_text(left + (c + 0.5) * cell_w, top + plot_h + 18, label))
+    for r, label in enumerate(ys[:rows]):
+        parts.append(_text(left - 8, top + plot_h - (r + 0.5) * cell_h + 4, label, anchor="end"))
+    parts.extend(_axis_titles(layout, width, height))
+    return parts
+
+
+def _axis_titles(layout: Dict, width: int, height: int) -> List[str]:
+    parts = []
+    x_title = _title_text((layout.get("xaxis") or {}).get("title"))
+    y_title = _title_text((layout.get("yaxis") or {}).get("title"))
+    if x_title:
+        parts.append(_text(MARGIN["left"] + (width - MARGIN["left"] - MARGIN["right"]) / 2,
+                           height - 15, x_title, size=13))
+    if y_title:
+        y = MARGIN["top"] + (height - MARGIN["top"] - MARGIN["bottom"]) / 2
+        parts.append(_text(18, y, y_title, size=13, extra=f' transform="rotate(-90 18 {y:.1f})"'))
+    return parts
+
+
+def _render_cartesian(traces: List[Dict], layout: Dict, width: int, height: int) -> List[str]:
+    """柱状图、折线/散点图和面积图共用同一套坐标系"""
+    series = []
+    for trace in traces:
+        ys = trace.get("y") or []
+        if not ys or not all(isinstance(v, Number) for v in ys):
+            raise UnsupportedChartError("y 轴数据必须是数值")
+        xs = trace.get("x") or list(range(len(ys)))
+        series.append((trace, list(xs)[:len(ys)], [float(v) for v in ys]))
+
+    all_x = [x for _, xs, _ in series for x in xs]
+    categorical = not all(isinstance(x, Number) for x in all_x)
+    if categorical:
+        categories = list(dict.fromkeys(str(x) for x in all_x))
+    all_y = [y for _, _, ys in series for y in ys]
+    has_fill_or_bar = any(t.get("type") == "bar" or t.get("fill") == "tozeroy" for t, _, _ in series)
+    y_lo = min(all_y + [0]) if has_fill_or_bar else min(all_y)
+    ticks = _nice_ticks(y_lo, max(all_y))
+    y_min, y_max = ticks[0], ticks[-1]
+
+    left, top = MARGIN["left"], MARGIN["top"]
+    plot_w = width - left - MARGIN["right"]
+    plot_h = height - top - MARGIN["bottom"]
+
+    def sy(value: float) -> float:
+        return top + plot_h - (value - y_min) / ((y_max - y_min) or 1) * plot_h
+
+    if categorical:
+        band = plot_w / max(len(categories), 1)
+        index = {c: i for i, c in enumerate(categories)}
+
+        def sx(value) -> float:
+            return left + (index[str(value)] + 0.5) * band
+    else:
+        x_lo, x_hi = min(all_x), max(all_x)
+        band = plot_w / max(len(set(all_x)), 1)
+
+        def sx(value) -> float:
+            return left + (value - x_lo) / ((x_hi - x_lo) or 1) * plot_w
+
+    parts = []
+    # 网格线与 y 轴刻度
+    for tick in ticks:
+        y = sy(tick)
+        parts.append(f'<line x1="{left}" y1="{y:.1f}" x2="{left + plot_w}" y2="{y:.1f}" stroke="{GRID_COLOR}"/>')
+        parts.append(_text(left - 8, y + 4, _format_number(tick), anchor="end"))
+    # x 轴刻度
+    if categorical:
+        for c in categories:
+            parts.append(_text(sx(c), top + plot_h + 18, c))
+    else:
+        for tick in _nice_ticks(min(all_x), max(all_x)):
+            if min(all_x) <= tick <= max(all_x):
+                parts.append(_text(sx(tick), top + plot_h + 18, _format_number(tick)))
+
+    bars = [s for s in series if s[0].get("type") == "bar"]
+    bar_width = band * 0.8 / max(len(bars), 1)
+    baseline = sy(max(y_min, 0))
+    entries = []
+    bar_index = 0
+    for i, (trace, xs, ys) in enumerate(series):
+        color = _trace_color(trace, i)
+        if trace.get("type") == "bar":
+            # 多个柱状 trace 按 group 模式并排
+            offset = (bar_index - (len(bars) - 1) / 2) * bar_width
+            bar_index += 1
+            for j, (x, y) in enumerate(zip(xs, ys)):
+                fill = color[j % len(color)] if isinstance(color, list) else color
+                y_top = min(sy(y), baseline)
+                parts.append(
+                    f'<rect x="{sx(x) + offset - bar_width / 2:.1f}" y="{y_top:.1f}" '
+                    f'width="{bar_width:.1f}" height="{abs(baseline - sy(y)):.1f}" fill="{escape(fill)}"/>'
+                )
+            legend_color = color[0] if isinstance(color, list) else color
+        else:
+            line_color = (trace.get("line") or {}).get("color") or (color if isinstance(color, str) else COLORWAY[i])
+            points = [(sx(x), sy(y)) for x, y in zip(xs, ys)]
+            path = " ".join(f"{x:.1f},{y:.1f}" for x, y in points)
+            mode = trace.get("mode", "lines+markers" if len(points) < 20 else "lines")
+            if trace.get("fill") == "tozeroy":
+                polygon = f"{points[0][0]:.1f},{baseline:.1f} {path} {points[-1][0]:.1f},{baseline:.1f}"
+                parts.append(f'<polygon points="{polygon}" fill="{escape(line_color)}" fill-opacity="0.5"/>')
+            if "lines" in mode:
+                parts.append(f'<polyline points="{path}" fill="none" stroke="{escape(line_color)}" stroke-width="2"/>')
+            if "markers" in mode:
+                parts.extend(
+                    f'<circle cx="{x:.1f}" cy="{y:.1f}" r="4" fill="{escape(line_color)}"/>' for x, y in points
+                )
+            legend_color = line_color
+        if trace.get("name"):
+            entries.append((str(trace["name"]), legend_color))
+
+    parts.append(f'<line x1="{left}" y1="{baseline:.1f}" x2="{left + plot_w}" y2="{baseline:.1f}" stroke="{AXIS_COLOR}"/>')
+    if len(entries) > 1:
+        parts.extend(_legend(entries, left + plot_w - 120, top + 10))
+    parts.extend(_axis_titles(layout, width, height))
+    return parts
+
+
+def _check_attributes(data: List[Dict], layout: Dict) -> None:
+    """检查渲染器没有实现的属性，避免静默画出与 Plotly 不一致的图"""
+    for name, allowed in SUPPORTED_LAYOUT.items():
+        if layout.get(name) not in allowed:
+            raise UnsupportedChartError(f"不支持的布局属性 {name}={layout.get(name)!r}")
+    for axis, allowed in SUPPORTED_AXIS_TYPES.items():
+        axis_type = (layout.get(axis) or {}).get("type")
+        if axis_type not in allowed:
+            raise UnsupportedChartError(f"不支持的坐标轴类型 {axis}.type={axis_type!r}")
+    if any(name.startswith(("xaxis", "yaxis")) and name not in SUPPORTED_AXIS_TYPES for name in layout):
+        raise UnsupportedChartError("不支持多个坐标轴")
+    for trace in data:
+        for name, allowed in SUPPORTED_TRACE.items():
+            if trace.get(name) not in allowed:
+                raise UnsupportedChartError(f"不支持的 trace 属性 {name}={trace.get(name)!r}")
+
+
+def render_chart_svg(data: List[Dict], layout: Dict) -> str:
+    """
+    把图表定义渲染为SVG字符串
+
+    Args:
+        data: Plotly 格式的 trace 列表
+        layout: Plotly 格式的布局
+
+    Returns:
+        str: 内联SVG
+
+    Raises:
+        UnsupportedChartError: 图表类型或数据不受支持
+    """
+    if not isinstance(data, list) or not data or not all(isinstance(t, dict) for t in data):
+        raise UnsupportedChartError("data 必须是非空的 trace 列表")
+    layout = layout if isinstance(layout, dict) else {}
+    width = int(layout.get("width") or 800)
+    height = int(layout.get("height") or 400)
+    title = _title_text(layout.get("title"))
+    _check_attributes(data, layout)
+
+    types = {trace.get("type", "scatter") for trace in data}
+    if types == {"pie"}:
+        body = _render_pie(data[0], width, height)
+    elif types == {"heatmap"}:
+        body = _render_heatmap(data[0], layout, width, height)
+    elif types <= {"bar", "scatter"}:
+        body = _render_cartesian(data, layout, width, height)
+    else:
+        raise UnsupportedChartError(f"不支持的图表类型: {', '.join(sorted(types))}")
+
+    return _svg_document(width, height, title, body)
@@ -1,9 +1,18 @@
 from core.api_manager import APIManager
-from typing import Dict, List, Any, Tuple
+from core.token_counter import count_tokens
+from data_loader.data_digest import format_data
+from config.report_config import REPORT_CONFIG, SECTION_DATA_KEYS
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import time
+from typing import Dict, List, Any, Tuple, Optional, Callable
 import re
 
+# 进度回调: (阶段名称, 当前已生成文本, 已生成token数, 是否完成)
+ProgressCallback = Callable[[str, str, int, bool], None]
+
 class ReportCreator:
-    def __init__(self, api_name):
+    def __init__(self, api_name=None, max_concurrency: Optional[int] = None):
         self.api_manager = APIManager(api_name)
         self.sections = [
             "整体情况概览",
@@ -17,6 +26,18 @@ class ReportCreator:
         self.max_section_length = 1000
         # 每个部分的建议段落数
         self.paragraphs_per_section = 3
+        # 并发生成各部分时的最大并发数
+        self.max_concurrency = max_concurrency or REPORT_CONFIG["max_concurrency"]
+        # 最近一次生成中失败的部分
+        self.failed_sections: List[str] = []
+        # 大纲阶段在进度回调中使用的名称
+        self.outline_stage = "大纲"
+        # 流式生成时推送进度的最小间隔（秒）
+        self.progress_interval = REPORT_CONFIG["progress_interval"]
+        # 每个部分的提示词只携带其所需的数据键
+        self.section_data_keys = SECTION_DATA_KEYS
+        # 最近一次生成中各阶段提示词的 token 数
+        self.prompt_token_sizes: Dict[str, int] = {}
 
     def generate_outline_prompt(self, data: dict) -> str:
         """生成大纲提示词"""
@@ -34,7 +55,7 @@ class ReportCreator:
 对于每个部分，请列出2-3个关键子标题或要点，确保分析简洁但深入。
 
 数据内容如下：
-{data}
+{format_data(data)}
 
 输出格式示例：
 # 整体情况概览
@@ -47,11 +68,24 @@ class ReportCreator:
 
 请仅输出大纲内容，不要有多余的解释。
 """
+        self.prompt_token_sizes[self.outline_stage] = count_tokens(prompt)
         return prompt
 
+    def _project_data(self, data, section: str):
+        """按 section_data_keys 只保留该部分需要的数据键"""
+        keys = self.section_data_keys.get(section)
+        if not keys or not isinstance(data, dict):
+            return data
+        projected = {key: data[key] for key in keys if key in data}
+        if not projected:
+            print(f"警告：数据中没有 {section} 所需的键，使用全部数据")
+            return data
+        return projected
+
     def generate_section_prompt(self, data: dict, section: str, outline: str, previous_sections: str = "") -> str:
-        """为特定部分生成提示词"""
+        """为特定部分生成提示词，数据只包含该部分所需的键"""
         section_outline = self._extract_section_outline(outline, section)
+        data = self._project_data(data, section)
         
         chart_instruction = ""
         if section == "情感倾向分析":
@@ -148,7 +182,7 @@ class ReportCreator:
 你是一个擅长舆情分析的专家。请根据以下数据和大纲，简明扼要地撰写舆情报告的【{section}】部分。
 
 数据内容：
-{data}
+{format_data(data)}
 
 {section}部分的大纲：
 {section_outline}
@@ -168,6 +202,7 @@ class ReportCreator:
 
 请直接开始生成，无需添加标题（如"# {section}"），我会在合并时自动添加。
 """
+        self.prompt_token_sizes[section] = count_tokens(prompt)
         return prompt
 
     def generate_charts_prompt(self, data: dict, report_content: str) -> str:
@@ -176,7 +211,7 @@ class ReportCreator:
 你是一个擅长舆情分析和数据可视化的专家。下面是一份舆情分析报告，但其中的图表部分可能不完整或缺失。请根据报告内容和原始数据，生成或补充必要的图表。
 
 原始数据：
-{data}
+{format_data(data)}
 
 报告内容：
 {report_content}
@@ -345,31 +380,135 @@ class ReportCreator:
             
         return content
 
-    def create_report(self, data: dict) -> str:
-        """生成完整舆情报告"""
+    def _print_prompt_sizes(self) -> None:
+        """输出各阶段提示词的 token 数"""
+        sizes = "，".join(f"{stage} {tokens}" for stage, tokens in self.prompt_token_sizes.items())
+        print(f"提示词token数：{sizes}（合计 {sum(self.prompt_token_sizes.values())}）")
+
+    def _request_text(self, prompt: str, stage: str, progress_callback: Optional[ProgressCallback] = None) -> str:
+        """请求模型生成文本；提供进度回调时使用流式接口并定期推送部分内容"""
+        if progress_callback is None:
+            return self.api_manager.get_response(prompt)
+        
+        parts = []
+        token_count = 0
+        last_push = time.monotonic()
+        for delta in self.api_manager.stream_response(prompt):
+            parts.append(delta)
+            token_count += count_tokens(delta)
+            now = time.monotonic()
+            if now - last_push >= self.progress_interval:
+                progress_callback(stage, "".join(parts), token_count, False)
+                last_push = now
+        
+        text = "".join(parts)
+        progress_callback(stage, text, token_count, True)
+        return text
+
+    async def _arequest_text(self, prompt: str, stage: str, progress_callback: Optional[ProgressCallback] = None) -> str:
+        """异步请求模型生成文本，进度回调的行为与 _request_text 相同"""
+        if progress_callback is None:
+            return await self.api_manager.aget_response(prompt)
+        
+        parts = []
+        token_count = 0
+        last_push = time.monotonic()
+        async for delta in self.api_manager.astream_response(prompt):
+            parts.append(delta)
+            token_count += count_tokens(delta)
+            now = time.monotonic()
+            if now - last_push >= self.progress_interval:
+                progress_callback(stage, "".join(parts), token_count, False)
+                last_push = now
+        
+        text = "".join(parts)
+        progress_callback(stage, text, token_count, True)
+        return text
+
+    def _section_failed(self, section: str, error: Exception, progress_callback: Optional[ProgressCallback] = None) -> str:
+        """记录失败的部分并返回占位文本"""
+        print(f"警告：{section} 部分生成失败: {error}")
+        self.failed_sections.append(section)
+        placeholder = f"（{section}部分生成失败，请稍后重试）"
+        if progress_callback is not None:
+            progress_callback(section, placeholder, 0, True)
+        return placeholder
+
+    def _check_section_content(self, section: str, section_content: str) -> str:
+        """检查部分内容的长度，过长时截断"""
+        if len(section_content) > self.max_section_length * 1.5:
+            # 如果内容过长，截断并添加说明
+            print(f"警告：{section} 内容过长 ({len(section_content)} 字符)，将截断")
+            section_content = section_content[:self.max_section_length] + "\n\n..."
+        
+        print(f"{section} 部分已生成，长度: {len(section_content)} 字符")
+        return section_content
+
+    def _generate_section(self, data: dict, section: str, outline: str,
+                          progress_callback: Optional[ProgressCallback] = None) -> str:
+        """生成单个部分的内容，失败时返回占位文本而不抛出异常"""
+        try:
+            section_prompt = self.generate_section_prompt(data, section, outline)
+            section_content = self._request_text(section_prompt, section, progress_callback)
+            if not section_content:
+                raise ValueError("模型返回内容为空")
+        except Exception as e:
+            return self._section_failed(section, e, progress_callback)
+        return self._check_section_content(section, section_content)
+
+    async def _agenerate_section(self, data: dict, section: str, outline: str, semaphore: asyncio.Semaphore,
+                                 progress_callback: Optional[ProgressCallback] = None) -> str:
+        """异步生成单个部分的内容，失败时返回占位文本而不抛出异常"""
+        try:
+            section_prompt = self.generate_section_prompt(data, section, outline)
+            async with semaphore:
+                section_content = await self._arequest_text(section_prompt, section, progress_callback)
+            if not section_content:
+                raise ValueError("模型返回内容为空")
+        except Exception as e:
+            return self._section_failed(section, e, progress_callback)
+        return self._check_section_content(section, section_content)
+
+    def create_report(self, data: dict, concurrent: Optional[bool] = None,
+                      progress_callback: Optional[ProgressCallback] = None) -> str:
+        """
+        生成完整舆情报告
+        
+        Args:
+            data: 舆情数据
+            concurrent: 是否并发生成各部分，默认读取 REPORT_CONFIG
+            progress_callback: 进度回调，提供时以流式方式生成并推送各部分的部分内容和token数
+        """
+        if concurrent is None:
+            concurrent = REPORT_CONFIG["concurrent_sections"]
+        self.failed_sections = []
+        self.prompt_token_sizes = {}
+        
         # 第一步：生成报告大纲
         print("第一步：生成报告大纲...")
         outline_prompt = self.generate_outline_prompt(data)
-        outline = self.api_manager.get_response(outline_prompt)
+        outline = self._request_text(outline_prompt, self.outline_stage, progress_callback) or ""
         print(f"大纲已生成，长度: {len(outline)} 字符")
         
-        # 第二步：逐段生成各部分内容
-        sections_content = []
+        # 第二步：生成各部分内容
+        if concurrent and self.max_concurrency > 1:
+            print(f"第二步：并发生成各部分内容（并发数 {self.max_concurrency}）...")
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                # executor.map 按提交顺序返回结果，保证部分顺序不变
+                sections_content = list(executor.map(
+                    lambda section: self._generate_section(data, section, outline, progress_callback),
+                    self.sections
+                ))
+        else:
+            print("第二步：逐段生成各部分内容...")
+            sections_content = []
+            for i, section in enumerate(self.sections):
+                print(f"生成第 {i+1}/{len(self.sections)} 部分：{section}...")
+                sections_content.append(self._generate_section(data, section, outline, progress_callback))
         
-        print("第二步：逐段生成各部分内容...")
-        for i, section in enumerate(self.sections):
-            print(f"生成第 {i+1}/{len(self.sections)} 部分：{section}...")
-            section_prompt = self.generate_section_prompt(data, section, outline)
-            section_content = self.api_manager.get_response(section_prompt)
-            
-            # 检查是否超出长度限制
-            if len(section_content) > self.max_section_length * 1.5:
-                # 如果内容过长，截断并添加说明
-                print(f"警告：{section} 内容过长 ({len(section_content)} 字符)，将截断")
-                section_content = section_content[:self.max_section_length] + "\n\n..."
-            
-            sections_content.append(section_content)
-            print(f"{section} 部分已生成，长度: {len(section_content)} 字符")
+        self._print_prompt_sizes()
+        if self.failed_sections:
+            print(f"警告：以下部分生成失败: {', '.join(self.failed_sections)}")
         
         # 第三步：合并内容并后处理
         print("第三步：合并内容并进行后处理...")
@@ -377,3 +516,39 @@ class ReportCreator:
         print(f"报告生成完成，总长度: {len(final_report)} 字符")
         
         return final_report
+
+    async def acreate_report(self, data: dict, progress_callback: Optional[ProgressCallback] = None) -> str:
+        """
+        异步生成完整舆情报告，各部分在并发上限内同时生成
+        
+        Args:
+            data: 舆情数据
+            progress_callback: 进度回调，提供时以流式方式生成并推送各部分的部分内容和token数
+        """
+        self.failed_sections = []
+        self.prompt_token_sizes = {}
+        
+        # 第一步：生成报告大纲
+        print("第一步：生成报告大纲...")
+        outline_prompt = self.generate_outline_prompt(data)
+        outline = await self._arequest_text(outline_prompt, self.outline_stage, progress_callback) or ""
+        print(f"大纲已生成，长度: {len(outline)} 字符")
+        
+        # 第二步：并发生成各部分内容，gather 按传入顺序返回结果
+        print(f"第二步：并发生成各部分内容（并发数 {self.max_concurrency}）...")
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        sections_content = await asyncio.gather(*[
+            self._agenerate_section(data, section, outline, semaphore, progress_callback)
+            for section in self.sections
+        ])
+        
+        self._print_prompt_sizes()
+        if self.failed_sections:
+            print(f"警告：以下部分生成失败: {', '.join(self.failed_sections)}")
+        
+        # 第三步：合并内容并后处理
+        print("第三步：合并内容并进行后处理...")
+        final_report = self._merge_sections(list(sections_content))
+        print(f"报告生成完成，总长度: {len(final_report)} 字符")
+        
+        return final_report
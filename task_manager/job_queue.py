@@ -0,0 +1,191 @@
+"""
+基于 Redis 的报告任务队列，支持优先级和可见性超时。
+
+- waiting：待执行任务的有序集合，分数为 优先级 * 10^13 + 入队毫秒时间戳，同优先级先进先出
+- processing：已领取任务的有序集合，分数为租约到期时间；worker 定期续约
+- jobs：任务ID -> 任务参数（JSON）
+- scores：任务ID -> 入队时的分数，租约到期重新入队时保持原来的位置
+- attempts：任务ID -> 已被领取的次数
+- stats：任务平均耗时等统计，用于估算排队时间
+
+worker 崩溃或失联时租约到期，任务由任意 worker 重新放回队列；超过最大领取次数的任务不再重试。
+所有时间均取 Redis 服务器时间，不受各节点时钟偏差影响。
+"""
+import json
+from typing import Dict, Any, List, Optional, Tuple
+
+import redis.asyncio as aioredis
+
+from config.task_config import TASK_QUEUE_CONFIG, SCHEDULER_CONFIG, TASK_PRIORITIES
+
+# 提交任务：队列已满时返回 0
+# KEYS: waiting, jobs, scores  ARGV: 任务ID, 参数, 优先级, 排队上限
+ENQUEUE_SCRIPT = """
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[4]) then
+    return 0
+end
+local now = redis.call('TIME')
+local score = tonumber(ARGV[3]) * 10000000000000 + tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+redis.call('ZADD', KEYS[1], score, ARGV[1])
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+redis.call('HSET', KEYS[3], ARGV[1], score)
+return 1
+"""
+
+# 领取任务：执行中的任务数达到全局上限时不领取；否则取出优先级最高的任务、登记租约、领取次数加一
+# KEYS: waiting, processing, jobs, attempts  ARGV: 可见性超时（秒）, 同时执行上限
+CLAIM_SCRIPT = """
+if redis.call('ZCARD', KEYS[2]) >= tonumber(ARGV[2]) then
+    return nil
+end
+local popped = redis.call('ZPOPMIN', KEYS[1])
+if #popped == 0 then
+    return nil
+end
+local job_id = popped[1]
+local now = redis.call('TIME')
+local deadline = tonumber(now[1]) + tonumber(now[2]) / 1000000 + tonumber(ARGV[1])
+redis.call('ZADD', KEYS[2], deadline, job_id)
+local attempts = redis.call('HINCRBY', KEYS[4], job_id, 1)
+return {job_id, redis.call('HGET', KEYS[3], job_id) or '', attempts}
+"""
+
+# 续约：任务仍由自己持有时延长租约
+# KEYS: processing  ARGV: 任务ID, 可见性超时（秒）
+EXTEND_SCRIPT = """
+if not redis.call('ZSCORE', KEYS[1], ARGV[1]) then
+    return 0
+end
+local now = redis.call('TIME')
+redis.call('ZADD', KEYS[1], 'XX', tonumber(now[1]) + tonumber(now[2]) / 1000000 + tonumber(ARGV[2]), ARGV[1])
+return 1
+"""
+
+# 回收租约到期的任务：未超过最大领取次数的按原分数放回队列，其余丢弃
+# KEYS: waiting, processing, jobs, attempts, scores  ARGV: 最大领取次数, 单次最多处理数量
+REQUEUE_SCRIPT = """
+local now = redis.call('TIME')
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', tonumber(now[1]) + tonumber(now[2]) / 1000000,
+                           'LIMIT', 0, tonumber(ARGV[2]))
+local requeued, dead = {}, {}
+for _, job_id in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], job_id)
+    local attempts = tonumber(redis.call('HGET', KEYS[4], job_id) or '0')
+    if attempts >= tonumber(ARGV[1]) then
+        redis.call('HDEL', KEYS[3], job_id)
+        redis.call('HDEL', KEYS[4], job_id)
+        redis.call('HDEL', KEYS[5], job_id)
+        table.insert(dead, job_id)
+    else
+        redis.call('ZADD', KEYS[1], tonumber(redis.call('HGET', KEYS[5], job_id) or '0'), job_id)
+        table.insert(requeued, job_id)
+    end
+end
+return {requeued, dead}
+"""
+
+# 以指数移动平均更新任务平均耗时
+# KEYS: stats  ARGV: 本次耗时（秒）, 平滑系数
+RECORD_DURATION_SCRIPT = """
+local average = tonumber(redis.call('HGET', KEYS[1], 'avg_duration'))
+local duration = tonumber(ARGV[1])
+if average then
+    duration = average + tonumber(ARGV[2]) * (duration - average)
+end
+redis.call('HSET', KEYS[1], 'avg_duration', tostring(duration))
+return tostring(duration)
+"""
+
+# 耗时移动平均的平滑系数
+DURATION_SMOOTHING = 0.2
+
+
+class RedisJobQueue:
+    """报告任务队列"""
+    
+    def __init__(self, pool: aioredis.ConnectionPool, key_prefix: str = TASK_QUEUE_CONFIG["key_prefix"],
+                 visibility_timeout: int = TASK_QUEUE_CONFIG["visibility_timeout"],
+                 max_attempts: int = TASK_QUEUE_CONFIG["max_attempts"],
+                 max_running: int = SCHEDULER_CONFIG["max_running_jobs"],
+                 max_queued: int = SCHEDULER_CONFIG["max_queued_jobs"]):
+        self.client = aioredis.Redis(connection_pool=pool)
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.waiting_key = f"{key_prefix}waiting"
+        self.processing_key = f"{key_prefix}processing"
+        self.jobs_key = f"{key_prefix}jobs"
+        self.scores_key = f"{key_prefix}scores"
+        self.attempts_key = f"{key_prefix}attempts"
+        self.stats_key = f"{key_prefix}stats"
+        self._enqueue_script = self.client.register_script(ENQUEUE_SCRIPT)
+        self._claim_script = self.client.register_script(CLAIM_SCRIPT)
+        self._extend_script = self.client.register_script(EXTEND_SCRIPT)
+        self._requeue_script = self.client.register_script(REQUEUE_SCRIPT)
+        self._record_duration_script = self.client.register_script(RECORD_DURATION_SCRIPT)
+    
+    @property
+    def _keys(self) -> List[str]:
+        return [self.waiting_key, self.processing_key, self.jobs_key, self.attempts_key]
+    
+    async def enqueue(self, job_id: str, payload: Dict[str, Any], priority: str = "normal") -> bool:
+        """提交任务，排队任务数已达上限时返回 False"""
+        return bool(await self._enqueue_script(
+            keys=[self.waiting_key, self.jobs_key, self.scores_key],
+            args=[job_id, json.dumps(payload, ensure_ascii=False), TASK_PRIORITIES[priority], self.max_queued]
+        ))
+    
+    async def claim(self) -> Optional[Tuple[str, Dict[str, Any], int]]:
+        """领取一个任务，返回 (任务ID, 参数, 第几次领取)；队列为空或执行中的任务已达全局上限时返回 None"""
+        result = await self._claim_script(keys=self._keys, args=[self.visibility_timeout, self.max_running])
+        if not result:
+            return None
+        job_id, payload, attempts = result
+        return job_id, json.loads(payload) if payload else {}, int(attempts)
+    
+    async def extend(self, job_id: str) -> bool:
+        """续约，返回 False 表示租约已丢失（已到期并被重新放回队列）"""
+        return bool(await self._extend_script(
+            keys=[self.processing_key], args=[job_id, self.visibility_timeout]
+        ))
+    
+    async def ack(self, job_id: str) -> None:
+        """任务执行结束（成功或失败），从队列中移除"""
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.zrem(self.processing_key, job_id)
+            pipe.hdel(self.jobs_key, job_id)
+            pipe.hdel(self.scores_key, job_id)
+            pipe.hdel(self.attempts_key, job_id)
+            await pipe.execute()
+    
+    async def requeue_expired(self, limit: int = 100) -> Tuple[List[str], List[str]]:
+        """回收租约到期的任务，返回 (重新入队的任务ID, 超过重试次数被丢弃的任务ID)"""
+        requeued, dead = await self._requeue_script(
+            keys=self._keys + [self.scores_key], args=[self.max_attempts, limit]
+        )
+        return list(requeued), list(dead)
+    
+    async def position(self, job_id: str) -> Optional[int]:
+        """任务前面还有多少个排队任务，任务不在排队中时返回 None"""
+        return await self.client.zrank(self.waiting_key, job_id)
+    
+    async def record_duration(self, seconds: float) -> None:
+        """记录一次任务耗时"""
+        await self._record_duration_script(keys=[self.stats_key], args=[seconds, DURATION_SMOOTHING])
+    
+    async def average_duration(self) -> Optional[float]:
+        """任务平均耗时（秒），还没有记录时返回 None"""
+        value = await self.client.hget(self.stats_key, "avg_duration")
+        return float(value) if value is not None else None
+    
+    async def size(self) -> Dict[str, int]:
+        """队列中等待和执行中的任务数"""
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.zcard(self.waiting_key)
+            pipe.zcard(self.processing_key)
+            pending, processing = await pipe.execute()
+        return {"pending": pending, "processing": processing}
+    
+    async def close(self) -> None:
+        await self.client.aclose()
@@ -0,0 +1,217 @@
+"""
+报告生成任务的执行逻辑，API 服务（内联模式）和独立的 worker 进程（队列模式）共用。
+"""
+import asyncio
+import hashlib
+import json
+import os
+from typing import Dict, Any, Optional
+
+import redis
+
+from core.http_client import close_async_session, close_session
+from core.executors import install_default_executor, run_in_thread, run_in_process, shutdown_executors
+from core.resource_limits import limited
+from data_loader.redis_loader import filter_data_by_date
+from data_loader.async_redis_loader import AsyncRedisLoader, create_async_pool
+from data_loader.data_digest import digest_with_stats
+from report_generator.report_creator import ReportCreator
+from pdf_generator.pdf_maker import PDFMaker
+from pdf_generator.browser_pool import BrowserPool
+from config.task_config import TASK_STORE_CONFIG, DEDUP_CONFIG
+from config.redis_config import REDIS_APP_DB
+from .task_store import BaseTaskStore, TaskUpdater, create_task_store
+
+
+# 服务停止导致任务没有执行完时写入的消息
+INTERRUPTED_MESSAGE = "报告生成失败: 服务已停止，请重新提交"
+
+
+def _load_backup_data(start_date: str, end_date: str) -> Dict:
+    """读取本地备份文件并按日期范围过滤"""
+    with open('redis_export.json', 'r', encoding='utf-8') as f:
+        return filter_data_by_date(json.load(f), start_date, end_date)
+
+
+def request_fingerprint(params: Dict[str, Any]) -> str:
+    """报告请求的指纹：话题、日期范围和输出目录相同的请求生成相同的报告"""
+    key = {
+        "topic": params["topic"].strip(),
+        "start_date": params["start_date"].strip(),
+        "end_date": params["end_date"].strip(),
+        "output_path": params.get("output_path") or "output",
+    }
+    return hashlib.sha256(json.dumps(key, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ReportRuntime:
+    """报告生成所需的共享资源：Redis 连接池、任务存储、浏览器池和执行器"""
+    
+    def __init__(self):
+        self.redis_loader: Optional[AsyncRedisLoader] = None
+        # 任务存储和任务队列使用的连接池（应用数据库，与舆情数据分开）
+        self.app_pool = None
+        self.task_store: Optional[BaseTaskStore] = None
+        self.browser_pool: Optional[BrowserPool] = None
+    
+    async def start(self, require_redis_store: bool = False) -> None:
+        """
+        创建共享资源
+
+        Args:
+            require_redis_store: 任务状态必须保存在 Redis 中（队列模式下 API 与 worker 通过它共享进度），
+                                 此时 Redis 不可用不退回内存存储
+        """
+        # 阻塞调用（asyncio.to_thread 等）统一使用有上限的共享线程池
+        install_default_executor()
+        self.redis_loader = AsyncRedisLoader()
+        await self.redis_loader.connect()
+        # 任务状态保存在单独的应用数据库中，多个进程可看到彼此的任务，读取数据时也不会扫描到
+        self.app_pool = create_async_pool(REDIS_APP_DB)
+        config = dict(TASK_STORE_CONFIG)
+        if require_redis_store:
+            config.update(backend="redis", fallback_to_memory=False)
+        self.task_store = await create_task_store(self.app_pool, config)
+        # 浏览器在第一次生成PDF时启动，之后由所有任务共享
+        self.browser_pool = BrowserPool()
+    
+    async def close(self) -> None:
+        """释放共享资源"""
+        await self.browser_pool.stop()
+        await self.task_store.close()
+        await self.app_pool.disconnect()
+        await self.redis_loader.close()
+        # 关闭模型 API 共享的 HTTP 连接池
+        await close_async_session()
+        close_session()
+        shutdown_executors()
+    
+    async def load_report_data(self, params: Dict[str, Any]) -> Dict:
+        """按请求的话题和日期范围读取Redis数据，失败时回退到本地备份文件"""
+        try:
+            return await self.redis_loader.get_all_data(
+                topic=params["topic"],
+                start_date=params["start_date"],
+                end_date=params["end_date"]
+            )
+        except (redis.RedisError, ConnectionError) as e:
+            # 只有 Redis 不可用时才使用备份数据，其他错误（如参数错误）直接让任务失败
+            print(f"从Redis读取数据失败: {e}，尝试从本地备份文件读取数据...")
+            return await run_in_thread(_load_backup_data, params["start_date"], params["end_date"])
+    
+    async def run_report(self, task_id: str, params: Dict[str, Any]) -> None:
+        """
+        生成一份报告，并把进度写入任务存储
+
+        Args:
+            task_id: 任务ID
+            params: 报告请求参数（topic、start_date、end_date、output_path、priority），
+                    以及用于合并相同请求的 fingerprint（可选）
+        """
+        # 状态更新按顺序写入任务存储，同步的进度回调中也可以直接提交
+        updater = TaskUpdater(self.task_store, task_id)
+        completed = False
+        try:
+            # 更新任务状态为进行中
+            updater.update({"status": "processing", "queue_position": 0, "eta_seconds": 0})
+            
+            # 创建ReportCreator实例
+            creator = ReportCreator()
+            
+            # 更新进度 - 开始生成报告
+            updater.update({
+                "progress": 10,
+                "message": "正在初始化报告生成..."
+            })
+            await asyncio.sleep(1)  # 给前端一些时间更新进度
+            
+            # 生成报告内容
+            updater.update({
+                "progress": 30,
+                "message": "正在生成报告内容..."
+            })
+            # 使用共享的异步连接池读取数据
+            data = await self.load_report_data(params)
+            
+            # 生成紧凑的数据摘要（CPU密集，在进程池中执行），并记录节省的token数
+            data, digest_stats = await run_in_process(digest_with_stats, data)
+            updater.update({"digest_stats": digest_stats})
+            
+            # 各阶段（大纲 + 各部分）的流式输出，写入任务进度供前端实时展示
+            stages = [creator.outline_stage] + creator.sections
+            sections = {}
+            
+            def on_section_progress(stage: str, text: str, token_count: int, done: bool):
+                sections[stage] = {
+                    "text": text,
+                    "tokens": token_count,
+                    "done": done
+                }
+                finished = sum(1 for s in sections.values() if s["done"])
+                updater.update({
+                    "sections": {stage: sections[stage]},
+                    "progress": 30 + int(30 * finished / len(stages)),
+                    "message": f"正在生成报告内容：{stage}..."
+                })
+            
+            report_content = await creator.acreate_report(data, progress_callback=on_section_progress)
+            
+            # 更新进度 - 开始生成PDF
+            updater.update({
+                "prompt_tokens": creator.prompt_token_sizes,
+                "progress": 60,
+                "message": "正在转换为PDF格式..."
+            })
+            
+            # 设置输出路径
+            output_dir = params.get("output_path") or "output"
+            os.makedirs(output_dir, exist_ok=True)
+            pdf_path = os.path.join(output_dir, f"{task_id}.pdf")
+            
+            # 生成PDF（限制同时渲染的数量）
+            pdf_maker = PDFMaker(browser_pool=self.browser_pool)
+            async with limited("pdf"):
+                await pdf_maker.amarkdown_to_pdf(
+                    markdown_content=report_content,
+                    output_path=pdf_path
+                )
+            
+            # 更新任务完成状态
+            updater.update({
+                "status": "completed",
+                "progress": 100,
+                "message": "报告生成完成",
+                "pdf_path": pdf_path
+            })
+            completed = True
+            
+        except asyncio.CancelledError:
+            # 服务停止时被取消，任务不会再继续执行
+            updater.update({"status": "failed", "message": INTERRUPTED_MESSAGE})
+            raise
+        except Exception as e:
+            # 更新任务失败状态
+            updater.update({
+                "status": "failed",
+                "message": f"报告生成失败: {str(e)}"
+            })
+            raise
+        finally:
+            await updater.drain()
+            # 完成的报告在新鲜期内供相同请求复用，失败的任务不再被合并
+            await self._release_fingerprint(task_id, params, DEDUP_CONFIG["freshness_window"] if completed else 0)
+    
+    async def abandon_report(self, task_id: str, params: Dict[str, Any]) -> None:
+        """服务停止时仍在排队、不会再执行的任务：标记为失败并释放请求指纹"""
+        try:
+            await self.task_store.update(task_id, {"status": "failed", "message": INTERRUPTED_MESSAGE})
+        finally:
+            await self._release_fingerprint(task_id, params)
+    
+    async def _release_fingerprint(self, task_id: str, params: Dict[str, Any], keep: int = 0) -> None:
+        if not params.get("fingerprint"):
+            return
+        try:
+            await self.task_store.release_fingerprint(params["fingerprint"], task_id, keep)
+        except Exception as e:
+            print(f"释放任务 {task_id} 的请求指纹失败: {e}")
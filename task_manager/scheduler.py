@@ -0,0 +1,173 @@
+"""
+报告任务调度：准入控制、优先级和同时执行的任务数上限。
+
+- 内联模式（LocalScheduler）：任务在 API 进程内按优先级排队，由固定数量的执行协程领取
+- 队列模式（QueueScheduler）：任务提交到 Redis 队列，排队上限和全局执行上限由队列脚本保证
+
+排队任务已达上限时 submit 抛出 QueueFullError，API 据此返回 429。
+排队位置和预计等待时间根据任务平均耗时（指数移动平均）估算。
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional, Callable, Awaitable, List
+
+from config.task_config import SCHEDULER_CONFIG, TASK_PRIORITIES
+from .job_queue import RedisJobQueue, DURATION_SMOOTHING
+
+
+class QueueFullError(Exception):
+    """排队任务已达上限，retry_after 为建议的重试等待时间（秒）"""
+
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__(f"排队任务已达上限，请 {retry_after} 秒后重试")
+
+
+def estimate_wait(ahead: int, max_running: int, average_duration: float) -> int:
+    """前面还有 ahead 个排队任务时的预计等待时间（秒）"""
+    return int(math.ceil((ahead // max_running + 1) * average_duration))
+
+
+def estimate_retry_after(max_running: int, average_duration: float) -> int:
+    """队列已满时，预计空出一个排队位置所需的时间（秒）"""
+    return max(1, int(math.ceil(average_duration / max_running)))
+
+
+class BaseScheduler(ABC):
+    """任务调度器基类"""
+
+    def __init__(self, max_running: int = SCHEDULER_CONFIG["max_running_jobs"],
+                 default_duration: float = SCHEDULER_CONFIG["default_job_duration"]):
+        self.max_running = max_running
+        self.default_duration = default_duration
+
+    async def start(self) -> None:
+        """启动调度"""
+
+    async def stop(self) -> None:
+        """停止调度"""
+
+    @abstractmethod
+    async def submit(self, task_id: str, params: Dict[str, Any], priority: str = "normal") -> Dict[str, int]:
+        """
+        提交任务
+
+        Returns:
+            Dict: {"queue_position": 前面的排队任务数, "eta_seconds": 预计等待时间}
+
+        Raises:
+            QueueFullError: 排队任务已达上限
+        """
+
+    @abstractmethod
+    async def queue_info(self, task_id: str) -> Optional[Dict[str, int]]:
+        """任务的排队位置和预计等待时间，任务已不在排队中时返回 None"""
+
+
+class LocalScheduler(BaseScheduler):
+    """
+    API 进程内的优先级调度，同优先级先进先出
+
+    停止时取消正在执行的任务（由任务自己记录中断状态），仍在排队的任务交给 on_abandon 处理。
+    """
+
+    def __init__(self, run_job: Callable[[str, Dict[str, Any]], Awaitable[None]],
+                 on_abandon: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None,
+                 max_running: int = SCHEDULER_CONFIG["max_running_jobs"],
+                 max_queued: int = SCHEDULER_CONFIG["max_queued_jobs"],
+                 default_duration: float = SCHEDULER_CONFIG["default_job_duration"]):
+        super().__init__(max_running, default_duration)
+        self.run_job = run_job
+        self.on_abandon = on_abandon
+        self.max_queued = max_queued
+        self.average_duration = float(default_duration)
+        # (优先级, 提交序号, 任务ID, 参数)
+        self._heap: List[tuple] = []
+        self._sequence = itertools.count()
+        self._condition: Optional[asyncio.Condition] = None
+        self._runners: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._condition = asyncio.Condition()
+        self._runners = [asyncio.create_task(self._run()) for _ in range(self.max_running)]
+
+    async def stop(self) -> None:
+        for runner in self._runners:
+            runner.cancel()
+        await asyncio.gather(*self._runners, return_exceptions=True)
+        self._runners = []
+        # 仍在排队的任务不会再执行
+        while self._heap:
+            _, _, task_id, params = heapq.heappop(self._heap)
+            if self.on_abandon is None:
+                continue
+            try:
+                await self.on_abandon(task_id, params)
+            except Exception as e:
+                print(f"处理未执行的任务 {task_id} 失败: {e}")
+
+    async def submit(self, task_id: str, params: Dict[str, Any], priority: str = "normal") -> Dict[str, int]:
+        async with self._condition:
+            if len(self._heap) >= self.max_queued:
+                raise QueueFullError(estimate_retry_after(self.max_running, self.average_duration))
+            entry = (TASK_PRIORITIES[priority], next(self._sequence), task_id, params)
+            heapq.heappush(self._heap, entry)
+            self._condition.notify()
+        return self._info(entry)
+
+    async def queue_info(self, task_id: str) -> Optional[Dict[str, int]]:
+        for entry in self._heap:
+            if entry[2] == task_id:
+                return self._info(entry)
+        return None
+
+    def _info(self, entry: tuple) -> Dict[str, int]:
+        ahead = sum(1 for other in self._heap if other[:2] < entry[:2])
+        return {
+            "queue_position": ahead,
+            "eta_seconds": estimate_wait(ahead, self.max_running, self.average_duration)
+        }
+
+    async def _run(self) -> None:
+        while True:
+            async with self._condition:
+                await self._condition.wait_for(lambda: self._heap)
+                _, _, task_id, params = heapq.heappop(self._heap)
+            started = time.monotonic()
+            try:
+                await self.run_job(task_id, params)
+            except Exception as e:
+                # 失败状态已由任务本身写入任务存储
+                print(f"任务 {task_id} 失败: {e}")
+            self.average_duration += DURATION_SMOOTHING * (time.monotonic() - started - self.average_duration)
+
+
+class QueueScheduler(BaseScheduler):
+    """提交到 Redis 队列，由 worker 进程执行"""
+
+    def __init__(self, queue: RedisJobQueue,
+                 default_duration: float = SCHEDULER_CONFIG["default_job_duration"]):
+        super().__init__(queue.max_running, default_duration)
+        self.queue = queue
+
+    async def _average_duration(self) -> float:
+        average = await self.queue.average_duration()
+        return self.default_duration if average is None else average
+
+    async def submit(self, task_id: str, params: Dict[str, Any], priority: str = "normal") -> Dict[str, int]:
+        if not await self.queue.enqueue(task_id, params, priority):
+            raise QueueFullError(estimate_retry_after(self.max_running, await self._average_duration()))
+        return await self.queue_info(task_id) or {"queue_position": 0, "eta_seconds": 0}
+
+    async def queue_info(self, task_id: str) -> Optional[Dict[str, int]]:
+        ahead = await self.queue.position(task_id)
+        if ahead is None:
+            return None
+        return {
+            "queue_position": ahead,
+            "eta_seconds": estimate_wait(ahead, self.max_running, await self._average_duration())
+        }
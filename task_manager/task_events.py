@@ -0,0 +1,59 @@
+"""
+任务进度事件的进程内分发。
+
+任务存储每次更新任务后发布一个事件（更新的字段），订阅者按任务ID接收。
+多个进程部署时，事件经 Redis pub/sub 广播，每个进程只用一个订阅连接，
+再由本模块分发给进程内的所有订阅者（SSE / WebSocket 连接）。
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, Set
+
+from config.task_config import TASK_EVENTS_CONFIG
+
+# 订阅者队列溢出或事件可能丢失时放入的标记，订阅者应从任务存储重新读取完整状态
+RESYNC = None
+
+
+class LocalEventBus:
+    """按任务ID把事件分发给进程内的订阅者"""
+
+    def __init__(self, queue_size: int = TASK_EVENTS_CONFIG["subscriber_queue_size"]):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    @asynccontextmanager
+    async def subscribe(self, task_id: str):
+        """订阅任务事件，返回的队列中依次是更新的字段或 RESYNC 标记"""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(task_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(task_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[task_id]
+
+    def has_subscribers(self, task_id: str) -> bool:
+        return task_id in self._subscribers
+
+    def dispatch(self, task_id: str, event: Optional[Dict[str, Any]]) -> None:
+        """分发事件；订阅者处理不过来时丢弃其积压的事件，改为通知重新同步"""
+        for queue in self._subscribers.get(task_id, ()):
+            self._put(queue, event)
+
+    def resync_all(self) -> None:
+        """通知所有订阅者重新同步（如广播连接中断后可能丢失了事件）"""
+        for subscribers in self._subscribers.values():
+            for queue in subscribers:
+                self._put(queue, RESYNC)
+
+    @staticmethod
+    def _put(queue: asyncio.Queue, event: Optional[Dict[str, Any]]) -> None:
+        if queue.full():
+            while not queue.empty():
+                queue.get_nowait()
+            event = RESYNC
+        queue.put_nowait(event)
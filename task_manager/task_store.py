@@ -0,0 +1,590 @@
+"""
+报告任务状态存储。
+
+任务状态以字段字典表示（status、progress、message、created_at 等），每个字段的值
+以 JSON 编码保存，读取时还原类型。各阶段的流式输出保存为 "section:<阶段名>" 字段，
+读取时合并为 sections 字典，更新单个阶段时无需读改写整个字典。
+
+任务按创建时间建立索引，另按状态分别建立索引，状态变化时在同一次原子更新中维护；
+列出任务时按游标分页，每页的开销只与页大小有关，与任务总数无关。
+
+每次更新任务后发布一个进度事件（本次更新的字段），供 SSE / WebSocket 推送；
+Redis 存储经 pub/sub 在进程间广播，每个进程只维持一个订阅连接。
+
+另外按请求指纹记录对应的任务，用于合并相同的报告请求：指纹在任务执行期间指向该任务，
+任务完成后在新鲜期内继续保留，失败时删除。
+"""
+import asyncio
+import base64
+import bisect
+import json
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+from config.task_config import TASK_STORE_CONFIG
+from .task_events import LocalEventBus
+
+SECTION_FIELD_PREFIX = "section:"
+
+TASK_STATUSES = ("pending", "processing", "completed", "failed")
+
+# 原子更新任务字段：任务不存在（已过期或被删除）时不写入；进度只增不减；状态变化时移动状态索引；写入后刷新TTL
+# KEYS[1] 任务哈希  KEYS[2] 创建时间索引
+# ARGV[1] TTL（秒）  ARGV[2] 任务ID  ARGV[3] 状态索引键前缀  ARGV[4..] 字段名、值交替
+UPDATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+for i = 4, #ARGV, 2 do
+    local field, value = ARGV[i], ARGV[i + 1]
+    if field == 'progress' then
+        local current = tonumber(redis.call('HGET', KEYS[1], 'progress') or '0') or 0
+        if (tonumber(value) or 0) >= current then
+            redis.call('HSET', KEYS[1], field, value)
+        end
+    else
+        if field == 'status' then
+            local previous = redis.call('HGET', KEYS[1], 'status')
+            local score = redis.call('ZSCORE', KEYS[2], ARGV[2])
+            if previous ~= value and score then
+                if previous then
+                    redis.call('ZREM', ARGV[3] .. cjson.decode(previous), ARGV[2])
+                end
+                redis.call('ZADD', ARGV[3] .. cjson.decode(value), score, ARGV[2])
+            end
+        end
+        redis.call('HSET', KEYS[1], field, value)
+    end
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
+
+# 登记指纹：指纹不存在或仍指向 ARGV[3] 时改为指向新任务，否则返回当前指向的任务
+# KEYS[1] 指纹键  ARGV[1] 任务ID  ARGV[2] TTL（秒）  ARGV[3] 允许替换的任务ID（可为空）
+CLAIM_FINGERPRINT_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if current and current ~= ARGV[3] then
+    return current
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return false
+"""
+
+# 释放指纹：仍指向该任务时，保留时间大于0则重设TTL，否则删除
+# KEYS[1] 指纹键  ARGV[1] 任务ID  ARGV[2] 保留时间（秒）
+RELEASE_FINGERPRINT_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+if tonumber(ARGV[2]) > 0 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+else
+    redis.call('DEL', KEYS[1])
+end
+return 1
+"""
+
+
+def encode_fields(fields: Dict[str, Any]) -> Dict[str, str]:
+    """把任务字段编码为哈希字段，sections 拆分为逐阶段字段"""
+    encoded = {}
+    for name, value in fields.items():
+        if name == "sections":
+            for stage, section in value.items():
+                encoded[SECTION_FIELD_PREFIX + stage] = json.dumps(section, ensure_ascii=False)
+        else:
+            encoded[name] = json.dumps(value, ensure_ascii=False)
+    return encoded
+
+
+def decode_fields(raw: Dict[str, str]) -> Dict[str, Any]:
+    """把哈希字段还原为任务字典"""
+    task: Dict[str, Any] = {}
+    sections = {}
+    for name, value in raw.items():
+        if name.startswith(SECTION_FIELD_PREFIX):
+            sections[name[len(SECTION_FIELD_PREFIX):]] = json.loads(value)
+        else:
+            task[name] = json.loads(value)
+    if sections:
+        task["sections"] = sections
+    return task
+
+
+def created_timestamp(fields: Dict[str, Any]) -> float:
+    """任务创建时间（created_at 为 ISO 格式字符串）对应的时间戳，用作索引分数"""
+    created_at = fields.get("created_at")
+    return datetime.fromisoformat(created_at).timestamp() if created_at else time.time()
+
+
+def encode_cursor(score: float, task_id: str) -> str:
+    """分页游标：上一页最后一个任务的 (创建时间戳, 任务ID)"""
+    return base64.urlsafe_b64encode(json.dumps([score, task_id]).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    """
+    解析分页游标
+
+    Raises:
+        ValueError: 游标无效
+    """
+    try:
+        score, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return float(score), str(task_id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"无效的分页游标: {cursor}") from e
+
+
+class BaseTaskStore(ABC):
+    """任务状态存储基类"""
+    
+    def __init__(self, ttl: int = TASK_STORE_CONFIG["ttl"]):
+        self.ttl = ttl
+        self.events = LocalEventBus()
+    
+    def subscribe(self, task_id: str):
+        """订阅任务的进度事件（异步上下文管理器），队列中依次是每次更新的字段或 RESYNC 标记"""
+        return self.events.subscribe(task_id)
+    
+    @abstractmethod
+    async def create(self, task_id: str, fields: Dict[str, Any]) -> None:
+        """创建任务"""
+    
+    @abstractmethod
+    async def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """读取任务，不存在或已过期时返回 None"""
+    
+    @abstractmethod
+    async def update(self, task_id: str, fields: Dict[str, Any]) -> bool:
+        """原子地更新任务字段（进度只增不减），任务不存在时返回 False"""
+    
+    @abstractmethod
+    async def delete(self, task_id: str) -> None:
+        """删除任务"""
+    
+    @abstractmethod
+    async def list(self, limit: int = 50, cursor: Optional[str] = None, status: Optional[str] = None,
+                   created_after: Optional[float] = None, created_before: Optional[float] = None,
+                   fields: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        按创建时间从新到旧分页列出任务
+
+        Args:
+            limit: 每页任务数
+            cursor: 上一页返回的游标，为空时从最新的任务开始
+            status: 只列出该状态的任务
+            created_after: 只列出创建时间不早于该时间戳的任务
+            created_before: 只列出创建时间早于该时间戳的任务
+            fields: 只返回这些字段，为空时返回全部字段
+
+        Returns:
+            Tuple: (任务列表（每项包含 task_id）, 下一页的游标（没有更多任务时为 None）)
+
+        Raises:
+            ValueError: 游标无效
+        """
+    
+    @abstractmethod
+    async def count_by_status(self) -> Dict[str, int]:
+        """各状态的任务数"""
+    
+    @abstractmethod
+    async def claim_fingerprint(self, fingerprint: str, task_id: str, ttl: int,
+                                replace: Optional[str] = None) -> Optional[str]:
+        """
+        原子地把请求指纹指向任务
+
+        Args:
+            fingerprint: 请求指纹
+            task_id: 新任务ID
+            ttl: 指纹保留时间（秒）
+            replace: 指纹仍指向该任务时允许替换（原任务已失败或产物不可用）
+
+        Returns:
+            Optional[str]: 登记成功返回 None，否则返回指纹当前指向的任务ID
+        """
+    
+    @abstractmethod
+    async def release_fingerprint(self, fingerprint: str, task_id: str, keep: int = 0) -> None:
+        """指纹仍指向该任务时，保留 keep 秒后过期（keep 为 0 时立即删除）"""
+    
+    async def close(self) -> None:
+        """释放资源"""
+
+
+class InMemoryTaskStore(BaseTaskStore):
+    """进程内任务存储，仅适用于单进程部署；过期任务在访问时清理"""
+    
+    def __init__(self, ttl: int = TASK_STORE_CONFIG["ttl"]):
+        super().__init__(ttl)
+        # task_id -> (过期时间戳, 编码后的字段)，字典按创建顺序排列
+        self._tasks: Dict[str, tuple] = {}
+        # 索引：按 (创建时间戳, 任务ID) 升序排列的列表，全部任务一个，每种状态各一个
+        self._scores: Dict[str, float] = {}
+        self._index: List[Tuple[float, str]] = []
+        self._status_index: Dict[str, List[Tuple[float, str]]] = {}
+        # 指纹 -> (过期时间戳, 任务ID)
+        self._fingerprints: Dict[str, tuple] = {}
+    
+    def _purge(self) -> None:
+        now = time.time()
+        for task_id in [t for t, (expires_at, _) in self._tasks.items() if expires_at < now]:
+            self._remove(task_id)
+        for fingerprint in [f for f, (expires_at, _) in self._fingerprints.items() if expires_at < now]:
+            del self._fingerprints[fingerprint]
+    
+    @staticmethod
+    def _index_remove(entries: List[Tuple[float, str]], entry: Tuple[float, str]) -> None:
+        position = bisect.bisect_left(entries, entry)
+        if position < len(entries) and entries[position] == entry:
+            del entries[position]
+    
+    def _remove(self, task_id: str) -> None:
+        item = self._tasks.pop(task_id, None)
+        score = self._scores.pop(task_id, None)
+        if item is None or score is None:
+            return
+        self._index_remove(self._index, (score, task_id))
+        status = json.loads(item[1].get("status", "null"))
+        self._index_remove(self._status_index.get(status, []), (score, task_id))
+    
+    async def create(self, task_id: str, fields: Dict[str, Any]) -> None:
+        self._purge()
+        self._remove(task_id)
+        score = created_timestamp(fields)
+        self._tasks[task_id] = (time.time() + self.ttl, encode_fields(fields))
+        self._scores[task_id] = score
+        bisect.insort(self._index, (score, task_id))
+        if "status" in fields:
+            bisect.insort(self._status_index.setdefault(fields["status"], []), (score, task_id))
+    
+    async def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        item = self._tasks.get(task_id)
+        if item is None or item[0] < time.time():
+            return None
+        return decode_fields(item[1])
+    
+    async def update(self, task_id: str, fields: Dict[str, Any]) -> bool:
+        item = self._tasks.get(task_id)
+        if item is None or item[0] < time.time():
+            return False
+        raw = item[1]
+        previous = json.loads(raw.get("status", "null"))
+        if "status" in fields and fields["status"] != previous:
+            entry = (self._scores[task_id], task_id)
+            self._index_remove(self._status_index.get(previous, []), entry)
+            bisect.insort(self._status_index.setdefault(fields["status"], []), entry)
+        for name, value in encode_fields(fields).items():
+            if name == "progress" and json.loads(value) < json.loads(raw.get("progress", "0")):
+                continue
+            raw[name] = value
+        self._tasks[task_id] = (time.time() + self.ttl, raw)
+        self.events.dispatch(task_id, fields)
+        return True
+    
+    async def delete(self, task_id: str) -> None:
+        self._remove(task_id)
+    
+    async def list(self, limit: int = 50, cursor: Optional[str] = None, status: Optional[str] = None,
+                   created_after: Optional[float] = None, created_before: Optional[float] = None,
+                   fields: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        entries = self._status_index.get(status, []) if status else self._index
+        # 在索引上二分定位范围，从新到旧取一页，跳过已过期的任务
+        end = len(entries)
+        if created_before is not None:
+            end = bisect.bisect_left(entries, (created_before,))
+        if cursor:
+            end = min(end, bisect.bisect_left(entries, decode_cursor(cursor)))
+        start = 0 if created_after is None else bisect.bisect_left(entries, (created_after,))
+        
+        now = time.time()
+        page: List[Tuple[float, str]] = []
+        position = end - 1
+        while position >= start and len(page) <= limit:
+            task_id = entries[position][1]
+            if self._tasks[task_id][0] >= now:
+                page.append(entries[position])
+            position -= 1
+        
+        next_cursor = encode_cursor(*page[limit - 1]) if len(page) > limit else None
+        tasks = []
+        for _, task_id in page[:limit]:
+            task = decode_fields(self._tasks[task_id][1])
+            if fields:
+                task = {name: task[name] for name in fields if name in task}
+            tasks.append({"task_id": task_id, **task})
+        return tasks, next_cursor
+    
+    async def count_by_status(self) -> Dict[str, int]:
+        self._purge()
+        return {status: len(self._status_index.get(status, [])) for status in TASK_STATUSES}
+    
+    async def claim_fingerprint(self, fingerprint: str, task_id: str, ttl: int,
+                                replace: Optional[str] = None) -> Optional[str]:
+        self._purge()
+        item = self._fingerprints.get(fingerprint)
+        if item is not None and item[1] != replace:
+            return item[1]
+        self._fingerprints[fingerprint] = (time.time() + ttl, task_id)
+        return None
+    
+    async def release_fingerprint(self, fingerprint: str, task_id: str, keep: int = 0) -> None:
+        item = self._fingerprints.get(fingerprint)
+        if item is None or item[1] != task_id:
+            return
+        if keep > 0:
+            self._fingerprints[fingerprint] = (time.time() + keep, task_id)
+        else:
+            del self._fingerprints[fingerprint]
+
+
+class RedisTaskStore(BaseTaskStore):
+    """
+    Redis 任务存储，多个 worker 进程共享
+
+    每个任务一个哈希（带TTL），另有按 created_at 排序的有序集合作为索引，每种状态各一个；
+    哈希过期后，索引中残留的成员在列出任务时清理，创建时间超过TTL的成员在创建新任务时批量清理。
+    """
+    
+    def __init__(self, pool: aioredis.ConnectionPool, ttl: int = TASK_STORE_CONFIG["ttl"],
+                 key_prefix: str = TASK_STORE_CONFIG["key_prefix"]):
+        super().__init__(ttl)
+        self.client = aioredis.Redis(connection_pool=pool)
+        self.key_prefix = key_prefix
+        self.index_key = f"{key_prefix}index"
+        self.status_prefix = f"{key_prefix}status:"
+        self._update_script = self.client.register_script(UPDATE_SCRIPT)
+        self._claim_fingerprint_script = self.client.register_script(CLAIM_FINGERPRINT_SCRIPT)
+        self._release_fingerprint_script = self.client.register_script(RELEASE_FINGERPRINT_SCRIPT)
+        self.events_prefix = f"{key_prefix}events:"
+        self._listener: Optional[asyncio.Task] = None
+    
+    def _key(self, task_id: str) -> str:
+        return f"{self.key_prefix}{task_id}"
+    
+    def _status_key(self, status: str) -> str:
+        return f"{self.status_prefix}{status}"
+    
+    @property
+    def _index_keys(self) -> List[str]:
+        return [self.index_key] + [self._status_key(status) for status in TASK_STATUSES]
+    
+    def _fingerprint_key(self, fingerprint: str) -> str:
+        return f"{self.key_prefix}fingerprint:{fingerprint}"
+    
+    async def ping(self) -> bool:
+        try:
+            return await self.client.ping()
+        except redis.RedisError as e:
+            print(f"任务存储Redis健康检查失败: {e}")
+            return False
+    
+    async def create(self, task_id: str, fields: Dict[str, Any]) -> None:
+        key = self._key(task_id)
+        score = created_timestamp(fields)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=encode_fields(fields))
+            pipe.expire(key, self.ttl)
+            pipe.zadd(self.index_key, {task_id: score})
+            if "status" in fields:
+                pipe.zadd(self._status_key(fields["status"]), {task_id: score})
+            # 创建时间早于TTL的任务已基本全部过期，从索引中批量移除
+            for index_key in self._index_keys:
+                pipe.zremrangebyscore(index_key, "-inf", f"({time.time() - self.ttl}")
+            await pipe.execute()
+    
+    async def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self.client.hgetall(self._key(task_id))
+        return decode_fields(raw) if raw else None
+    
+    async def update(self, task_id: str, fields: Dict[str, Any]) -> bool:
+        args = [self.ttl, task_id, self.status_prefix]
+        for name, value in encode_fields(fields).items():
+            args.extend([name, value])
+        if not await self._update_script(keys=[self._key(task_id), self.index_key], args=args):
+            return False
+        await self.client.publish(f"{self.events_prefix}{task_id}", json.dumps(fields, ensure_ascii=False))
+        return True
+    
+    async def delete(self, task_id: str) -> None:
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(self._key(task_id))
+            for index_key in self._index_keys:
+                pipe.zrem(index_key, task_id)
+            await pipe.execute()
+    
+    async def list(self, limit: int = 50, cursor: Optional[str] = None, status: Optional[str] = None,
+                   created_after: Optional[float] = None, created_before: Optional[float] = None,
+                   fields: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        index_key = self._status_key(status) if status else self.index_key
+        after = decode_cursor(cursor) if cursor else None
+        upper = "+inf" if created_before is None else f"({created_before}"
+        if after is not None and (created_before is None or after[0] < created_before):
+            # 包含与游标创建时间相同的任务，再按任务ID排除游标及之前的部分
+            upper = str(after[0])
+        lower = "-inf" if created_after is None else str(created_after)
+        
+        # 多取一个用于判断是否还有下一页
+        entries: List[Tuple[float, str]] = []
+        offset = 0
+        while len(entries) <= limit:
+            rows = await self.client.zrevrangebyscore(
+                index_key, upper, lower, start=offset, num=limit + 1, withscores=True
+            )
+            for task_id, score in rows:
+                if after is None or (score, task_id) < after:
+                    entries.append((score, task_id))
+            if len(rows) <= limit:
+                break
+            offset += len(rows)
+        
+        next_cursor = encode_cursor(*entries[limit - 1]) if len(entries) > limit else None
+        page = entries[:limit]
+        if not page:
+            return [], None
+        if fields:
+            # status 一定存在，用于判断任务是否已过期
+            names = list(dict.fromkeys(["status"] + fields))
+        async with self.client.pipeline(transaction=False) as pipe:
+            for _, task_id in page:
+                if fields:
+                    pipe.hmget(self._key(task_id), names)
+                else:
+                    pipe.hgetall(self._key(task_id))
+            results = await pipe.execute()
+        
+        tasks, expired = [], []
+        for (_, task_id), raw in zip(page, results):
+            if fields:
+                raw = {name: value for name, value in zip(names, raw) if value is not None}
+            if raw:
+                task = decode_fields(raw)
+                if fields:
+                    task = {name: task[name] for name in fields if name in task}
+                tasks.append({"task_id": task_id, **task})
+            else:
+                expired.append(task_id)
+        if expired:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for index_key in self._index_keys:
+                    pipe.zrem(index_key, *expired)
+                await pipe.execute()
+        return tasks, next_cursor
+    
+    async def count_by_status(self) -> Dict[str, int]:
+        # 只统计创建时间在TTL内的任务，与创建任务时的索引清理一致
+        since = time.time() - self.ttl
+        async with self.client.pipeline(transaction=False) as pipe:
+            for status in TASK_STATUSES:
+                pipe.zcount(self._status_key(status), since, "+inf")
+            counts = await pipe.execute()
+        return dict(zip(TASK_STATUSES, counts))
+    
+    async def claim_fingerprint(self, fingerprint: str, task_id: str, ttl: int,
+                                replace: Optional[str] = None) -> Optional[str]:
+        return await self._claim_fingerprint_script(
+            keys=[self._fingerprint_key(fingerprint)], args=[task_id, ttl, replace or ""]
+        )
+    
+    async def release_fingerprint(self, fingerprint: str, task_id: str, keep: int = 0) -> None:
+        await self._release_fingerprint_script(keys=[self._fingerprint_key(fingerprint)], args=[task_id, keep])
+    
+    def subscribe(self, task_id: str):
+        # 第一次订阅时启动本进程共享的广播监听
+        if self._listener is None:
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        return super().subscribe(task_id)
+    
+    async def _listen(self) -> None:
+        """监听所有任务的进度广播，分发给本进程内的订阅者；连接中断后自动重连"""
+        while True:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(f"{self.events_prefix}*")
+                # 订阅建立之前（或重连期间）的事件可能已丢失
+                self.events.resync_all()
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    task_id = message["channel"][len(self.events_prefix):]
+                    if self.events.has_subscribers(task_id):
+                        self.events.dispatch(task_id, json.loads(message["data"]))
+            except redis.RedisError as e:
+                print(f"任务进度广播连接中断: {e}，稍后重连")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+    
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+        await self.client.aclose()
+
+
+class TaskUpdater:
+    """
+    按顺序把同一任务的状态更新写入存储
+
+    进度回调是同步函数，不能直接等待存储写入。update() 只合并待写字段，由单个后台协程
+    依次写入：写入之间到达的多次更新合并为一次，后到的值覆盖先到的值，不会乱序。
+    """
+    
+    def __init__(self, store: BaseTaskStore, task_id: str):
+        self.store = store
+        self.task_id = task_id
+        self._pending: Dict[str, Any] = {}
+        self._flusher: Optional[asyncio.Task] = None
+    
+    def update(self, fields: Dict[str, Any]) -> None:
+        """提交更新（不等待写入完成）；sections 按阶段合并，进度取较大值"""
+        for name, value in fields.items():
+            if name == "sections":
+                self._pending.setdefault("sections", {}).update(value)
+            elif name == "progress" and "progress" in self._pending:
+                self._pending["progress"] = max(self._pending["progress"], value)
+            else:
+                self._pending[name] = value
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.get_running_loop().create_task(self._flush())
+    
+    async def _flush(self) -> None:
+        while self._pending:
+            fields, self._pending = self._pending, {}
+            try:
+                await self.store.update(self.task_id, fields)
+            except Exception as e:
+                print(f"写入任务 {self.task_id} 状态失败: {e}")
+    
+    async def drain(self) -> None:
+        """等待已提交的更新全部写入"""
+        if self._flusher is not None:
+            await self._flusher
+
+
+async def create_task_store(pool: Optional[aioredis.ConnectionPool] = None,
+                            config: Dict[str, Any] = TASK_STORE_CONFIG) -> BaseTaskStore:
+    """根据配置创建任务存储；Redis 不可用且允许回退时使用内存存储"""
+    backend = config.get("backend", "memory")
+    if backend == "memory":
+        return InMemoryTaskStore(config["ttl"])
+    if backend != "redis":
+        raise ValueError(f"不支持的任务存储后端: {backend}")
+    
+    if pool is None:
+        from data_loader.async_redis_loader import create_async_pool
+        from config.redis_config import REDIS_APP_DB
+        pool = create_async_pool(REDIS_APP_DB)
+    store = RedisTaskStore(pool, config["ttl"], config["key_prefix"])
+    if not await store.ping() and config.get("fallback_to_memory"):
+        print("任务存储无法连接Redis，退回内存存储（多个 worker 之间的任务状态互不可见）")
+        await store.close()
+        return InMemoryTaskStore(config["ttl"])
+    return store
@@ -0,0 +1,23 @@
+import os
+
+import pytest
+import redis
+import redis.asyncio as aioredis
+
+# 测试使用的 Redis（会清空该数据库），连不上时跳过依赖 Redis 的测试
+REDIS_TEST_URL = os.environ.get("REDIS_TEST_URL", "redis://localhost:6379/15")
+
+
+@pytest.fixture
+async def redis_pool():
+    try:
+        redis.Redis.from_url(REDIS_TEST_URL, socket_connect_timeout=1).ping()
+    except redis.RedisError:
+        pytest.skip(f"无法连接测试用 Redis: {REDIS_TEST_URL}")
+    pool = aioredis.ConnectionPool.from_url(REDIS_TEST_URL, decode_responses=True)
+    client = aioredis.Redis(connection_pool=pool)
+    await client.flushdb()
+    yield pool
+    await client.flushdb()
+    await client.aclose()
+    await pool.disconnect()
@@ -0,0 +1,59 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+from task_manager.task_store import InMemoryTaskStore
+
+
+class FakeScheduler:
+    def __init__(self, queued=()):
+        self.queued = set(queued)
+
+    async def queue_info(self, task_id):
+        return {"queue_position": 0, "eta_seconds": 1} if task_id in self.queued else None
+
+
+@pytest.fixture
+def state():
+    state = api.app.state
+    state.task_store = InMemoryTaskStore()
+    state.scheduler = FakeScheduler()
+    state.job_queue = None
+    return state
+
+
+async def test_inline_pending_task_reused_while_queued(state):
+    state.scheduler.queued.add("old")
+    await state.task_store.create("old", {"status": "pending"})
+    await state.task_store.claim_fingerprint("fp", "old", 3600)
+    
+    assert await api._claim_request("fp", "new") == "old"
+
+
+async def test_inline_pending_task_not_in_queue_is_replaced(state):
+    await state.task_store.create("old", {"status": "pending"})
+    await state.task_store.claim_fingerprint("fp", "old", 3600)
+    
+    assert await api._claim_request("fp", "new") is None
+    assert await state.task_store.claim_fingerprint("fp", "other", 3600) == "new"
+
+
+async def test_queue_mode_pending_task_reused(state):
+    state.job_queue = object()
+    await state.task_store.create("old", {"status": "pending"})
+    await state.task_store.claim_fingerprint("fp", "old", 3600)
+    
+    assert await api._claim_request("fp", "new") == "old"
+
+
+@pytest.mark.parametrize("start_date, end_date", [
+    ("2024/01/01", "2024-01-31"),
+    ("2024-01-01", "2024-02-30"),
+    ("20240101", "2024-01-31"),
+])
+def test_generate_report_rejects_bad_dates(start_date, end_date):
+    response = TestClient(api.app).post("/generate-report/", json={
+        "topic": "话题", "start_date": start_date, "end_date": end_date
+    })
+    
+    assert response.status_code == 422
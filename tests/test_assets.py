@@ -0,0 +1,34 @@
+import pytest
+
+from pdf_generator import assets
+from pdf_generator.browser_pool import BrowserPool
+
+
+@pytest.fixture
+def asset_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(assets, "ASSET_DIR", str(tmp_path))
+    monkeypatch.setattr(assets, "_asset_cache", {})
+    return tmp_path
+
+
+def test_pinned_copy_is_used(asset_dir):
+    (asset_dir / assets.PDF_ASSETS["mermaid"]["file"]).write_bytes(b"window.mermaid = {};")
+    
+    assert assets.load_asset_by_url(assets.asset_url("mermaid")) == b"window.mermaid = {};"
+    assert "mermaid" not in assets.missing_assets()
+
+
+async def test_offline_browser_pool_fails_without_assets(asset_dir, monkeypatch):
+    monkeypatch.setitem(assets.PDF_CONFIG, "offline", True)
+    pool = BrowserPool()
+    
+    with pytest.raises(RuntimeError, match="离线模式下缺少本地脚本"):
+        await pool.start()
+    assert not pool.started
+
+
+def test_online_mode_only_warns(asset_dir, monkeypatch, capsys):
+    monkeypatch.setitem(assets.PDF_CONFIG, "offline", False)
+    
+    assets.check_assets()
+    assert "将从CDN加载" in capsys.readouterr().out
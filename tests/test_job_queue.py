@@ -0,0 +1,89 @@
+import redis.asyncio as aioredis
+
+from task_manager.job_queue import RedisJobQueue
+
+
+def make_queue(pool, **kwargs):
+    options = {"visibility_timeout": 60, "max_attempts": 2, "max_running": 4, "max_queued": 10}
+    options.update(kwargs)
+    return RedisJobQueue(pool, key_prefix="test_queue:", **options)
+
+
+async def test_claim_by_priority_then_fifo(redis_pool):
+    queue = make_queue(redis_pool)
+    await queue.enqueue("low", {"n": 1}, "low")
+    await queue.enqueue("first", {"n": 2})
+    await queue.enqueue("second", {"n": 3})
+    await queue.enqueue("high", {"n": 4}, "high")
+    
+    assert await queue.position("high") == 0
+    assert await queue.position("low") == 3
+    claimed = [await queue.claim() for _ in range(4)]
+    
+    assert claimed == [("high", {"n": 4}, 1), ("first", {"n": 2}, 1), ("second", {"n": 3}, 1), ("low", {"n": 1}, 1)]
+    assert await queue.claim() is None
+    assert await queue.size() == {"pending": 0, "processing": 4}
+
+
+async def test_enqueue_rejected_when_queue_full(redis_pool):
+    queue = make_queue(redis_pool, max_queued=1)
+    
+    assert await queue.enqueue("a", {})
+    assert not await queue.enqueue("b", {})
+
+
+async def test_claim_respects_global_running_limit(redis_pool):
+    queue = make_queue(redis_pool, max_running=1)
+    await queue.enqueue("a", {})
+    await queue.enqueue("b", {})
+    
+    assert (await queue.claim())[0] == "a"
+    assert await queue.claim() is None
+    await queue.ack("a")
+    assert (await queue.claim())[0] == "b"
+
+
+async def test_expired_lease_requeued_at_original_position(redis_pool):
+    queue = make_queue(redis_pool, visibility_timeout=0)
+    await queue.enqueue("a", {"n": 1})
+    await queue.enqueue("b", {"n": 2})
+    assert (await queue.claim())[0] == "a"
+    
+    assert await queue.requeue_expired() == (["a"], [])
+    assert not await queue.extend("a")
+    assert await queue.position("a") == 0
+    assert await queue.claim() == ("a", {"n": 1}, 2)
+
+
+async def test_extend_keeps_lease(redis_pool):
+    queue = make_queue(redis_pool, visibility_timeout=0)
+    await queue.enqueue("a", {})
+    await queue.claim()
+    
+    queue.visibility_timeout = 60
+    assert await queue.extend("a")
+    assert await queue.requeue_expired() == ([], [])
+    assert await queue.size() == {"pending": 0, "processing": 1}
+
+
+async def test_dead_after_max_attempts(redis_pool):
+    queue = make_queue(redis_pool, visibility_timeout=0, max_attempts=2)
+    await queue.enqueue("a", {})
+    for _ in range(2):
+        await queue.claim()
+        requeued, dead = await queue.requeue_expired()
+    
+    assert (requeued, dead) == ([], ["a"])
+    assert await queue.size() == {"pending": 0, "processing": 0}
+    client = aioredis.Redis(connection_pool=redis_pool)
+    assert not await client.hexists(queue.jobs_key, "a")
+    assert not await client.hexists(queue.attempts_key, "a")
+
+
+async def test_record_duration_moving_average(redis_pool):
+    queue = make_queue(redis_pool)
+    
+    assert await queue.average_duration() is None
+    await queue.record_duration(100)
+    await queue.record_duration(200)
+    assert await queue.average_duration() == 120
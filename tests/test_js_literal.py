@@ -0,0 +1,90 @@
+import pytest
+
+from pdf_generator.js_literal import JSLiteralError, extract_chart_spec, parse_js_literal
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": [1, 2.5, "x"], "b": null}', {"a": [1, 2.5, "x"], "b": None}),
+    ("{name: 'pie', values: [1, 2,],}", {"name": "pie", "values": [1, 2]}),
+    ("{a: `tpl`, b: \"it's\"}", {"a": "tpl", "b": "it's"}),
+    ("{a: 0x1F, b: -.5, c: 1e3, d: +2}", {"a": 31, "b": -0.5, "c": 1000.0, "d": 2}),
+    ("{a: true, b: false, c: undefined, d: NaN, e: Infinity}",
+     {"a": True, "b": False, "c": None, "d": None, "e": None}),
+    ("{x: new Date('2024-01-01'), y: new Date()}", {"x": "2024-01-01", "y": None}),
+    ("{a: 'line\\nbreak \\u4e2d \\x41'}", {"a": "line\nbreak 中 A"}),
+    ("// 注释\n{a: 1, /* 块注释 */ b: 2};", {"a": 1, "b": 2}),
+    ("[{x: [1, 2]}, {x: [3]}]", [{"x": [1, 2]}, {"x": [3]}]),
+])
+def test_parse_supported_syntax(text, expected):
+    assert parse_js_literal(text) == expected
+
+
+def test_parse_resolves_variables():
+    assert parse_js_literal("[trace1, {y: [2]}]", {"trace1": {"y": [1]}}) == [{"y": [1]}, {"y": [2]}]
+
+
+@pytest.mark.parametrize("text, message, line, column", [
+    ("{\n  a: 1\n  b: 2\n}", "缺少逗号", 3, 3),
+    ("{a: [1, 2}", "缺少逗号", 1, 10),
+    ("{a: 'abc}", "字符串没有结束", 1, 5),
+    ("{a: foo}", "不支持的表达式", 1, 5),
+    ("{a: `${x}`}", "模板字符串", 1, 5),
+    ("{a: 1} extra", "多余内容", 1, 8),
+    ("{a: 1,", "对象没有闭合", 1, 1),
+])
+def test_parse_error_position(text, message, line, column):
+    with pytest.raises(JSLiteralError) as info:
+        parse_js_literal(text)
+    assert message in str(info.value)
+    assert (info.value.line, info.value.column) == (line, column)
+
+
+def test_extract_assignments():
+    code = """
+        const data = [{type: 'bar', x: ['a', 'b'], y: [1, 2]}];
+        const layout = {title: {text: '标题'}};
+        Plotly.newPlot('chart', data, layout);
+    """
+    assert extract_chart_spec(code) == ([{"type": "bar", "x": ["a", "b"], "y": [1, 2]}],
+                                        {"title": {"text": "标题"}})
+
+
+def test_extract_inline_literals():
+    code = "Plotly.newPlot(document.getElementById('c'), [{y: [1, 2]}], {height: 300}, {responsive: true});"
+    assert extract_chart_spec(code) == ([{"y": [1, 2]}], {"height": 300})
+
+
+def test_extract_figure_object():
+    code = "Plotly.react('c', {data: [{y: [3]}], layout: {width: 500}});"
+    assert extract_chart_spec(code) == ([{"y": [3]}], {"width": 500})
+
+
+def test_extract_trace_variables():
+    code = """
+        var trace1 = {x: [1, 2], y: [3, 4], type: 'scatter'};
+        var trace2 = {x: [1, 2], y: [5, 6], type: 'scatter'};
+        var data = [trace1, trace2];
+        Plotly.newPlot('c', data, {title: 'x'});
+    """
+    data, layout = extract_chart_spec(code)
+    assert [trace["y"] for trace in data] == [[3, 4], [5, 6]]
+    assert layout == {"title": "x"}
+
+
+def test_extract_variable_arguments_and_strings():
+    code = """
+        var note = "Plotly.newPlot('fake', [], {})";
+        var t = {y: [7]};
+        var cfg = {height: 200};
+        Plotly.newPlot("c", [t], cfg);
+    """
+    assert extract_chart_spec(code) == ([{"y": [7]}], {"height": 200})
+
+
+def test_extract_missing_parts():
+    assert extract_chart_spec("console.log('no chart');") == (None, None)
+
+
+def test_extract_reports_literal_errors():
+    with pytest.raises(JSLiteralError):
+        extract_chart_spec("var data = [{y: [1, 2}];")
@@ -0,0 +1,45 @@
+from core.response_cache import MemoryCache
+from pdf_generator.pdf_maker import PDFMaker
+
+GOOD_CHART = """<div class="chart"><script>
+var data = [{x: ['a', 'b'], y: [1, 2], type: 'bar'}];
+var layout = {title: '好的图表'};
+Plotly.newPlot('good', data, layout);
+</script></div>"""
+
+BAD_CHART = """<div class="chart"><script>
+var data = [{x: [1], y: [2], z: [3], type: 'scatter3d', foo: 1}];
+var layout = {title: '无效属性'};
+Plotly.newPlot('bad', data, layout);
+</script></div>"""
+
+
+async def test_invalid_chart_keeps_original_and_is_not_cached():
+    cache = MemoryCache(10)
+    maker = PDFMaker(chart_mode="svg", chart_cache=cache)
+    
+    html = await maker._process_markdown_async(f"# 报告\n\n{GOOD_CHART}\n\n{BAD_CHART}\n", None)
+    
+    assert html.count('class="plot-container"') == 1
+    assert "Plotly.newPlot('bad'" in html
+    assert "@@REPORT_CHART@@" not in html
+    assert len(cache._data) == 1
+
+
+async def test_cached_chart_reused():
+    cache = MemoryCache(10)
+    maker = PDFMaker(chart_mode="svg", chart_cache=cache)
+    first = await maker._process_markdown_async(GOOD_CHART, None)
+    
+    second = await maker._process_markdown_async(GOOD_CHART, None)
+    
+    assert "<svg" in first and "<svg" in second
+    assert len(cache._data) == 1
+
+
+def test_postprocess_keeps_leading_head_elements():
+    html = "<script>var a = 1;</script><style>p { color: red; }</style><p>hi</p>"
+    
+    result = PDFMaker()._postprocess_html(html, [])
+    
+    assert result == html
@@ -0,0 +1,35 @@
+import redis.asyncio as aioredis
+
+from data_loader.async_redis_loader import AsyncRedisLoader
+from data_loader.redis_loader import is_app_key
+
+
+def test_is_app_key():
+    assert is_app_key("report_task:abc")
+    assert is_app_key("report_queue:waiting")
+    assert is_app_key("llm_cache:index")
+    assert not is_app_key("sentiment_percentages")
+    assert not is_app_key("话题:report_task:abc")
+
+
+async def test_get_all_data_skips_app_keys(redis_pool):
+    client = aioredis.Redis(connection_pool=redis_pool)
+    await client.set("total_comments", "10")
+    await client.hset("report_task:abc", mapping={"status": "completed"})
+    await client.zadd("report_queue:waiting", {"abc": 1})
+    await client.set("llm_cache:key", "cached response")
+    
+    data = await AsyncRedisLoader(redis_pool).get_all_data()
+    
+    assert data == {"total_comments": 10}
+
+
+async def test_topic_fallback_reads_only_unscoped_data_keys(redis_pool):
+    client = aioredis.Redis(connection_pool=redis_pool)
+    await client.set("total_comments", "10")
+    await client.set("其他话题:total_comments", "99")
+    await client.hset("report_task:abc", mapping={"status": "completed"})
+    
+    data = await AsyncRedisLoader(redis_pool).get_all_data(topic="话题")
+    
+    assert data == {"total_comments": 10}
@@ -0,0 +1,34 @@
+import pytest
+import redis
+
+from task_manager import report_job
+from task_manager.report_job import ReportRuntime
+
+PARAMS = {"topic": "话题", "start_date": "2024-01-01", "end_date": "2024-01-31"}
+
+
+class FailingLoader:
+    def __init__(self, error):
+        self.error = error
+
+    async def get_all_data(self, **kwargs):
+        raise self.error
+
+
+@pytest.fixture
+def runtime(monkeypatch):
+    monkeypatch.setattr(report_job, "_load_backup_data", lambda start_date, end_date: {"backup": True})
+    return ReportRuntime()
+
+
+async def test_load_report_data_falls_back_when_redis_unavailable(runtime):
+    runtime.redis_loader = FailingLoader(redis.ConnectionError("连接失败"))
+    
+    assert await runtime.load_report_data(PARAMS) == {"backup": True}
+
+
+async def test_load_report_data_does_not_hide_other_errors(runtime):
+    runtime.redis_loader = FailingLoader(ValueError("日期格式错误"))
+    
+    with pytest.raises(ValueError):
+        await runtime.load_report_data(PARAMS)
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core import resource_limits
+from core.resource_limits import limited, limited_sync
+
+
+@pytest.fixture(autouse=True)
+def limits(monkeypatch):
+    monkeypatch.setitem(resource_limits.SCHEDULER_CONFIG, "resource_limits", {"llm": {"default": 2}})
+    monkeypatch.setattr(resource_limits, "_limiters", {})
+
+
+class Counter:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def enter(self):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def leave(self):
+        with self.lock:
+            self.active -= 1
+
+
+async def test_threads_and_coroutines_share_one_limit():
+    counter = Counter()
+    
+    def call_sync():
+        with limited_sync("llm:kimi"):
+            counter.enter()
+            time.sleep(0.02)
+            counter.leave()
+    
+    async def call_async():
+        async with limited("llm:kimi"):
+            counter.enter()
+            await asyncio.sleep(0.02)
+            counter.leave()
+    
+    await asyncio.gather(
+        *(asyncio.to_thread(call_sync) for _ in range(4)),
+        *(call_async() for _ in range(4))
+    )
+    
+    assert counter.peak == 2
+
+
+async def test_other_resources_are_independent():
+    async def call_glm():
+        async with limited("llm:glm"):
+            pass
+    
+    async with limited("llm:kimi"), limited("llm:kimi"):
+        await asyncio.wait_for(call_glm(), timeout=1)
+
+
+async def test_cancelled_waiter_does_not_leak_slot():
+    async with limited("llm:kimi"), limited("llm:kimi"):
+        waiter = asyncio.create_task(limited("llm:kimi").__aenter__())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+    
+    async with limited("llm:kimi"), limited("llm:kimi"):
+        pass
+    assert resource_limits._limiters["llm:kimi"]._active == 0
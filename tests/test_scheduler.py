@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from task_manager.report_job import ReportRuntime, INTERRUPTED_MESSAGE
+from task_manager.scheduler import LocalScheduler, QueueFullError
+from task_manager.task_store import InMemoryTaskStore
+
+
+async def test_priority_order_and_queue_limit():
+    order = []
+    gate = asyncio.Event()
+    
+    async def run_job(task_id, params):
+        order.append(task_id)
+        await gate.wait()
+    
+    scheduler = LocalScheduler(run_job, max_running=1, max_queued=3)
+    await scheduler.start()
+    await scheduler.submit("first", {})
+    await asyncio.sleep(0)
+    await scheduler.submit("low", {}, "low")
+    await scheduler.submit("normal", {})
+    info = await scheduler.submit("high", {}, "high")
+    
+    assert info["queue_position"] == 0
+    assert (await scheduler.queue_info("low"))["queue_position"] == 2
+    with pytest.raises(QueueFullError):
+        await scheduler.submit("rejected", {})
+    
+    gate.set()
+    while len(order) < 4:
+        await asyncio.sleep(0)
+    await scheduler.stop()
+    assert order == ["first", "high", "normal", "low"]
+
+
+async def test_stop_cancels_running_and_abandons_queued():
+    started = asyncio.Event()
+    cancelled = []
+    abandoned = []
+    
+    async def run_job(task_id, params):
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append(task_id)
+            raise
+    
+    async def on_abandon(task_id, params):
+        abandoned.append(task_id)
+    
+    scheduler = LocalScheduler(run_job, on_abandon, max_running=1)
+    await scheduler.start()
+    for task_id in ("a", "b", "c"):
+        await scheduler.submit(task_id, {})
+    await started.wait()
+    await scheduler.stop()
+    
+    assert cancelled == ["a"]
+    assert abandoned == ["b", "c"]
+    assert await scheduler.queue_info("b") is None
+
+
+async def test_cancelled_report_is_failed_and_fingerprint_released():
+    runtime = ReportRuntime()
+    runtime.task_store = InMemoryTaskStore()
+    await runtime.task_store.create("t1", {"status": "pending"})
+    await runtime.task_store.claim_fingerprint("fp", "t1", 3600)
+    
+    task = asyncio.create_task(runtime.run_report("t1", {"fingerprint": "fp"}))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    
+    stored = await runtime.task_store.get("t1")
+    assert stored["status"] == "failed"
+    assert stored["message"] == INTERRUPTED_MESSAGE
+    assert await runtime.task_store.claim_fingerprint("fp", "t2", 3600) is None
+
+
+async def test_abandoned_report_is_failed_and_fingerprint_released():
+    runtime = ReportRuntime()
+    runtime.task_store = InMemoryTaskStore()
+    await runtime.task_store.create("t1", {"status": "pending"})
+    await runtime.task_store.claim_fingerprint("fp", "t1", 3600)
+    
+    await runtime.abandon_report("t1", {"fingerprint": "fp"})
+    
+    assert (await runtime.task_store.get("t1"))["status"] == "failed"
+    assert await runtime.task_store.claim_fingerprint("fp", "t2", 3600) is None
@@ -0,0 +1,98 @@
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+from task_manager.task_store import InMemoryTaskStore, RedisTaskStore
+
+# 创建时间（秒）相同的两个任务用于检查游标的并列处理
+CREATED = {"t1": 100, "t2": 200, "t3": 300, "t4": 300, "t5": 400}
+STATUSES = {"t1": "completed", "t2": "failed", "t3": "completed", "t4": "pending", "t5": "completed"}
+BASE = int(time.time()) - 1000
+
+
+def iso(offset: float) -> str:
+    return datetime.fromtimestamp(BASE + offset).isoformat()
+
+
+async def add_tasks(store) -> None:
+    for task_id, offset in CREATED.items():
+        await store.create(task_id, {"status": STATUSES[task_id], "created_at": iso(offset)})
+
+
+@pytest.fixture(params=["memory", "redis"])
+def empty_store(request):
+    if request.param == "memory":
+        return InMemoryTaskStore(ttl=3600)
+    return RedisTaskStore(request.getfixturevalue("redis_pool"), ttl=3600, key_prefix="test_task:")
+
+
+@pytest.fixture
+async def store(empty_store):
+    await add_tasks(empty_store)
+    return empty_store
+
+
+async def list_all(store, **kwargs):
+    task_ids, cursor = [], None
+    while True:
+        tasks, cursor = await store.list(limit=2, cursor=cursor, **kwargs)
+        task_ids.extend(task["task_id"] for task in tasks)
+        if cursor is None:
+            return task_ids
+
+
+async def test_cursor_round_trip(store):
+    assert await list_all(store) == ["t5", "t4", "t3", "t2", "t1"]
+
+
+async def test_status_filter(store):
+    assert await list_all(store, status="completed") == ["t5", "t3", "t1"]
+    tasks, cursor = await store.list(status="pending")
+    assert [task["task_id"] for task in tasks] == ["t4"] and cursor is None
+
+
+async def test_date_filters(store):
+    task_ids = await list_all(store, created_after=BASE + 200, created_before=BASE + 400)
+    assert task_ids == ["t4", "t3", "t2"]
+
+
+async def test_fields(store):
+    tasks, _ = await store.list(limit=1, fields=["status"])
+    assert tasks == [{"task_id": "t5", "status": "completed"}]
+
+
+async def test_invalid_cursor(store):
+    with pytest.raises(ValueError):
+        await store.list(cursor="not-a-cursor")
+
+
+async def test_memory_count_by_status_skips_expired(monkeypatch):
+    store = InMemoryTaskStore(ttl=60)
+    await store.create("old", {"status": "completed"})
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 50)
+    await store.create("new", {"status": "completed"})
+    monkeypatch.setattr(time, "time", lambda: now + 100)
+    
+    assert (await store.count_by_status())["completed"] == 1
+
+
+def test_api_pagination_and_invalid_cursor():
+    # 不启动应用生命周期，直接使用内存任务存储
+    api.app.state.task_store = InMemoryTaskStore()
+    asyncio.run(add_tasks(api.app.state.task_store))
+    client = TestClient(api.app)
+    
+    first = client.get("/task-list", params={"limit": 3, "summary": True}).json()
+    assert [task["task_id"] for task in first["tasks"]] == ["t5", "t4", "t3"]
+    assert first["counts"]["completed"] == 3
+    second = client.get("/task-list", params={"limit": 3, "cursor": first["next_cursor"]}).json()
+    assert [task["task_id"] for task in second["tasks"]] == ["t2", "t1"]
+    assert second["next_cursor"] is None
+    
+    response = client.get("/task-list", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
@@ -0,0 +1,52 @@
+import redis.asyncio as aioredis
+
+from task_manager.task_store import RedisTaskStore
+
+
+def make_store(pool):
+    return RedisTaskStore(pool, ttl=3600, key_prefix="test_task:")
+
+
+async def test_update_missing_task_is_not_created(redis_pool):
+    store = make_store(redis_pool)
+    
+    assert not await store.update("missing", {"status": "processing"})
+    assert await store.get("missing") is None
+    client = aioredis.Redis(connection_pool=redis_pool)
+    assert await client.zcard(store._status_key("processing")) == 0
+
+
+async def test_progress_never_decreases(redis_pool):
+    store = make_store(redis_pool)
+    await store.create("t1", {"status": "processing", "progress": 0})
+    
+    assert await store.update("t1", {"progress": 50, "message": "生成中"})
+    assert await store.update("t1", {"progress": 30, "message": "较晚的消息"})
+    
+    task = await store.get("t1")
+    assert task["progress"] == 50
+    assert task["message"] == "较晚的消息"
+
+
+async def test_status_change_moves_status_index(redis_pool):
+    store = make_store(redis_pool)
+    await store.create("t1", {"status": "pending"})
+    client = aioredis.Redis(connection_pool=redis_pool)
+    score = await client.zscore(store.index_key, "t1")
+    
+    await store.update("t1", {"status": "processing"})
+    assert await client.zscore(store._status_key("pending"), "t1") is None
+    assert await client.zscore(store._status_key("processing"), "t1") == score
+    
+    await store.update("t1", {"status": "completed", "progress": 100})
+    assert await store.count_by_status() == {"pending": 0, "processing": 0, "completed": 1, "failed": 0}
+
+
+async def test_update_refreshes_ttl(redis_pool):
+    store = make_store(redis_pool)
+    await store.create("t1", {"status": "pending"})
+    client = aioredis.Redis(connection_pool=redis_pool)
+    await client.expire(store._key("t1"), 10)
+    
+    await store.update("t1", {"progress": 10})
+    assert await client.ttl(store._key("t1")) > 10
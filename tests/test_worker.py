@@ -0,0 +1,51 @@
+import asyncio
+
+from worker import ReportWorker
+
+
+class FakeQueue:
+    def __init__(self, jobs):
+        self.jobs = list(jobs)
+        self.claims = 0
+        self.acked = []
+
+    async def claim(self):
+        self.claims += 1
+        return self.jobs.pop(0) if self.jobs else None
+
+    async def ack(self, job_id):
+        self.acked.append(job_id)
+
+    async def record_duration(self, seconds):
+        pass
+
+    async def extend(self, job_id):
+        return True
+
+    async def requeue_expired(self, limit=100):
+        return [], []
+
+
+class FakeRuntime:
+    def __init__(self):
+        self.started = asyncio.Event()
+        self.finish = asyncio.Event()
+
+    async def run_report(self, task_id, params):
+        self.started.set()
+        await self.finish.wait()
+
+
+async def test_stop_while_waiting_for_slot_does_not_claim():
+    queue = FakeQueue([("a", {}, 1), ("b", {}, 1)])
+    runtime = FakeRuntime()
+    worker = ReportWorker(runtime, queue, concurrency=1)
+    run = asyncio.create_task(worker.run())
+    
+    await runtime.started.wait()
+    worker.stop()
+    runtime.finish.set()
+    await asyncio.wait_for(run, timeout=5)
+    
+    assert queue.claims == 1
+    assert queue.acked == ["a"]
@@ -0,0 +1,150 @@
+"""
+报告生成 worker：从 Redis 队列领取任务，生成报告并把进度写回任务存储。
+
+API 服务配置为队列模式（config/task_config.py 中 TASK_QUEUE_CONFIG["mode"] = "queue"）时，
+在任意节点上启动一个或多个 worker 即可：
+
+    python worker.py
+    python worker.py --concurrency 4
+"""
+import argparse
+import asyncio
+import signal
+import time
+from typing import Set
+
+from config.task_config import TASK_QUEUE_CONFIG
+from task_manager.job_queue import RedisJobQueue
+from task_manager.report_job import ReportRuntime
+
+
+class ReportWorker:
+    """领取并执行报告任务，执行期间定期续约，结束后确认"""
+    
+    def __init__(self, runtime: ReportRuntime, queue: RedisJobQueue, concurrency: int):
+        self.runtime = runtime
+        self.queue = queue
+        self.concurrency = concurrency
+        self._stopping = asyncio.Event()
+        self._running: Set[asyncio.Task] = set()
+    
+    def stop(self) -> None:
+        """停止领取新任务，已领取的任务执行完后退出"""
+        if not self._stopping.is_set():
+            print("收到退出信号，等待正在执行的任务完成...")
+            self._stopping.set()
+    
+    async def run(self) -> None:
+        print(f"worker 已启动，并发数 {self.concurrency}")
+        reaper = asyncio.create_task(self._reap_loop())
+        slots = asyncio.Semaphore(self.concurrency)
+        try:
+            while not self._stopping.is_set():
+                await slots.acquire()
+                # 等待空闲槽位期间可能收到了退出信号，此时不再领取
+                if self._stopping.is_set():
+                    slots.release()
+                    break
+                job = None
+                try:
+                    job = await self.queue.claim()
+                except Exception as e:
+                    print(f"领取任务失败: {e}")
+                if job is None:
+                    slots.release()
+                    await self._sleep(TASK_QUEUE_CONFIG["poll_interval"])
+                    continue
+                task = asyncio.create_task(self._process(*job))
+                self._running.add(task)
+                task.add_done_callback(lambda t: (self._running.discard(t), slots.release()))
+        finally:
+            reaper.cancel()
+            if self._running:
+                await asyncio.gather(*self._running, return_exceptions=True)
+        print("worker 已退出")
+    
+    async def _sleep(self, seconds: float) -> None:
+        """可被退出信号打断的等待"""
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+    
+    async def _process(self, job_id: str, params: dict, attempts: int) -> None:
+        print(f"开始执行任务 {job_id}（第 {attempts} 次领取）")
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        started = time.monotonic()
+        try:
+            await self.runtime.run_report(job_id, params)
+            print(f"任务 {job_id} 完成")
+        except Exception as e:
+            # 失败状态已写入任务存储；报告生成的失败不重试，只有 worker 失联导致的超时才重新入队
+            print(f"任务 {job_id} 失败: {e}")
+        finally:
+            heartbeat.cancel()
+            try:
+                await self.queue.ack(job_id)
+            except Exception as e:
+                print(f"确认任务 {job_id} 失败，租约到期后可能被重复执行: {e}")
+            try:
+                # 任务平均耗时用于估算排队时间
+                await self.queue.record_duration(time.monotonic() - started)
+            except Exception as e:
+                print(f"记录任务耗时失败: {e}")
+    
+    async def _heartbeat(self, job_id: str) -> None:
+        """定期续约，避免执行时间较长的任务被其他 worker 重新领取"""
+        while True:
+            await asyncio.sleep(TASK_QUEUE_CONFIG["heartbeat_interval"])
+            try:
+                if not await self.queue.extend(job_id):
+                    print(f"任务 {job_id} 的租约已丢失，可能会被其他 worker 重复执行")
+                    return
+            except Exception as e:
+                print(f"任务 {job_id} 续约失败: {e}")
+    
+    async def _reap_loop(self) -> None:
+        """定期回收租约到期的任务（任何 worker 都可以执行，脚本保证原子性）"""
+        while True:
+            try:
+                requeued, dead = await self.queue.requeue_expired()
+                for job_id in requeued:
+                    print(f"任务 {job_id} 租约到期，已重新放回队列")
+                for job_id in dead:
+                    print(f"任务 {job_id} 超过最大领取次数，标记为失败")
+                    await self.runtime.task_store.update(job_id, {
+                        "status": "failed",
+                        "message": "报告生成失败: 任务多次执行超时"
+                    })
+            except Exception as e:
+                print(f"回收超时任务失败: {e}")
+            await asyncio.sleep(TASK_QUEUE_CONFIG["heartbeat_interval"])
+
+
+async def run_worker(concurrency: int) -> None:
+    runtime = ReportRuntime()
+    # worker 与 API 通过 Redis 共享任务进度，不能退回内存存储
+    await runtime.start(require_redis_store=True)
+    queue = RedisJobQueue(runtime.app_pool)
+    worker = ReportWorker(runtime, queue, concurrency)
+    
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    try:
+        await worker.run()
+    finally:
+        await queue.close()
+        await runtime.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="报告生成 worker")
+    parser.add_argument("--concurrency", type=int, default=TASK_QUEUE_CONFIG["worker_concurrency"],
+                        help="同时执行的任务数")
+    args = parser.parse_args()
+    asyncio.run(run_worker(args.concurrency))
+
+
+if __name__ == "__main__":
+    main()